@@ -0,0 +1,61 @@
+"""
+Compares the vectorized Calculations functions with a Python loop over the scalar functions.
+
+Run from the repository root: python -m benchmarks.bench_calculations
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from src.Calculations import calculate_distance, calculate_two_point_angle, calculate_three_point_angle
+from src.Calculations import calculate_distances, calculate_two_point_angles, calculate_three_point_angles
+
+
+def run(frames: int, repeat: int) -> dict:
+    """
+    Times the scalar and vectorized versions of every calculation on a session of random joint positions.
+
+    :param frames: Number of frames in the session
+    :param repeat: Number of timed runs; the fastest one is reported
+    :return: Seconds per session for every function and version
+    """
+    rng = np.random.default_rng(0)
+    hip, knee, ankle = (rng.integers(0, 1920, (frames, 2)) for _ in range(3))
+    hip_points, knee_points, ankle_points = hip.tolist(), knee.tolist(), ankle.tolist()
+
+    cases = {
+        "three_point_angle": (
+            lambda: [calculate_three_point_angle(a, b, c) for a, b, c in zip(hip_points, knee_points, ankle_points)],
+            lambda: calculate_three_point_angles(hip, knee, ankle),
+        ),
+        "two_point_angle": (
+            lambda: [calculate_two_point_angle(a, b) for a, b in zip(hip_points, knee_points)],
+            lambda: calculate_two_point_angles(hip, knee),
+        ),
+        "distance": (
+            lambda: [calculate_distance(a, b) for a, b in zip(hip_points, knee_points)],
+            lambda: calculate_distances(hip, knee),
+        ),
+    }
+    results = {}
+    for name, (scalar, vectorized) in cases.items():
+        scalar_time = min(timeit.repeat(scalar, number=1, repeat=repeat))
+        vectorized_time = min(timeit.repeat(vectorized, number=1, repeat=repeat))
+        results[name] = {"scalar": scalar_time, "vectorized": vectorized_time, "speedup": scalar_time / vectorized_time}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=50_000, help="Number of frames in the session")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs")
+    args = parser.parse_args()
+
+    print(f"{'function':<20}{'loop [ms]':>12}{'vectorized [ms]':>18}{'speedup':>10}")
+    for name, result in run(args.frames, args.repeat).items():
+        print(f"{name:<20}{result['scalar'] * 1e3:>12.2f}{result['vectorized'] * 1e3:>18.2f}{result['speedup']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
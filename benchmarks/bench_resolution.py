@@ -0,0 +1,136 @@
+"""
+Measures the speedup and accuracy drift of running pose inference and barbell detection below the render resolution.
+
+Every pose width and barbell scale runs on all frames of a video; the joint positions and plate centers are
+compared in pixels of the rendered frame against the run at full resolution. MediaPipe does not detect the
+stick figure of the synthetic video, so pass a real recording with --video to measure the pose drift.
+
+Run from the repository root: python -m benchmarks.bench_resolution --output resolution.json [--video squat.mp4]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import RESOLUTIONS, create_video
+from src.ImageHandler import FrameHandler
+from src.MovementPatterns import JOINT_LANDMARKS, landmarks_to_array
+
+
+def time_pose(video_path: str, pose_width: int = None) -> tuple:
+    """
+    Runs pose inference at a pose width on every frame.
+
+    :param video_path: The path to the synthetic video
+    :param pose_width: Width of the frames given to pose inference, or None for the render resolution
+    :return: Per-frame durations in seconds including the downsampling, and per-frame joint pixel
+        coordinates of shape (14, 2), or None where no pose was found
+    """
+    frame_handler = FrameHandler(video_path, "benchmark", headless=True, pose_width=pose_width)
+    size = np.array([frame_handler.width, frame_handler.height])
+    durations, joints = [], []
+    for _, frame in frame_handler.read_frames():
+        start = time.perf_counter()
+        results = frame_handler.pose.process(frame_handler.resize_for_pose(frame))
+        durations.append(time.perf_counter() - start)
+        if results.pose_landmarks:
+            joints.append(landmarks_to_array(results.pose_landmarks)[JOINT_LANDMARKS, :2] * size)
+        else:
+            joints.append(None)
+    frame_handler.cap.release()
+    return durations, joints
+
+
+def time_barbell(video_path: str, barbell_scale: float = 1) -> tuple:
+    """
+    Runs barbell detection at a scale on every frame.
+
+    :param video_path: The path to the synthetic video
+    :param barbell_scale: Scale of the grayscale image searched for the barbell
+    :return: Per-frame durations in seconds and plate centers of shape (1, 2), or None where no plate was found
+    """
+    frame_handler = FrameHandler(video_path, "benchmark", headless=True, barbell_scale=barbell_scale)
+    durations, centers = [], []
+    for _, frame in frame_handler.read_frames():
+        start = time.perf_counter()
+        center = frame_handler.get_barbell_coordinates(frame)
+        durations.append(time.perf_counter() - start)
+        centers.append(np.array([center], np.float64) if center is not None else None)
+    frame_handler.cap.release()
+    return durations, centers
+
+
+def summarize(durations: list, points: list, reference_durations: list, reference_points: list) -> dict:
+    """
+    Compares the results of a setting against the results at full resolution.
+
+    :param durations: Per-frame durations in seconds
+    :param points: Per-frame point arrays, None for frames without a result
+    :param reference_durations: Per-frame durations at full resolution
+    :param reference_points: Per-frame point arrays at full resolution
+    :return: Median duration, speedup, share of frames with a result, and the mean and maximum distance
+        in pixels of the points on frames where both runs found them
+    """
+    median_ms = float(np.median(durations)) * 1e3
+    errors = [float(np.linalg.norm(point - reference, axis=1).mean())
+              for point, reference in zip(points, reference_points) if point is not None and reference is not None]
+    return {
+        "median_ms": median_ms,
+        "speedup": float(np.median(reference_durations)) * 1e3 / median_ms,
+        "detection_rate": sum(point is not None for point in points) / len(points) if points else 0.0,
+        "mean_error_px": float(np.mean(errors)) if errors else None,
+        "max_error_px": float(np.max(errors)) if errors else None,
+    }
+
+
+def run(video_path: str, pose_widths: list, barbell_scales: list) -> dict:
+    """
+    Benchmarks every pose width and barbell scale on a video.
+
+    :param video_path: The path to the video
+    :param pose_widths: Pose widths to compare against the render resolution
+    :param barbell_scales: Barbell scales to compare against the scaled frame
+    :return: Timing and accuracy per setting
+    """
+    results = {"settings": {"video": video_path}, "pose": {}, "barbell": {}}
+    for stage, timer, settings in (("pose", time_pose, pose_widths), ("barbell", time_barbell, barbell_scales)):
+        reference_durations, reference_points = timer(video_path)
+        results[stage]["full"] = summarize(reference_durations, reference_points, reference_durations, reference_points)
+        for setting in settings:
+            durations, points = timer(video_path, setting)
+            results[stage][str(setting)] = summarize(durations, points, reference_durations, reference_points)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="resolution_results.json", help="Path of the JSON results")
+    parser.add_argument("--video", default=None, help="Video to analyze instead of a synthetic one")
+    parser.add_argument("--resolution", choices=list(RESOLUTIONS), default="1080p",
+                        help="Resolution of the synthetic video")
+    parser.add_argument("--frames", type=int, default=60, help="Number of frames of the synthetic video")
+    parser.add_argument("--pose-widths", type=int, nargs="+", default=[480, 256], help="Pose widths to compare")
+    parser.add_argument("--barbell-scales", type=float, nargs="+", default=[0.5, 0.25], help="Barbell scales to compare")
+    parser.add_argument("--video-dir", default=os.path.join(tempfile.gettempdir(), "squat_benchmark_videos"),
+                        help="Directory where the synthetic videos are generated and reused")
+    args = parser.parse_args()
+
+    video_path = args.video or create_video(args.video_dir, args.resolution, args.frames)
+    results = run(video_path, args.pose_widths, args.barbell_scales)
+    with open(args.output, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+
+    for stage, unit in (("pose", "pose width"), ("barbell", "barbell scale")):
+        print(f"{unit:<14}{'median':>12}{'speedup':>10}{'found':>8}{'mean error':>14}{'max error':>13}")
+        for setting, result in results[stage].items():
+            mean_error = f"{result['mean_error_px']:.1f} px" if result["mean_error_px"] is not None else "-"
+            max_error = f"{result['max_error_px']:.1f} px" if result["max_error_px"] is not None else "-"
+            print(f"{setting:<14}{result['median_ms']:>9.2f} ms{result['speedup']:>9.1f}x"
+                  f"{result['detection_rate']:>8.0%}{mean_error:>14}{max_error:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Times every stage of the per-frame analysis on deterministic synthetic squat videos of several
+resolutions and lengths.
+
+Stages: decode, resize, pose (pose.process), squat_pose (SquatPose construction and side detection),
+calculations (joint angles), barbell (get_barbell_coordinates) and render (add_images_to_frame).
+Every resolution is run at every length, since per-frame costs drift with the clip length, e.g. through
+the growing bar path and the tracking state. The results are written as JSON and can be compared against
+a stored baseline run case by case; the exit status is 1 if a stage got slower than the tolerance allows.
+
+Run from the repository root: python -m benchmarks.bench_stages --output results.json [--baseline baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from benchmarks.synthetic import RESOLUTIONS, SQUAT_PERIOD, create_video, get_landmarks
+from src.Calculations import calculate_three_point_angle
+from src.ImageHandler import FrameHandler
+from src.MovementPatterns import FrameAnalysis, SquatPose
+
+STAGES = ("decode", "resize", "pose", "squat_pose", "calculations", "barbell", "render")
+
+# Numbers of frames of the videos: a single rep and a set of four
+LENGTHS = (SQUAT_PERIOD, 4 * SQUAT_PERIOD)
+
+
+def time_stages(video_path: str, scale: float = 1) -> dict:
+    """
+    Runs every stage on every frame of a video and records its duration.
+
+    :param video_path: The path to the synthetic video
+    :param scale: The scale of the analyzed frames
+    :return: Stage name to the list of per-frame durations in seconds
+    """
+    frame_handler = FrameHandler(video_path, "benchmark", scale=scale, headless=True)
+    bar_path = frame_handler.create_bar_path_layer()
+    width, height = frame_handler.width, frame_handler.height
+    timings = {stage: [] for stage in STAGES}
+
+    frame_index = 0
+    while True:
+        start = time.perf_counter()
+        ret, frame = frame_handler.cap.read()
+        if not ret:
+            break
+        decoded = time.perf_counter()
+        frame = cv2.resize(frame, (width, height))
+        resized = time.perf_counter()
+        frame_handler.pose.process(frame)
+        inferred = time.perf_counter()
+
+        # Ground truth landmarks, so the later stages don't depend on MediaPipe detecting the stick figure
+        landmarks = get_landmarks(frame_index, width, height)
+        squat_pose_start = time.perf_counter()
+        squat_pose = SquatPose(landmarks, width, height)
+        analysis = FrameAnalysis(frame_index, squat_pose)
+        analysis.video_angle, analysis.filmed_side = frame_handler.view_classifier.update(frame_index, landmarks)
+        side_coords = analysis.side_coords = squat_pose.get_side_coordinates(analysis.filmed_side)
+        squat_pose_end = time.perf_counter()
+        analysis.knee_angle = calculate_three_point_angle(side_coords[0], side_coords[1], side_coords[2])
+        analysis.hip_angle = calculate_three_point_angle(side_coords[3], side_coords[0], side_coords[1])
+        analysis.shin_angle = calculate_three_point_angle(side_coords[1], side_coords[2], side_coords[4])
+        calculated = time.perf_counter()
+        analysis.bar_coords = frame_handler.get_barbell_coordinates(frame)
+        detected = time.perf_counter()
+        if analysis.bar_coords:
+            bar_path.add_point((int(analysis.bar_coords[0] / 3), int(analysis.bar_coords[1] / 3)))
+        frame_handler.render_frame(frame, analysis, bar_path)
+        rendered = time.perf_counter()
+
+        for stage, duration in zip(STAGES, (decoded - start, resized - decoded, inferred - resized,
+                                            squat_pose_end - squat_pose_start, calculated - squat_pose_end,
+                                            detected - calculated, rendered - detected)):
+            timings[stage].append(duration)
+        frame_index += 1
+
+    frame_handler.cap.release()
+    return timings
+
+
+def summarize(durations: list) -> dict:
+    """
+    Summarizes the per-frame durations of a stage.
+
+    :param durations: Durations in seconds
+    :return: Mean, median and 95th percentile in milliseconds
+    """
+    milliseconds = np.array(durations) * 1e3
+    return {
+        "mean_ms": float(milliseconds.mean()),
+        "median_ms": float(np.median(milliseconds)),
+        "p95_ms": float(np.percentile(milliseconds, 95)),
+    }
+
+
+def run(resolutions: list, lengths: list, scale: float, video_dir: str) -> dict:
+    """
+    Benchmarks every combination of resolution and length.
+
+    :param resolutions: Names of the resolutions, see RESOLUTIONS
+    :param lengths: Numbers of frames of the videos
+    :param scale: The scale of the analyzed frames
+    :param video_dir: Directory of the synthetic videos
+    :return: Environment and per-case stage statistics
+    """
+    results = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "opencv": cv2.__version__,
+            "mediapipe": mp.__version__,
+            "numpy": np.__version__,
+        },
+        "settings": {"resolutions": list(resolutions), "lengths": list(lengths), "scale": scale},
+        "cases": {},
+    }
+    for resolution in resolutions:
+        for frames in lengths:
+            video_path = create_video(video_dir, resolution, frames)
+            timings = time_stages(video_path, scale)
+            stages = {stage: summarize(durations) for stage, durations in timings.items()}
+            total_ms = sum(stage["median_ms"] for stage in stages.values())
+            results["cases"][f"{resolution}_{frames}"] = {"resolution": resolution, "frames": frames,
+                                                          "stages": stages, "total_median_ms": total_ms,
+                                                          "fps": 1e3 / total_ms if total_ms > 0 else 0.0}
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.2, min_delta_ms: float = 0.05) -> list:
+    """
+    Finds stages whose median duration got slower than the baseline case of the same resolution and length.
+
+    :param results: Results of this run
+    :param baseline: Results of the baseline run
+    :param tolerance: Allowed relative slowdown
+    :param min_delta_ms: Slowdowns below this many milliseconds are treated as noise
+    :return: List of regressions with case, resolution, length, stage, baseline and current median
+    """
+    regressions = []
+    for case, result in results["cases"].items():
+        baseline_case = baseline["cases"].get(case)
+        if baseline_case is None:
+            continue
+        for stage, stats in result["stages"].items():
+            if stage not in baseline_case["stages"]:
+                continue
+            baseline_ms = baseline_case["stages"][stage]["median_ms"]
+            current_ms = stats["median_ms"]
+            if current_ms > baseline_ms * (1 + tolerance) and current_ms - baseline_ms > min_delta_ms:
+                regressions.append({"case": case, "resolution": result["resolution"], "frames": result["frames"],
+                                    "stage": stage, "baseline_ms": baseline_ms, "current_ms": current_ms})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="benchmark_results.json", help="Path of the JSON results")
+    parser.add_argument("--baseline", default=None, help="JSON results of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown per stage")
+    parser.add_argument("--resolutions", nargs="+", choices=list(RESOLUTIONS), default=list(RESOLUTIONS),
+                        help="Resolutions of the synthetic videos")
+    parser.add_argument("--lengths", type=int, nargs="+", default=list(LENGTHS),
+                        help="Numbers of frames of the videos; every resolution is run at every length")
+    parser.add_argument("--scale", type=float, default=1, help="Scale of the analyzed frames")
+    parser.add_argument("--video-dir", default=os.path.join(tempfile.gettempdir(), "squat_benchmark_videos"),
+                        help="Directory where the synthetic videos are generated and reused")
+    args = parser.parse_args()
+
+    results = run(args.resolutions, args.lengths, args.scale, args.video_dir)
+    with open(args.output, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+
+    print(f"{'case':<14}" + "".join(f"{stage:>14}" for stage in STAGES) + f"{'fps':>10}")
+    for case, result in results["cases"].items():
+        print(f"{case:<14}" + "".join(f"{result['stages'][stage]['median_ms']:>11.2f} ms" for stage in STAGES)
+              + f"{result['fps']:>10.1f}")
+
+    if args.baseline is not None:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f"Regression in {regression['resolution']} ({regression['frames']} frames) {regression['stage']}: "
+                  f"{regression['baseline_ms']:.2f} ms -> {regression['current_ms']:.2f} ms")
+        if regressions:
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
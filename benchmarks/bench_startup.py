@@ -0,0 +1,113 @@
+"""
+Measures the startup cost of the analysis: import time and time to the first analyzed frame.
+
+Every measurement runs in a fresh interpreter that has only imported the standard library:
+  import       importing src.ImageHandler
+  cold         creating a FrameHandler and analyzing its first frame, which loads MediaPipe and the Pose model
+  warm_up      an explicit PosePool warm-up right after the import
+  warm         creating a FrameHandler and analyzing its first frame after the warm-up
+  reused       a second FrameHandler in the same process analyzing its first frame with the pooled Pose
+
+Run from the repository root: python -m benchmarks.bench_startup --output startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PHASES = ("import", "cold", "warm_up", "warm", "reused")
+
+
+def analyze_first_frame(video_path: str) -> float:
+    """
+    Creates a FrameHandler, analyzes the first frame of the video and closes it again.
+
+    :param video_path: The path to the video
+    :return: Duration in seconds
+    """
+    from src.ImageHandler import FrameHandler
+
+    start = time.perf_counter()
+    frame_handler = FrameHandler(video_path, "benchmark", headless=True)
+    for frame_index, frame in frame_handler.read_frames():
+        frame_handler.detect_barbell(frame_handler.analyze_pose(frame_index, frame), frame)
+        break
+    duration = time.perf_counter() - start
+    frame_handler.close()
+    return duration
+
+
+def measure(video_path: str, warm: bool) -> dict:
+    """
+    Measures the startup phases in the current interpreter, which must not have imported the analysis yet.
+
+    :param video_path: The path to the video
+    :param warm: Warm the Pose pool up before creating the first FrameHandler
+    :return: Phase name to duration in seconds
+    """
+    start = time.perf_counter()
+    import src.ImageHandler  # noqa: F401
+    from src.PosePool import get_pose_pool
+    timings = {"import": time.perf_counter() - start}
+
+    if warm:
+        start = time.perf_counter()
+        get_pose_pool().warm_up()
+        timings["warm_up"] = time.perf_counter() - start
+        timings["warm"] = analyze_first_frame(video_path)
+    else:
+        timings["cold"] = analyze_first_frame(video_path)
+    timings["reused"] = analyze_first_frame(video_path)
+    return timings
+
+
+def run_child(video_path: str, warm: bool) -> dict:
+    """
+    Runs measure() in a fresh interpreter.
+
+    :param video_path: The path to the video
+    :param warm: Warm the Pose pool up before creating the first FrameHandler
+    :return: Phase name to duration in seconds
+    """
+    command = [sys.executable, "-m", "benchmarks.bench_startup", "--child", video_path] + (["--warm"] if warm else [])
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="startup_results.json", help="Path of the JSON results")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of fresh interpreters per variant")
+    parser.add_argument("--video-dir", default=os.path.join(tempfile.gettempdir(), "squat_benchmark_videos"),
+                        help="Directory where the synthetic video is generated and reused")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--warm", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(measure(args.child, args.warm)))
+        return
+
+    import numpy as np
+    from benchmarks.synthetic import create_video
+
+    video_path = create_video(args.video_dir, "720p", 30)
+    durations = {phase: [] for phase in PHASES}
+    for _ in range(args.repeats):
+        for warm in (False, True):
+            for phase, duration in run_child(video_path, warm).items():
+                durations[phase].append(duration)
+
+    results = {phase: {"median_ms": float(np.median(values)) * 1e3, "max_ms": float(np.max(values)) * 1e3}
+               for phase, values in durations.items()}
+    with open(args.output, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+    for phase, result in results.items():
+        print(f"{phase:<10}{result['median_ms']:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Deterministic synthetic squat videos for the benchmarks.
+
+A stick figure filmed from the right side squats with a weight plate on its back. The ground truth
+landmarks of every frame are available, so the stages after pose inference can be timed on realistic
+input even though MediaPipe may not detect a stick figure.
+"""
+import math
+import os
+
+import cv2
+import numpy as np
+
+from src.MovementPatterns import LANDMARK_COUNT, PoseLandmark
+from src.BarbellTracking import PLATE_MIN_RADIUS, PLATE_MAX_RADIUS
+
+RESOLUTIONS = {"480p": (854, 480), "720p": (1280, 720), "1080p": (1920, 1080)}
+
+# Frames per rep
+SQUAT_PERIOD = 60
+
+# Lengths of the shin and thigh in frame heights
+SEGMENT_LENGTH = 0.22
+
+PLATE_RADIUS = (PLATE_MIN_RADIUS + PLATE_MAX_RADIUS) // 2
+
+LIMBS = (("shoulder", "elbow"), ("shoulder", "hip"), ("hip", "knee"), ("knee", "ankle"),
+         ("ankle", "heel"), ("heel", "foot"), ("ankle", "foot"))
+
+
+def get_joints(frame_index: int) -> dict:
+    """
+    Computes the joint positions of the stick figure in frame heights, relative to the ankle's x position.
+
+    :param frame_index: Index of the frame
+    :return: Joint name to (x, y)
+    """
+    depth = (1 - math.cos(2 * math.pi * frame_index / SQUAT_PERIOD)) / 2
+    ankle = np.array([0.0, 0.85])
+    hip = np.array([-0.05 - 0.12 * depth, 0.42 + 0.22 * depth])
+
+    # The knee lies forward of the hip-ankle line, at shin and thigh length from both
+    half_distance = np.linalg.norm(hip - ankle) / 2
+    direction = (hip - ankle) / (2 * half_distance)
+    offset = math.sqrt(max(SEGMENT_LENGTH ** 2 - half_distance ** 2, 0))
+    knee = ankle + direction * half_distance + np.array([-direction[1], direction[0]]) * -offset
+    if knee[0] < hip[0]:
+        knee = ankle + direction * half_distance + np.array([-direction[1], direction[0]]) * offset
+
+    lean = 0.15 + 0.5 * depth
+    shoulder = hip + 0.28 * np.array([math.sin(lean), -math.cos(lean)])
+    return {
+        "shoulder": shoulder, "elbow": shoulder + np.array([0.05, 0.1]), "hip": hip, "knee": knee,
+        "ankle": ankle, "foot": np.array([0.1, 0.87]), "heel": np.array([-0.04, 0.87]),
+        "nose": shoulder + np.array([0.04, -0.1]),
+    }
+
+
+def get_landmarks(frame_index: int, width: int, height: int) -> np.ndarray:
+    """
+    Ground truth landmarks of a frame in MediaPipe's layout; the right side is visible, the left side is hidden.
+
+    :param frame_index: Index of the frame
+    :param width: Width of the video
+    :param height: Height of the video
+    :return: Landmark array of shape (33, 4)
+    """
+    joints = get_joints(frame_index)
+    landmarks = np.zeros((LANDMARK_COUNT, 4), np.float32)
+    landmarks[:, :2] = _to_normalized(joints["nose"], width, height)
+    landmarks[:, 3] = 0.5
+    for side, visibility, x_offset in (("RIGHT", 0.95, 0.0), ("LEFT", 0.3, -0.01)):
+        for joint, landmark_name in (("shoulder", "SHOULDER"), ("elbow", "ELBOW"), ("hip", "HIP"), ("knee", "KNEE"),
+                                     ("ankle", "ANKLE"), ("foot", "FOOT_INDEX"), ("heel", "HEEL")):
+            landmark = PoseLandmark[f"{side}_{landmark_name}"].value
+            landmarks[landmark, :2] = _to_normalized(joints[joint] + np.array([x_offset, 0]), width, height)
+            landmarks[landmark, 3] = visibility
+    return landmarks
+
+
+def _to_normalized(point: np.ndarray, width: int, height: int) -> tuple:
+    return 0.5 + point[0] * height / width, point[1]
+
+
+def _to_pixels(point: np.ndarray, width: int, height: int) -> tuple:
+    x, y = _to_normalized(point, width, height)
+    return int(x * width), int(y * height)
+
+
+def draw_frame(frame_index: int, width: int, height: int) -> np.ndarray:
+    """
+    Draws a frame of the synthetic video.
+
+    :param frame_index: Index of the frame
+    :param width: Width of the video
+    :param height: Height of the video
+    :return: BGR frame
+    """
+    frame = np.full((height, width, 3), 90, np.uint8)
+    joints = {name: _to_pixels(point, width, height) for name, point in get_joints(frame_index).items()}
+    thickness = max(2, height // 60)
+
+    # The plate sits on the back, centered on the shoulder, behind the lifter
+    cv2.circle(frame, joints["shoulder"], PLATE_RADIUS, (30, 30, 30), -1)
+    cv2.circle(frame, joints["shoulder"], PLATE_RADIUS, (250, 250, 250), thickness)
+
+    for start, end in LIMBS:
+        cv2.line(frame, joints[start], joints[end], (200, 170, 140), thickness)
+    cv2.circle(frame, joints["nose"], height // 25, (200, 170, 140), -1)
+    return frame
+
+
+def create_video(directory: str, resolution: str, frames: int) -> str:
+    """
+    Writes a synthetic squat video, or reuses it if it exists.
+
+    :param directory: Directory of the video
+    :param resolution: Name of the resolution, see RESOLUTIONS
+    :param frames: Number of frames
+    :return: Path of the video
+    """
+    width, height = RESOLUTIONS[resolution]
+    video_path = os.path.join(directory, f"squat_{resolution}_{frames}.mp4")
+    if os.path.exists(video_path):
+        return video_path
+
+    os.makedirs(directory, exist_ok=True)
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (width, height))
+    if not writer.isOpened():
+        raise IOError(f"Cannot open output video {video_path}")
+    for frame_index in range(frames):
+        writer.write(draw_frame(frame_index, width, height))
+    writer.release()
+    return video_path
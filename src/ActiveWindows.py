@@ -0,0 +1,184 @@
+import json
+import os
+from typing import List, Optional, Tuple
+
+import cv2
+
+from src.StaticFrameFilter import get_thumbnail, count_changed_pixels
+
+
+class ActiveWindowDetector:
+    """
+    Fast first pass over a long session recording that finds the frame windows in which a set happens.
+
+    Only a few frames per second are converted and shrunk to a tiny grayscale thumbnail; the frames in
+    between are skipped with grab(). A sample is active when enough thumbnail pixels changed since the
+    previous sample. Active samples less than max_gap apart are merged into windows, windows shorter than
+    min_duration are dropped, e.g. somebody walking through the picture, and the rest are padded so the
+    analysis also covers the unrack and rerack.
+
+    grab() still decodes every frame at full resolution and only saves the color conversion: OpenCV can't
+    decode at a lower resolution, and its frame-accurate seeking decodes from the previous keyframe, which
+    is slower than grabbing the few frames between two samples. The first pass therefore costs about one
+    decode of the whole recording, while the analysis only runs on the windows.
+    """
+
+    def __init__(self, sample_fps: float = 4, thumbnail_width: int = 64, pixel_threshold: int = 12,
+                 min_changed: float = 0.01, min_duration: float = 3.0, max_gap: float = 4.0, padding: float = 1.0):
+        """
+        Initialize the ActiveWindowDetector class.
+        :param sample_fps: Number of frames per second compared for motion
+        :param thumbnail_width: Width in pixels of the compared thumbnails
+        :param pixel_threshold: Gray value difference above which a thumbnail pixel counts as changed
+        :param min_changed: Share of changed thumbnail pixels from which a sample is active
+        :param min_duration: Minimum duration in seconds of a window
+        :param max_gap: Maximum pause in seconds between active samples of the same window
+        :param padding: Seconds added before and after every window
+        """
+        if sample_fps <= 0:
+            raise ValueError("Sample rate must be positive")
+
+        self.sample_fps = sample_fps
+        self.thumbnail_width = thumbnail_width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed = min_changed
+        self.min_duration = min_duration
+        self.max_gap = max_gap
+        self.padding = padding
+
+    @property
+    def config(self) -> dict:
+        """
+        Settings that change the detected windows.
+        """
+        return {
+            "sample_fps": self.sample_fps,
+            "thumbnail_width": self.thumbnail_width,
+            "pixel_threshold": self.pixel_threshold,
+            "min_changed": self.min_changed,
+            "min_duration": self.min_duration,
+            "max_gap": self.max_gap,
+            "padding": self.padding,
+        }
+
+    def find_windows(self, active_frames: List[int], step: int, fps: float, frame_count: int) -> List[Tuple[int, int]]:
+        """
+        Merges the active samples into padded windows.
+
+        :param active_frames: Frame indices of the active samples in ascending order
+        :param step: Number of frames between two samples
+        :param fps: Frame rate of the video
+        :param frame_count: Number of frames in the video
+        :return: List of (start frame, end frame) windows; the end frame is exclusive
+        """
+        windows = []
+        for frame_index in active_frames:
+            # The motion happened since the previous sample
+            start_frame = max(0, frame_index - step)
+            if windows and start_frame - windows[-1][1] <= self.max_gap * fps:
+                windows[-1][1] = frame_index + 1
+            else:
+                windows.append([start_frame, frame_index + 1])
+
+        padding = round(self.padding * fps)
+        padded = []
+        for start_frame, end_frame in windows:
+            if end_frame - start_frame < self.min_duration * fps:
+                continue
+            start_frame, end_frame = max(0, start_frame - padding), min(frame_count, end_frame + padding)
+            if padded and start_frame <= padded[-1][1]:
+                padded[-1] = (padded[-1][0], end_frame)
+            else:
+                padded.append((start_frame, end_frame))
+        return padded
+
+    def detect(self, video_path: str) -> List[Tuple[int, int]]:
+        """
+        Decodes the video once, compares the frames at the sample rate and finds the windows with motion.
+
+        :param video_path: The path to the video file
+        :return: List of (start frame, end frame) windows; the end frame is exclusive
+        """
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise IOError(f"Cannot open video {video_path}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        step = max(1, round(fps / self.sample_fps))
+
+        active_frames = []
+        reference = None
+        frame_index = 0
+        try:
+            while cap.grab():
+                if frame_index % step == 0:
+                    ret, frame = cap.retrieve()
+                    if not ret:
+                        break
+                    thumbnail = get_thumbnail(frame, self.thumbnail_width)
+                    if reference is not None:
+                        changed = count_changed_pixels(thumbnail, reference, self.pixel_threshold)
+                        if changed >= self.min_changed * thumbnail.size:
+                            active_frames.append(frame_index)
+                    reference = thumbnail
+                frame_index += 1
+        finally:
+            cap.release()
+        return self.find_windows(active_frames, step, fps, frame_index)
+
+    def _get_video_info(self, video_path: str) -> dict:
+        stat = os.stat(video_path)
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    def load(self, video_path: str, windows_path: str) -> Optional[List[Tuple[int, int]]]:
+        """
+        Loads windows saved for the video with the same settings.
+
+        :param video_path: The path to the video file
+        :param windows_path: The path of the JSON file with the saved windows
+        :return: The saved windows, or None if there are none or the video or settings changed
+        """
+        try:
+            with open(windows_path) as windows_file:
+                saved = json.load(windows_file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if saved.get("video") != self._get_video_info(video_path) or saved.get("config") != self.config:
+            return None
+        return [tuple(window) for window in saved["windows"]]
+
+    def save(self, video_path: str, windows_path: str, windows: List[Tuple[int, int]]):
+        """
+        Saves the windows of a video together with its size, modification time and the detection settings.
+
+        :param video_path: The path to the video file
+        :param windows_path: The path of the JSON file
+        :param windows: The detected windows
+        """
+        saved = {
+            "video": self._get_video_info(video_path),
+            "config": self.config,
+            "windows": [list(window) for window in windows],
+        }
+        temp_path = f"{windows_path}.tmp"
+        with open(temp_path, "w") as windows_file:
+            json.dump(saved, windows_file, indent=2)
+        # Concurrent readers never see a partial file
+        os.replace(temp_path, windows_path)
+
+    def get_windows(self, video_path: str, windows_path: str = None) -> List[Tuple[int, int]]:
+        """
+        Returns the saved windows of a video, or detects and saves them.
+
+        :param video_path: The path to the video file
+        :param windows_path: The path of the JSON file with the saved windows, or None to always detect
+        :return: List of (start frame, end frame) windows; the end frame is exclusive
+        """
+        if windows_path is not None:
+            windows = self.load(video_path, windows_path)
+            if windows is not None:
+                return windows
+
+        windows = self.detect(video_path)
+        if windows_path is not None:
+            self.save(video_path, windows_path, windows)
+        return windows
@@ -0,0 +1,243 @@
+from collections import deque
+from typing import Optional
+
+import cv2
+import numpy as np
+
+# Radius range of the weight plates in pixels searched by HoughCircles
+PLATE_MIN_RADIUS = 160
+PLATE_MAX_RADIUS = 180
+
+
+def detect_plate(frame: np.ndarray, offset: tuple = (0, 0), scale: float = 1.0) -> Optional[tuple]:
+    """
+    Detect a weight plate with circle detection (HoughCircles).
+
+    With a scale below 1, the search runs on a downsampled grayscale image with proportionally smaller
+    radii, which is much faster and loses about a pixel of accuracy per halving.
+
+    :param frame: BGR image, or a region of interest cut out of the frame
+    :param offset: Position (x, y) of the image within the full frame
+    :param scale: Scale of the grayscale image searched for the plate
+    :return: A tuple (x, y) with the plate center in frame coordinates, or None if not found
+    """
+    # Convert the frame to grayscale
+    gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    if scale != 1:
+        gray_frame = cv2.resize(gray_frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    # Apply GaussianBlur to reduce noise
+    kernel_size = max(3, int(round(9 * scale)) | 1)
+    blurred_frame = cv2.GaussianBlur(gray_frame, (kernel_size, kernel_size), 2 * scale)
+
+    # Use HoughCircles to detect circular objects (weight plates)
+    circles = cv2.HoughCircles(
+        blurred_frame,
+        cv2.HOUGH_GRADIENT,
+        dp=1.2,
+        minDist=max(1, 50 * scale),
+        param1=50,
+        param2=30,
+        minRadius=int(PLATE_MIN_RADIUS * scale),
+        maxRadius=int(np.ceil(PLATE_MAX_RADIUS * scale))
+    )
+
+    if circles is None:
+        return None
+
+    # Convert circle parameters to integers in the coordinates of the frame
+    circles = np.round(circles[0, :] / scale).astype(int)
+    return circles[0][0] + offset[0], circles[0][1] + offset[1]
+
+
+class RoiBarbellTracker:
+    """
+    Tracks the barbell by searching only a region of interest around the last detected plate center.
+
+    The region is sized by the plate radius and the recent plate motion, so the cost of a search
+    scales with the plate size instead of the frame size. When the plate is not found in the region,
+    the frame is searched completely.
+    """
+
+    def __init__(self, margin: int = 20, motion_factor: float = 2.0, motion_history: int = 5, scale: float = 1.0):
+        """
+        Initialize the RoiBarbellTracker class.
+        :param margin: Pixels added around the plate on top of the expected motion
+        :param motion_factor: Multiple of the recent per-frame motion added to the search region
+        :param motion_history: Number of recent plate movements used to estimate the motion
+        :param scale: Scale of the grayscale image searched for the plate
+        """
+        self.margin = margin
+        self.motion_factor = motion_factor
+        self.scale = scale
+        self.last_center = None
+        self.movements = deque(maxlen=motion_history)
+
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+
+    @property
+    def stats(self) -> dict:
+        """
+        Counts of region searches that found the plate (hits), did not find it (misses),
+        and full-frame searches (fallbacks).
+        """
+        return {"hits": self.hits, "misses": self.misses, "fallbacks": self.fallbacks}
+
+    def get_search_region(self, frame_shape: tuple) -> tuple:
+        """
+        Computes the region of interest around the last plate center.
+
+        :param frame_shape: Shape of the frame
+        :return: Region (x_start, y_start, x_end, y_end) clipped to the frame
+        """
+        motion = max(self.movements, default=0)
+        half_size = int(PLATE_MAX_RADIUS + self.margin + self.motion_factor * motion)
+        x, y = self.last_center
+        return (max(0, x - half_size), max(0, y - half_size),
+                min(frame_shape[1], x + half_size), min(frame_shape[0], y + half_size))
+
+    def _update(self, center: Optional[tuple]):
+        if center is not None and self.last_center is not None:
+            self.movements.append(max(abs(center[0] - self.last_center[0]), abs(center[1] - self.last_center[1])))
+        if center is None:
+            self.movements.clear()
+        self.last_center = center
+
+    def detect(self, frame: np.ndarray) -> Optional[tuple]:
+        """
+        Detects the barbell in the next frame.
+
+        :param frame: The frame
+        :return: A tuple (x, y) with the barbell's center, or None if not found
+        """
+        if self.last_center is not None:
+            x_start, y_start, x_end, y_end = self.get_search_region(frame.shape)
+            center = detect_plate(frame[y_start:y_end, x_start:x_end], offset=(x_start, y_start), scale=self.scale)
+            if center is not None:
+                self.hits += 1
+                self._update(center)
+                return center
+            self.misses += 1
+
+        self.fallbacks += 1
+        center = detect_plate(frame, scale=self.scale)
+        self._update(center)
+        return center
+
+
+class PredictiveBarbellTracker:
+    """
+    Tracks the barbell with a constant-velocity Kalman filter and runs plate detection only every few frames.
+
+    In between detections the position is predicted, so the bar path stays continuous. A detection is
+    forced earlier when the position uncertainty of the prediction grows too large. Detections search a
+    region of interest around the predicted position and fall back to the full frame.
+    """
+
+    def __init__(self, detection_interval: int = 5, max_position_std: float = 15.0,
+                 max_prediction_frames: int = 30, process_noise: float = 1.0, measurement_noise: float = 4.0,
+                 scale: float = 1.0):
+        """
+        Initialize the PredictiveBarbellTracker class.
+        :param detection_interval: Number of frames between two plate detections
+        :param max_position_std: Standard deviation in pixels of the predicted position that forces a detection
+        :param max_prediction_frames: Number of frames without a detection after which the plate is lost
+        :param process_noise: Process noise of the Kalman filter
+        :param measurement_noise: Measurement noise of the Kalman filter
+        :param scale: Scale of the grayscale image searched for the plate
+        """
+        if detection_interval < 1:
+            raise ValueError("Detection interval must be at least 1")
+
+        self.detection_interval = detection_interval
+        self.max_position_std = max_position_std
+        self.max_prediction_frames = max_prediction_frames
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+
+        # The region is centered on the prediction, so the recent motion doesn't need to be added
+        self.detector = RoiBarbellTracker(margin=40, motion_factor=0, scale=scale)
+        self.kalman = None
+        self.frames_since_detection = 0
+        self.frames_since_attempt = 0
+
+        self.detections = 0
+        self.predictions = 0
+        self.lost = 0
+
+    @property
+    def stats(self) -> dict:
+        """
+        Counts of frames with a plate detection, frames answered by the prediction, and times the plate was lost,
+        plus the counts of the underlying region tracker.
+        """
+        return {"detections": self.detections, "predictions": self.predictions, "lost": self.lost,
+                **self.detector.stats}
+
+    def _create_filter(self, center: tuple) -> cv2.KalmanFilter:
+        """
+        Creates a Kalman filter with the state (x, y, vx, vy), starting at rest at the given center.
+
+        :param center: The detected plate center
+        :return: The Kalman filter
+        """
+        kalman = cv2.KalmanFilter(4, 2)
+        kalman.transitionMatrix = np.array([[1, 0, 1, 0],
+                                            [0, 1, 0, 1],
+                                            [0, 0, 1, 0],
+                                            [0, 0, 0, 1]], np.float32)
+        kalman.measurementMatrix = np.eye(2, 4, dtype=np.float32)
+        kalman.processNoiseCov = np.eye(4, dtype=np.float32) * self.process_noise
+        kalman.measurementNoiseCov = np.eye(2, dtype=np.float32) * self.measurement_noise
+        kalman.errorCovPost = np.diag([self.measurement_noise, self.measurement_noise, 100, 100]).astype(np.float32)
+        kalman.statePost = np.array([[center[0]], [center[1]], [0], [0]], np.float32)
+        return kalman
+
+    def _detect(self, frame: np.ndarray, predicted_center: Optional[tuple]) -> Optional[tuple]:
+        self.detections += 1
+        self.frames_since_attempt = 0
+        self.detector.last_center = predicted_center
+        return self.detector.detect(frame)
+
+    def detect(self, frame: np.ndarray) -> Optional[tuple]:
+        """
+        Returns the barbell position in the next frame, detected or predicted.
+
+        :param frame: The frame
+        :return: A tuple (x, y) with the barbell's center, or None if the plate is not tracked
+        """
+        if self.kalman is None:
+            center = self._detect(frame, None)
+            if center is not None:
+                self.kalman = self._create_filter(center)
+                self.frames_since_detection = 0
+            return center
+
+        prediction = self.kalman.predict()
+        self.frames_since_detection += 1
+        self.frames_since_attempt += 1
+        height, width = frame.shape[:2]
+        predicted_center = (int(np.clip(prediction[0, 0], 0, width - 1)), int(np.clip(prediction[1, 0], 0, height - 1)))
+
+        if self.frames_since_attempt < self.frames_since_detection:
+            # A detection failed since the last hit, e.g. the plate is occluded; only retry every interval
+            due = self.frames_since_attempt >= self.detection_interval
+        else:
+            position_std = float(np.sqrt(max(self.kalman.errorCovPre[0, 0], self.kalman.errorCovPre[1, 1])))
+            due = self.frames_since_detection >= self.detection_interval or position_std > self.max_position_std
+        if due:
+            center = self._detect(frame, predicted_center)
+            if center is not None:
+                self.kalman.correct(np.array([[center[0]], [center[1]]], np.float32))
+                self.frames_since_detection = 0
+                return center
+
+        if self.frames_since_detection > self.max_prediction_frames:
+            self.lost += 1
+            self.kalman = None
+            return None
+
+        self.predictions += 1
+        return predicted_center
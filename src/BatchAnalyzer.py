@@ -0,0 +1,222 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv", ".m4v")
+
+# FrameHandler of the current worker process, created on its first video and reused afterwards
+_frame_handler = None
+
+
+def collect_videos(source: str) -> list[str]:
+    """
+    Collects the videos to analyze from a directory or a manifest file.
+
+    :param source: Directory containing videos, or a text file with one video path per line
+    :return: Sorted list of video paths
+    """
+    source_path = Path(source)
+    if source_path.is_dir():
+        return sorted(str(path) for path in source_path.iterdir()
+                      if path.suffix.lower() in VIDEO_EXTENSIONS)
+
+    videos = []
+    with open(source_path) as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            # Relative paths in a manifest are resolved against the manifest's directory
+            video_path = Path(line)
+            if not video_path.is_absolute():
+                video_path = source_path.parent / video_path
+            videos.append(str(video_path))
+    return videos
+
+
+def get_output_names(videos: list[str]) -> list[str]:
+    """
+    Names the result files of every video after the video file, numbering videos with the same name.
+
+    :param videos: Paths of the videos
+    :return: Base name of the result files of every video, in the same order
+    """
+    names = []
+    used = set()
+    for video in videos:
+        stem = name = Path(video).stem
+        number = 1
+        # Compared case-insensitively so names don't collide on case-insensitive file systems either
+        while name.lower() in used:
+            number += 1
+            name = f"{stem}_{number}"
+        used.add(name.lower())
+        names.append(name)
+    return names
+
+
+def init_worker():
+    """
+    Initializes a worker process.
+    """
+    import cv2
+
+    # One worker per core; OpenCV's own thread pool would only oversubscribe the CPUs
+    cv2.setNumThreads(1)
+
+
+def get_worker_frame_handler(video_path: str, output_path: str, scale: float):
+    """
+    Returns the FrameHandler of this worker process opened on the given video.
+
+    :param video_path: The path to the video file
+    :param output_path: The path of the annotated output video
+    :param scale: The scale of the image
+    :return: FrameHandler ready to analyze the video
+    """
+    global _frame_handler
+    from src.ImageHandler import FrameHandler
+
+    if _frame_handler is None:
+        _frame_handler = FrameHandler(video_path, "FormCoachAI", scale=scale, headless=True, output_path=output_path)
+    else:
+        _frame_handler.scale = scale
+        _frame_handler.open_video(video_path, output_path)
+    return _frame_handler
+
+
+def analyze_video(video_path: str, output_dir: str, scale: float = 1, metrics_format: str = None,
+                  progress=None, active_windows: bool = False, name: str = None, on_rep=None) -> dict:
+    """
+    Analyzes a single video in a worker process and writes its result files.
+
+    Writes the annotated video and a JSON file with the run statistics and reps to the output directory.
+    With a metrics format, the per-frame metrics are written instead of the annotated video.
+
+    :param video_path: The path to the video file
+    :param output_dir: Directory for the result files
+    :param scale: The scale of the image
+    :param metrics_format: File format of the per-frame metrics (csv, parquet or npy), or None for a video
+    :param progress: Called with the number of analyzed frames after every frame; returning False stops the run
+    :param active_windows: Only analyze the windows with motion found by a fast first pass; the windows are
+        saved to the output directory, so later runs skip the first pass
+    :param name: Base name of the result files, defaults to the file name of the video without its extension
+    :param on_rep: Called with the RepRecord of every rep as soon as it is completed
+    :return: Result of the video including its statistics or the error that occurred
+    """
+    stem = name or Path(video_path).stem
+    if metrics_format is None:
+        output_path = os.path.join(output_dir, f"{stem}_analyzed.mp4")
+        metrics_path = None
+    else:
+        output_path = None
+        metrics_path = os.path.join(output_dir, f"{stem}_metrics.{metrics_format}")
+    result_path = os.path.join(output_dir, f"{stem}.json")
+    result = {"video": video_path, "output": output_path or metrics_path, "worker": os.getpid()}
+
+    try:
+        frame_handler = get_worker_frame_handler(video_path, output_path, scale)
+        if not frame_handler.cap.isOpened():
+            raise IOError(f"Cannot open video {video_path}")
+        windows = None
+        if active_windows:
+            from src.ActiveWindows import ActiveWindowDetector
+
+            windows_path = os.path.join(output_dir, f"{stem}_windows.json")
+            windows = ActiveWindowDetector().get_windows(video_path, windows_path)
+        result["stats"] = frame_handler.run_video_analysis(metrics_path=metrics_path, progress=progress,
+                                                           windows=windows, on_rep=on_rep)
+        result["output"] = result["stats"].get("metrics", result["output"])
+        result["reps"] = result["stats"]["reps"].pop("records")
+    except Exception as error:
+        result["error"] = f"{type(error).__name__}: {error}"
+        result["traceback"] = traceback.format_exc()
+
+    with open(result_path, "w") as result_file:
+        json.dump(result, result_file, indent=2)
+    return result
+
+
+def run_batch(videos: list[str], output_dir: str, workers: int = None, scale: float = 1,
+              metrics_format: str = None, active_windows: bool = False) -> dict:
+    """
+    Analyzes several videos in parallel on a pool of worker processes.
+
+    Every worker keeps one FrameHandler with its MediaPipe Pose model for all videos it processes.
+    Videos with the same file name get numbered result files, e.g. squat.json and squat_2.json.
+
+    :param videos: Paths of the videos to analyze
+    :param output_dir: Directory for the per-video result files and the summary
+    :param workers: Number of worker processes, defaults to the number of CPUs
+    :param scale: The scale of the image
+    :param metrics_format: File format of the per-frame metrics written instead of annotated videos
+    :param active_windows: Only analyze the windows of every video in which a set happens
+    :return: Summary of throughput and failures
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    results = []
+    start_time = time.perf_counter()
+    # Spawned workers don't inherit OpenCV/MediaPipe threads of the parent process
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker) as executor:
+        futures = {executor.submit(analyze_video, video, output_dir, scale, metrics_format,
+                                   active_windows=active_windows, name=name): video
+                   for video, name in zip(videos, get_output_names(videos))}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as error:
+                # A crashed worker breaks the pool; its video and all unfinished ones are recorded as failed
+                result = {"video": futures[future], "error": f"{type(error).__name__}: {error}"}
+            results.append(result)
+            status = "failed" if "error" in result else f"{result['stats']['fps']:.1f} fps, {len(result['reps'])} reps"
+            print(f"[{len(results)}/{len(videos)}] {result['video']}: {status}")
+    elapsed = time.perf_counter() - start_time
+
+    failures = [{"video": result["video"], "error": result["error"]} for result in results if "error" in result]
+    total_frames = sum(result["stats"]["frames"] for result in results if "stats" in result)
+    summary = {
+        "videos": len(videos),
+        "succeeded": len(videos) - len(failures),
+        "failed": len(failures),
+        "workers": workers,
+        "frames": total_frames,
+        "seconds": elapsed,
+        "fps": total_frames / elapsed if elapsed > 0 else 0.0,
+        "videos_per_minute": len(videos) / elapsed * 60 if elapsed > 0 else 0.0,
+        "failures": failures,
+    }
+    with open(os.path.join(output_dir, "summary.json"), "w") as summary_file:
+        json.dump(summary, summary_file, indent=2)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a directory or manifest of squat videos in parallel.")
+    parser.add_argument("source", help="Directory of videos or manifest file with one video path per line")
+    parser.add_argument("output_dir", help="Directory for the annotated videos and result files")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--scale", type=float, default=1, help="Scale of the analyzed frames")
+    parser.add_argument("--metrics", choices=["csv", "parquet", "npy"], default=None,
+                        help="Only analyze and write the per-frame metrics in this format instead of annotated videos")
+    parser.add_argument("--active-windows", action="store_true",
+                        help="Find the windows in which a set happens in a fast first pass and only analyze those")
+    args = parser.parse_args()
+
+    summary = run_batch(collect_videos(args.source), args.output_dir, args.workers, args.scale, args.metrics,
+                        args.active_windows)
+    print(f"Analyzed {summary['succeeded']}/{summary['videos']} videos with {summary['workers']} workers: "
+          f"{summary['frames']} frames in {summary['seconds']:.1f}s ({summary['fps']:.1f} fps)")
+    for failure in summary["failures"]:
+        print(f"Failed: {failure['video']}: {failure['error']}")
+
+
+if __name__ == "__main__":
+    main()
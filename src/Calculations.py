@@ -1,4 +1,5 @@
 import math
+import numpy as np
 
 
 def calculate_three_point_angle(a: tuple, b: tuple, c: tuple):
@@ -67,3 +68,54 @@ def calculate_distance(a, b):
     Calculate the distance between two points.
     """
     return abs(math.sqrt((b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2))
+
+
+def calculate_three_point_angles(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """
+    Vectorized version of calculate_three_point_angle for a series of points.
+
+    Args:
+        a (np.ndarray): Coordinates of points A, shape (N, 2)
+        b (np.ndarray): Coordinates of points B, shape (N, 2)
+        c (np.ndarray): Coordinates of points C, shape (N, 2)
+
+    Returns:
+        np.ndarray: The angles in degrees, shape (N,). NaN where BA or BC has zero length.
+    """
+    a, b, c = (np.asarray(point, np.float64) for point in (a, b, c))
+
+    # Calculate vectors BA and BC
+    ba = a - b
+    bc = c - b
+
+    # Calculate the dot products and magnitudes of BA and BC
+    dot_product = ba[:, 0] * bc[:, 0] + ba[:, 1] * bc[:, 1]
+    magnitude_product = np.sqrt(ba[:, 0] ** 2 + ba[:, 1] ** 2) * np.sqrt(bc[:, 0] ** 2 + bc[:, 1] ** 2)
+
+    # Zero length vectors have no angle; mark them as NaN instead of raising
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cos_theta = np.where(magnitude_product == 0, np.nan, dot_product / magnitude_product)
+
+    # Clamp the values to avoid domain errors due to floating-point precision
+    return np.degrees(np.arccos(np.clip(cos_theta, -1, 1)))
+
+
+def calculate_two_point_angles(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Vectorized version of calculate_two_point_angle for a series of points.
+
+    :param a: First points, shape (N, 2)
+    :param b: Second points, shape (N, 2)
+    :return: Angles in degrees rounded like the scalar version, shape (N,); 0 where the points are equal
+    """
+    a, b = np.asarray(a, np.float64), np.asarray(b, np.float64)
+    # atan2(0, 0) is 0, which matches the scalar handling of equal points
+    return np.round(np.degrees(np.arctan2(b[:, 1] - a[:, 1], b[:, 0] - a[:, 0])))
+
+
+def calculate_distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Vectorized version of calculate_distance for a series of points, shape (N, 2) each.
+    """
+    a, b = np.asarray(a, np.float64), np.asarray(b, np.float64)
+    return np.sqrt((b[:, 0] - a[:, 0]) ** 2 + (b[:, 1] - a[:, 1]) ** 2)
@@ -1,53 +1,382 @@
+import dataclasses
+import os
+import time
+import warnings
 import cv2
 import numpy as np
-import mediapipe as mp
-from src.MovementPatterns import SquatPose
-from src.MovementDrawings import SquatDrawings
+from src.MovementPatterns import SquatPose, FrameAnalysis, landmarks_to_array
+from src.MovementDrawings import SquatDrawings, BarPathLayer, get_line_thickness
 from src.Calculations import calculate_three_point_angle, calculate_two_point_angle
+from src.Pipeline import FramePipeline
+from src.BarbellTracking import RoiBarbellTracker, PredictiveBarbellTracker, detect_plate
+from src.PoseStride import AdaptivePoseStride
+from src.LandmarkCache import LandmarkCache
+from src.TrajectoryStore import TrajectoryStore
+from src.RepSegmenter import RepSegmenter
+from src.ViewClassifier import ViewClassifier
+from src.StaticFrameFilter import StaticFrameFilter
+from src.MetricsWriter import MetricsWriter
+from src.Instrumentation import Instrumentation
+from src.LiveCapture import LiveCapture
+from src.PosePool import get_pose_pool
+from src.QualityController import QualityController, QUALITY_LEVELS, DEFAULT_QUALITY_LEVEL
+
+# Positions of the side panels next to side angle frames
+PANEL_POSITIONS = ("Top", "Middle", "Bottom")
 
 
 class FrameHandler:
-    def __init__(self, file_path: str, window_name: str, scale: float = 1):
+    def __init__(self, file_path: str, window_name: str, scale: float = 1,
+                 headless: bool = False, output_path: str = None, barbell_mode: str = "full",
+                 max_pose_stride: int = 1, pose_config: dict = None, cache_dir: str = None,
+                 bar_path_fade: int = None, bar_path_window: int = None, bar_path_tolerance: float = 0.0,
+                 instrument: bool = False, live: bool = False, max_latency: float = None, max_fps: float = None,
+                 pose_width: int = None, barbell_scale: float = 1, inference_budget: float = None,
+                 quality_levels: tuple = None, static_filter: dict = None):
         """
         Initialize the FrameHandler class.
-        :param file_path: The path to the video file
+        :param file_path: The path to the video file, or the index or URL of a camera in live mode
         :param window_name: The name of the window
-        :param scale: The scale of the image
+        :param scale: The scale of the analyzed and rendered frames
+        :param headless: Skip all HighGUI calls and write the processed frames to output_path instead
+        :param output_path: The path of the annotated output video; headless runs without one only analyze
+        :param barbell_mode: Barbell detection: "full" searches every frame completely,
+            "roi" only searches around the last detected plate,
+            "predictive" detects every few frames and predicts the plate position in between
+        :param max_pose_stride: Maximum number of frames between two pose inferences while the lifter barely
+            moves; 1 runs inference on every frame
+        :param pose_config: Keyword arguments for the Mediapipe Pose model
+        :param cache_dir: Directory of the landmark cache; cached videos are analyzed without inference
+        :param bar_path_fade: Number of barbell detections after which a bar path segment has faded out
+        :param bar_path_window: Number of most recent barbell detections kept in the bar path
+        :param bar_path_tolerance: Distance in pixels within which the recorded barbell trajectory is simplified
+        :param instrument: Record stage latencies, frame counters and the memory high-water mark
+        :param live: Capture on a separate thread and always analyze the newest frame, dropping stale ones;
+            video files are played back at their real frame rate
+        :param max_latency: Live latency budget in seconds from capture to display
+        :param max_fps: Maximum number of frames analyzed per second in live mode
+        :param pose_width: Width in pixels of the frames given to pose inference, e.g. 256 to 480; the landmarks are
+            normalized, so joint coordinates are still computed at the scaled frame size. None infers on the scaled frame
+        :param barbell_scale: Scale of the grayscale image searched for the barbell, relative to the scaled frame;
+            the detected position is mapped back to the scaled frame
+        :param inference_budget: Pose inference latency budget in seconds per frame; the model complexity, pose_width
+            and confidences are switched between the quality levels to stay within it
+        :param quality_levels: Pose settings from the highest to the lowest quality used with an inference budget,
+            see QUALITY_LEVELS; they override pose_width and the matching pose_config entries
+        :param static_filter: Keyword arguments for the StaticFrameFilter that reuses the analysis of the last analyzed
+            frame on frames that barely differ from it; None analyzes every frame
+        """
+        if barbell_mode not in ("full", "roi", "predictive"):
+            raise ValueError(f"Invalid barbell mode {barbell_mode}")
+        if live and cache_dir is not None:
+            raise ValueError("Live sources cannot be cached")
+
+        self.scale = scale
+        self.pose_width = pose_width
+        self.pose_size = None
+        self.barbell_scale = barbell_scale
+        self.barbell_mode = barbell_mode
+        self.barbell_tracker = None
+        self.max_pose_stride = max_pose_stride
+        self.pose_stride = None
+        self.pose_config = pose_config or {}
+        self._base_pose_config = self.pose_config
+        self.inference_budget = inference_budget
+        self.quality_levels = quality_levels or QUALITY_LEVELS
+        self.quality_controller = None
+        self._pose = None
+        self._pooled_pose = None
+        self.cache_dir = cache_dir
+        self.landmark_cache = None
+        self.bar_path_fade = bar_path_fade
+        self.bar_path_window = bar_path_window
+        self.trajectory = TrajectoryStore(tolerance=bar_path_tolerance)
+        self.rep_segmenter = None
+        self.view_classifier = None
+        self.static_filter_config = static_filter
+        self.static_filter = None
+        self._last_analysis = None
+        self._last_bar_coords = None
+        # First frames of the ranges of the current run; the analysis isn't reused across a seek
+        self._range_starts = set()
+        self.instrumentation = None
+        self.live = live
+        self.max_latency = max_latency
+        self.max_fps = max_fps
+        self.live_capture = None
+        self.window_name = window_name
+        self.headless = headless
+        self.cap = None
+        self.writer = None
+        self._output_frame = None
+        self._panel_layers = {}
+        self._panel_views = {}
+        self._panel_drawings = {}
+        self.open_video(file_path, output_path)
+
+        # Initialize window
+        if not self.headless:
+            cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
+            cv2.resizeWindow(window_name, self.width, self.height)
+
+        if instrument:
+            self.enable_instrumentation()
+
+    @property
+    def pose(self):
+        """
+        The Mediapipe Pose model, taken from the process-wide pool on first use; cached videos never load it.
+        """
+        if self._pose is None:
+            self._pose = self._pooled_pose = get_pose_pool().acquire(self.pose_config)
+        return self._pose
+
+    @pose.setter
+    def pose(self, pose):
+        self._pose = pose
+
+    def warm_up(self):
+        """
+        Loads the Pose model and initializes its inference graph, so the first analyzed frame is not slower than the rest.
+        """
+        if self._pose is None:
+            get_pose_pool().warm_up(self.pose_config)
+            self._pose = self._pooled_pose = get_pose_pool().acquire(self.pose_config)
+        else:
+            get_pose_pool().warm(self._pose)
+
+    def close(self):
+        """
+        Releases the video and output writer and returns the Pose model to the pool for the next FrameHandler.
+        """
+        if self.cap is not None:
+            self.cap.release()
+        self._release_writer()
+        self._release_pose()
+
+    def _release_writer(self):
+        """
+        Finishes the output video, so the next run writes a new one.
+        """
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+    def _release_pose(self) -> bool:
+        """
+        Returns the Pose model to the pool if it was taken from there.
+
+        :return: False if the Pose was set from outside and is kept.
+        """
+        if self._pooled_pose is None or self._pose is not self._pooled_pose:
+            return False
+        get_pose_pool().release(self._pooled_pose, self.pose_config)
+        self._pose = self._pooled_pose = None
+        return True
+
+    def enable_instrumentation(self, labels: dict = None) -> Instrumentation:
+        """
+        Turns on instrumentation by wrapping the stage methods of this instance with timers.
+
+        Stages: decode (read and resize), pose (inference), squat_pose (SquatPose and angles),
+        barbell, render and emit (display or write). Without instrumentation nothing is wrapped.
+
+        :param labels: Prometheus labels added to every metric.
+        :return: The instrumentation, which keeps accumulating over all runs of this FrameHandler.
+        """
+        if self.instrumentation is None:
+            instrumentation = Instrumentation(labels)
+            self.read_frames = instrumentation.timed_generator("decode", self.read_frames)
+            self._infer_landmarks = instrumentation.timed("pose", self._infer_landmarks)
+            self.analyze_landmarks = instrumentation.timed("squat_pose", self.analyze_landmarks)
+            self.detect_barbell = instrumentation.timed("barbell", self.detect_barbell)
+            self.render_frame = instrumentation.timed("render", self.render_frame)
+            self._emit_frame = instrumentation.timed("emit", self._emit_frame)
+            self.instrumentation = instrumentation
+        return self.instrumentation
+
+    def open_video(self, file_path: str, output_path: str = None):
+        """
+        Opens a video for analysis, so one FrameHandler and its Pose model can be reused for several videos.
+
+        :param file_path: The path to the video file
+        :param output_path: The path of the annotated output video; headless runs without one only analyze
         """
+        if self.cap is not None:
+            self.cap.release()
+            # Drop the tracking state of the previous video; a pooled Pose is reset by the pool in the background
+            if not self._release_pose() and self._pose is not None:
+                self._pose.reset()
+        self._release_writer()
+
         self.file_path = file_path
+        self.output_path = output_path
         self.cap = cv2.VideoCapture(file_path)
-        self.scale = scale
+        match self.barbell_mode:
+            case "roi":
+                self.barbell_tracker = RoiBarbellTracker(scale=self.barbell_scale)
+            case "predictive":
+                self.barbell_tracker = PredictiveBarbellTracker(scale=self.barbell_scale)
+        if self.max_pose_stride > 1:
+            self.pose_stride = AdaptivePoseStride(self.max_pose_stride)
+        self.view_classifier = ViewClassifier(threshold=0.3)
+        if self.static_filter_config is not None:
+            self.static_filter = StaticFrameFilter(**self.static_filter_config)
+        self._last_analysis = None
+        self._last_bar_coords = None
 
         # Video dimensions
-        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH) * scale)
-        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT) * scale)
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH) * self.scale)
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT) * self.scale)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
+        self.quality_controller = None
+        if self.inference_budget is not None:
+            # Every video starts again at the default quality
+            self.quality_controller = QualityController(
+                self.inference_budget, self.quality_levels, min(DEFAULT_QUALITY_LEVEL, len(self.quality_levels) - 1))
+            self._apply_quality_settings(self.quality_controller.settings)
+        else:
+            self._update_pose_size()
+
+        if self.live:
+            # Files stand in for a camera by playing back at their real frame rate
+            self.live_capture = LiveCapture(self.cap, realtime=isinstance(file_path, str) and os.path.isfile(file_path),
+                                            fps=self.fps, max_latency=self.max_latency, max_fps=self.max_fps)
+
+        self.landmark_cache = None
+        if self.cache_dir is not None:
+            self.landmark_cache = LandmarkCache(self.cache_dir, file_path, self._get_cache_config())
+            self.landmark_cache.load()
+
+    def _update_pose_size(self):
+        """
+        Computes the pose inference resolution from pose_width, keeping the aspect ratio of the scaled frame.
+        """
+        self.pose_size = None
+        if self.pose_width is not None and 0 < self.pose_width < self.width:
+            self.pose_size = (self.pose_width, max(1, round(self.height * self.pose_width / self.width)))
 
-        # Initialize window
-        cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
-        cv2.resizeWindow(window_name, self.width, self.height)
+    def _apply_quality_settings(self, settings: dict):
+        """
+        Switches the pose inference to the settings of a quality level; a Pose model with a different configuration
+        goes back to the pool and the next inference takes one with the new configuration.
+
+        :param settings: Pose keyword arguments and pose_width of the level
+        """
+        pose_config = dict(settings)
+        self.pose_width = pose_config.pop("pose_width", None)
+        pose_config = {**self._base_pose_config, **pose_config}
+        if pose_config != self.pose_config:
+            self._release_pose()
+            self.pose_config = pose_config
+        self._update_pose_size()
+
+    def _control_quality(self, frame_index: int, seconds: float):
+        """
+        Reports an inference latency to the quality controller and switches to the level it asks for.
+
+        :param frame_index: Index of the frame in the video.
+        :param seconds: Latency of the pose inference.
+        """
+        level = self.quality_controller.observe(frame_index, seconds)
+        if level is None:
+            return
+        self._apply_quality_settings(self.quality_controller.levels[level])
+        try:
+            # Load the model now, so a level whose model can't be loaded is excluded before the next frame
+            self.pose
+        except (OSError, RuntimeError) as error:
+            warnings.warn(f"Pose quality level {level} is not available: {error}")
+            self.quality_controller.mark_unavailable(level)
+            self._apply_quality_settings(self.quality_controller.settings)
+            return
+        self.quality_controller.switch(level, frame_index + 1)
+
+    def _get_cache_config(self) -> dict:
+        """
+        Collects the settings that change the landmarks and barbell detections of a video.
 
-        # Initialize Mediapipe Pose
-        self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose()
+        :return: Settings identifying a landmark cache entry.
+        """
+        return {
+            "pose": self.pose_config,
+            "resolution": [self.width, self.height],
+            "pose_resolution": list(self.pose_size) if self.pose_size is not None else None,
+            "barbell_scale": self.barbell_scale,
+            "max_pose_stride": self.max_pose_stride,
+            "barbell_mode": self.barbell_mode,
+            "inference_budget": self.inference_budget,
+            "static_filter": self.static_filter_config,
+        }
 
     def add_images_to_frame(self, frame: np.ndarray, args: tuple) -> np.ndarray:
         """
         Adds three vertically stacked blank images with information to the right of the frame.
 
+        The output frame is allocated once per resolution and reused for every frame. Panel backgrounds,
+        borders and headers are rendered once and copied in; only the squat information is drawn per frame.
+
         :param frame: The original frame.
         :param args: Additional arguments for squat analysis.
-        :return: Updated frame with additional images.
+        :return: Updated frame with additional images; valid until the next call.
+        """
+        blank_width = self._get_blank_image_dimensions()[1]
+        if self._output_frame is None or self._output_frame.shape[:2] != (self.height, self.width + blank_width):
+            self._build_panel_layers()
+
+        self._output_frame[:, :self.width] = frame
+        for position in PANEL_POSITIONS:
+            self._panel_views[position][:] = self._get_panel_layer(position, self._get_panel_header(position, args))
+            self._draw_squat_info(self._panel_drawings[position], position, args, header=False)
+
+        return self._output_frame
+
+    def _build_panel_layers(self):
+        """
+        Allocates the output frame for the current resolution and binds a SquatDrawings instance to the view of every panel.
+        """
+        blank_height, blank_width = self._get_blank_image_dimensions()
+        self._output_frame = np.zeros((self.height, self.width + blank_width, 3), np.uint8)
+        self._panel_layers = {}
+        self._panel_views = {}
+        self._panel_drawings = {}
+        for position in PANEL_POSITIONS:
+            y_start, y_end = self._get_position_coordinates(position, blank_height)
+            panel = self._output_frame[y_start:y_end, self.width:self.width + blank_width]
+            self._panel_views[position] = panel
+            self._panel_drawings[position] = SquatDrawings(image=panel, height=self.height, width=self.width)
+
+    def _get_panel_layer(self, position: str, header: str) -> np.ndarray:
         """
-        new_width = self.width + self._get_blank_image_dimensions()[1]
-        new_frame = np.zeros((self.height, new_width, 3), np.uint8)
-        new_frame[:, :self.width] = frame
+        Returns the static layer of a panel: the bordered background with its header, rendered on first use.
 
-        positions = ["Top", "Middle", "Bottom"]
-        for position in positions:
-            blank_image = self._create_blank_image_with_border(1)
-            new_frame = self._add_positioned_image(new_frame, blank_image, position, args)
+        :param position: Position (Top, Middle, Bottom).
+        :param header: Header text of the panel.
+        :return: The static panel layer.
+        """
+        layer = self._panel_layers.get((position, header))
+        if layer is None:
+            layer = self._create_blank_image_with_border(1)
+            SquatDrawings(image=layer, height=self.height, width=self.width).draw_header(header)
+            self._panel_layers[(position, header)] = layer
+        return layer
+
+    @staticmethod
+    def _get_panel_header(position: str, args: tuple) -> str:
+        """
+        Returns the header text of a panel.
 
-        return new_frame
+        :param position: Position (Top, Middle, Bottom).
+        :param args: Additional arguments for squat analysis.
+        :return: The header text.
+        """
+        match position:
+            case "Top":
+                return f"Camera Angle: {args[0]}"
+            case "Middle":
+                return "Bar Path"
+            case "Bottom":
+                return "Balance Points"
 
     def _create_blank_image_with_border(self, border_size: int) -> np.ndarray:
         """
@@ -75,25 +404,6 @@ class FrameHandler:
         """
         return self.height // 3, self.width // 3
 
-    def _add_positioned_image(self, frame: np.ndarray, image: np.ndarray, position: str, args: tuple) -> np.ndarray:
-        """
-        Adds a blank image with information at a specific position.
-
-        :param frame: Original frame.
-        :param image: Image to add.
-        :param position: Position (Top, Middle, Bottom).
-        :param args: Additional arguments for squat analysis.
-        :return: Updated frame.
-        """
-        y_start, y_end = self._get_position_coordinates(position, image.shape[0])
-        x_start, x_end = self.width, self.width + image.shape[1]
-
-        squat_drawings = SquatDrawings(image=image, height=self.height, width=self.width)
-        self._draw_squat_info(squat_drawings, position, args)
-
-        frame[y_start:y_end, x_start:x_end] = image
-        return frame
-
     def _get_position_coordinates(self, position: str, image_height: int) -> tuple:
         """
         Computes Y-coordinates for a specific position.
@@ -111,25 +421,26 @@ class FrameHandler:
             case "Bottom":
                 return self.height - image_height, self.height
 
-    def _draw_squat_info(self, drawings: SquatDrawings, position: str, args: tuple):
+    def _draw_squat_info(self, drawings: SquatDrawings, position: str, args: tuple, header: bool = True):
         """
         Draws squat information on the provided blank image.
 
         :param drawings: SquatDrawings instance.
         :param position: Position (Top, Middle, Bottom).
         :param args: Additional arguments for drawing.
+        :param header: Draw the header text of the panel.
         """
         match position:
             case "Top":
                 drawings.draw_side_angle_squat(
                     camera_angle=args[0], hip=args[1], knee=args[2], ankle=args[3],
                     shoulder=args[4], feet=args[5], knee_angle=args[6],
-                    hip_angle=args[7], shin_angle=args[8], scale=0.3
+                    hip_angle=args[7], shin_angle=args[8], scale=0.3, header=header
                 )
             case "Middle":
-                drawings.draw_bar_path(args[9])
+                drawings.draw_bar_path(args[9], header=header)
             case "Bottom":
-                drawings.draw_balance(args[4], args[5], scale=0.3)
+                drawings.draw_balance(args[4], args[5], scale=0.3, header=header)
 
     def get_barbell_coordinates(self, frame: np.ndarray) -> tuple:
         """
@@ -140,93 +451,371 @@ class FrameHandler:
 
         :return: A tuple (x, y) representing the coordinates of the barbell's center, or None if not found.
         """
-        # Convert the frame to grayscale
-        gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-        # Apply GaussianBlur to reduce noise
-        blurred_frame = cv2.GaussianBlur(gray_frame, (9, 9), 2)
-
-        # Use HoughCircles to detect circular objects (weight plates)
-        circles = cv2.HoughCircles(
-            blurred_frame,
-            cv2.HOUGH_GRADIENT,
-            dp=1.2,
-            minDist=50,
-            param1=50,
-            param2=30,
-            minRadius=160,
-            maxRadius=180
-        )
+        return detect_plate(frame, scale=self.barbell_scale)
+
+    def _get_output_size(self) -> tuple:
+        """
+        Computes the size of the written output video, which always leaves room for the side panels.
+
+        :return: Output size (width, height).
+        """
+        return self.width + self._get_blank_image_dimensions()[1], self.height
 
-        if circles is not None:
-            # Convert circle parameters to integers
-            circles = np.round(circles[0, :]).astype(int)
+    def _open_writer(self) -> cv2.VideoWriter:
+        """
+        Opens the VideoWriter for the annotated output video.
 
-            barbell_coords = (circles[0][0], circles[0][1])
-            return barbell_coords
+        :return: The opened VideoWriter.
+        """
+        writer = cv2.VideoWriter(self.output_path, cv2.VideoWriter_fourcc(*"mp4v"), self.fps, self._get_output_size())
+        if not writer.isOpened():
+            raise IOError(f"Cannot open output video {self.output_path}")
+        return writer
 
-        # If no weight plates are detected, return None
-        return None
+    def _emit_frame(self, frame: np.ndarray) -> bool:
+        """
+        Writes a processed frame to the output video in headless mode or displays it otherwise.
 
-    def run_video_analysis(self):
+        :param frame: The processed frame.
+        :return: False if the user requested to stop the analysis.
         """
-        Runs video analysis and displays processed frames.
+        if not self.headless:
+            cv2.imshow(self.window_name, frame)
+            return cv2.waitKey(1) & 0xFF != ord("q")
+        if self.output_path is None:
+            return True
+
+        if self.writer is None:
+            self.writer = self._open_writer()
+
+        output_width, output_height = self._get_output_size()
+        if frame.shape[1] != output_width:
+            # Back angle frames come without side panels; pad them to the fixed output size
+            padded_frame = np.zeros((output_height, output_width, 3), np.uint8)
+            padded_frame[:, :frame.shape[1]] = frame
+            frame = padded_frame
+        self.writer.write(frame)
+        return True
+
+    def read_frames(self, start_frame: int = 0, end_frame: int = None):
         """
-        bar_path = []
+        Decodes and resizes the frames of the video.
 
-        while self.cap.isOpened():
+        In live mode, the newest captured frame is read instead and the frame range is ignored.
+
+        :param start_frame: Index of the first frame; the video is seeked to it.
+        :param end_frame: Index after the last frame, or None to read to the end of the video.
+        :return: Generator of (frame index, resized frame) tuples.
+        """
+        if self.live_capture is not None:
+            for frame_index, frame in self.live_capture.frames():
+                yield frame_index, cv2.resize(frame, (self.width, self.height))
+            return
+
+        if start_frame:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+        frame_index = start_frame
+        while self.cap.isOpened() and (end_frame is None or frame_index < end_frame):
             ret, frame = self.cap.read()
             if not ret:
                 break
 
-            frame = cv2.resize(frame, (self.width, self.height))
-            results = self.pose.process(frame)
-
-            if not results.pose_landmarks:
-                continue
-            landmarks = results.pose_landmarks.landmark
-            squat_pose = SquatPose(landmarks, self.width, self.height)
-            video_angle = squat_pose.check_visibility(0.3)
-
-            if video_angle == "Side Angle":
-                filmed_side = squat_pose.check_which_side_is_visible()
-                side_coords = squat_pose.get_side_coordinates(filmed_side)
-
-                knee_angle = calculate_three_point_angle(side_coords[0], side_coords[1], side_coords[2])
-                hip_angle = calculate_three_point_angle(side_coords[3], side_coords[0], side_coords[1])
-                shin_angle = calculate_three_point_angle(side_coords[1], side_coords[2], side_coords[4])
-
-                bar_coords = self.get_barbell_coordinates(frame)
-                if bar_coords:
-                    bar_path.append((int(bar_coords[0] / 3), int(bar_coords[1] / 3)))
-                args = (
-                    video_angle, side_coords[0], side_coords[1], side_coords[2],
-                    side_coords[3], side_coords[4], knee_angle,
-                    hip_angle, shin_angle, bar_path
-                )
+            yield frame_index, cv2.resize(frame, (self.width, self.height))
+            frame_index += 1
 
-                frame = self.add_images_to_frame(frame, args)
+    def analyze_pose(self, frame_index: int, frame: np.ndarray) -> FrameAnalysis:
+        """
+        Runs pose inference on a frame and computes the joint angles for the detected camera angle.
 
-            elif video_angle == "Back Angle":
-                squat_drawings = SquatDrawings(image=frame, height=self.height, width=self.width)
-                hips = squat_pose.hips
-                shoulders = squat_pose.shoulders
-                hip_angle = calculate_two_point_angle(
-                    squat_pose.coordinates.left_hip,
-                    squat_pose.coordinates.right_hip
-                )
-                hip_shift_angle = calculate_two_point_angle(
-                    squat_pose.get_shoulder_midpoint(),
-                    squat_pose.get_hip_midpoint()
-                )
-                squat_drawings.draw_back_angle_squat(
-                    camera_angle=video_angle,
-                    hips=hips,
-                    shoulders=shoulders,
-                    hip_angle=hip_angle,
-                    hip_shift_angle=hip_shift_angle
-                )
+        With a static filter, frames that barely differ from the last analyzed frame reuse its analysis.
+        The first frame of every analyzed range is always analyzed.
 
-            cv2.imshow("FormCoachAI", frame)
-            if cv2.waitKey(1) & 0xFF == ord("q"):
-                break
+        :param frame_index: Index of the frame in the video.
+        :param frame: The resized frame.
+        :return: Analysis of the frame; without a pose if no landmarks were found.
+        """
+        if frame_index in self._range_starts:
+            self._last_analysis = None
+            if self.static_filter is not None:
+                self.static_filter.restart()
+
+        cached = self.landmark_cache is not None and self.landmark_cache.is_loaded
+        if self.static_filter is not None and not cached and self.static_filter.is_static(
+                frame_index, frame, reusable=self._last_analysis is not None):
+            return dataclasses.replace(self._last_analysis, frame_index=frame_index, reused=True)
+
+        analysis = self.analyze_landmarks(frame_index, self._infer_landmarks(frame_index, frame))
+        self._last_analysis = analysis
+        return analysis
+
+    def _infer_landmarks(self, frame_index: int, frame: np.ndarray) -> np.ndarray:
+        """
+        Runs pose inference, or estimates the landmarks between keyframes when an adaptive stride is used.
+
+        :param frame_index: Index of the frame in the video.
+        :param frame: The resized frame.
+        :return: Landmark array of shape (33, 4), or None if no pose was found.
+        """
+        if self.landmark_cache is not None and self.landmark_cache.is_loaded:
+            return self.landmark_cache.get_landmarks(frame_index)
+        if self.pose_stride is not None and not self.pose_stride.should_infer(frame_index):
+            return self.pose_stride.estimate(frame_index)
+
+        pose = self.pose
+        start = time.perf_counter()
+        results = pose.process(self.resize_for_pose(frame))
+        if self.quality_controller is not None:
+            self._control_quality(frame_index, time.perf_counter() - start)
+        landmarks = landmarks_to_array(results.pose_landmarks) if results.pose_landmarks else None
+        if self.pose_stride is not None:
+            self.pose_stride.add_keyframe(frame_index, landmarks)
+        return landmarks
+
+    def resize_for_pose(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Downsamples a frame to the pose inference resolution.
+
+        :param frame: The resized frame.
+        :return: The frame for pose inference.
+        """
+        if self.pose_size is None:
+            return frame
+        return cv2.resize(frame, self.pose_size, interpolation=cv2.INTER_LINEAR)
+
+    def analyze_landmarks(self, frame_index: int, landmarks: np.ndarray) -> FrameAnalysis:
+        """
+        Computes the joint angles for the camera angle of the current view segment.
+
+        :param frame_index: Index of the frame in the video.
+        :param landmarks: Landmark array of shape (33, 4), or None if no pose was found.
+        :return: Analysis of the frame.
+        """
+        analysis = FrameAnalysis(frame_index)
+        if landmarks is None:
+            return analysis
+
+        squat_pose = SquatPose(landmarks, self.width, self.height)
+        analysis.squat_pose = squat_pose
+        analysis.video_angle, analysis.filmed_side = self.view_classifier.update(frame_index, squat_pose.landmarks)
+
+        if analysis.video_angle == "Side Angle":
+            side_coords = squat_pose.get_side_coordinates(analysis.filmed_side)
+            analysis.side_coords = side_coords
+
+            analysis.knee_angle = calculate_three_point_angle(side_coords[0], side_coords[1], side_coords[2])
+            analysis.hip_angle = calculate_three_point_angle(side_coords[3], side_coords[0], side_coords[1])
+            analysis.shin_angle = calculate_three_point_angle(side_coords[1], side_coords[2], side_coords[4])
+
+        elif analysis.video_angle == "Back Angle":
+            analysis.hip_angle = calculate_two_point_angle(
+                squat_pose.coordinates.left_hip,
+                squat_pose.coordinates.right_hip
+            )
+            analysis.hip_shift_angle = calculate_two_point_angle(
+                squat_pose.get_shoulder_midpoint(),
+                squat_pose.get_hip_midpoint()
+            )
+
+        return analysis
+
+    def detect_barbell(self, analysis: FrameAnalysis, frame: np.ndarray) -> FrameAnalysis:
+        """
+        Detects the barbell on side angle frames.
+
+        :param analysis: Analysis of the frame.
+        :param frame: The resized frame.
+        :return: The analysis including the barbell coordinates.
+        """
+        if analysis.video_angle != "Side Angle":
+            return analysis
+        if analysis.reused:
+            # Frames run through this stage in order, so this is the position of the frame the analysis came from
+            analysis.bar_coords = self._last_bar_coords
+            return analysis
+
+        if self.landmark_cache is not None and self.landmark_cache.is_loaded:
+            analysis.bar_coords = self.landmark_cache.get_bar_coords(analysis.frame_index)
+        elif self.barbell_tracker is not None:
+            analysis.bar_coords = self.barbell_tracker.detect(frame)
+        else:
+            analysis.bar_coords = self.get_barbell_coordinates(frame)
+        self._last_bar_coords = analysis.bar_coords
+        return analysis
+
+    def create_bar_path_layer(self) -> BarPathLayer:
+        """
+        Creates an empty bar path canvas of the Middle panel's size.
+
+        :return: The bar path layer.
+        """
+        blank_height, blank_width = self._get_blank_image_dimensions()
+        return BarPathLayer(blank_width, blank_height, get_line_thickness(self.width, self.height),
+                            fade=self.bar_path_fade, window=self.bar_path_window)
+
+    def render_frame(self, frame: np.ndarray, analysis: FrameAnalysis, bar_path: BarPathLayer) -> np.ndarray:
+        """
+        Draws the analysis results onto the frame.
+
+        :param frame: The resized frame.
+        :param analysis: Analysis of the frame.
+        :param bar_path: Bar path accumulated up to this frame.
+        :return: The annotated frame.
+        """
+        if analysis.video_angle == "Side Angle":
+            side_coords = analysis.side_coords
+            args = (
+                analysis.video_angle, side_coords[0], side_coords[1], side_coords[2],
+                side_coords[3], side_coords[4], analysis.knee_angle,
+                analysis.hip_angle, analysis.shin_angle, bar_path
+            )
+            frame = self.add_images_to_frame(frame, args)
+
+        elif analysis.video_angle == "Back Angle":
+            squat_drawings = SquatDrawings(image=frame, height=self.height, width=self.width)
+            squat_drawings.draw_back_angle_squat(
+                camera_angle=analysis.video_angle,
+                hips=analysis.squat_pose.hips,
+                shoulders=analysis.squat_pose.shoulders,
+                hip_angle=analysis.hip_angle,
+                hip_shift_angle=analysis.hip_shift_angle
+            )
+
+        return frame
+
+    def analyze_frames(self, start_frame: int = 0, end_frame: int = None):
+        """
+        Runs the decode, pose and barbell stages one after another on the calling thread.
+
+        :param start_frame: Index of the first frame to analyze.
+        :param end_frame: Index after the last frame to analyze, or None to analyze to the end of the video.
+        :return: Generator of (frame, analysis) tuples in frame order.
+        """
+        for frame_index, frame in self.read_frames(start_frame, end_frame):
+            analysis = self.analyze_pose(frame_index, frame)
+            yield frame, self.detect_barbell(analysis, frame)
+
+    def _analyze_windows(self, windows: list):
+        """
+        Analyzes the frames of several frame ranges in order.
+
+        :param windows: (start frame, end frame) ranges of the video.
+        :return: Generator of (frame, analysis) tuples in frame order.
+        """
+        for start_frame, end_frame in windows:
+            yield from self.analyze_frames(start_frame, end_frame)
+
+    def run_video_analysis(self, pipelined: bool = False, queue_size: int = 4, metrics_path: str = None,
+                           progress=None, windows: list = None, on_rep=None) -> dict:
+        """
+        Runs video analysis and displays or writes processed frames.
+
+        Headless runs without an output path skip drawing entirely and only analyze.
+
+        :param pipelined: Overlap decoding, pose inference and barbell detection on separate threads.
+        :param queue_size: Maximum number of frames buffered between two pipeline stages.
+        :param metrics_path: Path of a .csv, .parquet or .npy file for the per-frame metrics.
+        :param progress: Called with the number of analyzed frames after every frame; returning False stops the run.
+        :param windows: (start frame, end frame) ranges to analyze, e.g. from an ActiveWindowDetector; the video
+            is seeked to every range and the frames in between are skipped. None analyzes the whole video.
+        :param on_rep: Called with the RepRecord of every rep as soon as it is completed.
+        :return: Throughput statistics (frames, seconds, fps) and the completed reps of the run.
+        """
+        bar_path = self.create_bar_path_layer()
+        self.trajectory.clear()
+        self.rep_segmenter = RepSegmenter(self.fps)
+        rendering = not self.headless or self.output_path is not None
+        metrics_writer = MetricsWriter(metrics_path) if metrics_path is not None else None
+        frame_count = 0
+        completed = True
+        start_time = time.perf_counter()
+        # Cache misses record the results of this run for the next one; entries need every frame of the video
+        cache_hit = self.landmark_cache is not None and self.landmark_cache.is_loaded
+        recording = self.landmark_cache is not None and not cache_hit and windows is None
+        self._range_starts = {start_frame for start_frame, _ in windows or ()}
+
+        if pipelined:
+            analyzed_frames = FramePipeline(self, queue_size, windows).run()
+        elif windows is not None:
+            analyzed_frames = self._analyze_windows(windows)
+        else:
+            analyzed_frames = self.analyze_frames()
+
+        try:
+            for frame, analysis in analyzed_frames:
+                frame_count += 1
+                if recording:
+                    landmarks = analysis.squat_pose.landmarks if analysis.squat_pose is not None else None
+                    self.landmark_cache.record(analysis.frame_index, landmarks, analysis.bar_coords)
+                if metrics_writer is not None:
+                    metrics_writer.write(analysis)
+                if progress is not None and not progress(frame_count):
+                    completed = False
+                    break
+
+                rep = self.rep_segmenter.update(analysis)
+                if rep is not None and on_rep is not None:
+                    on_rep(rep)
+
+                if analysis.bar_coords:
+                    self.trajectory.add(analysis.frame_index, analysis.frame_index / self.fps, analysis.bar_coords)
+                if analysis.bar_coords and rendering:
+                    # The bar path is drawn on panels of a third of the frame size
+                    bar_path.add_point((int(analysis.bar_coords[0] / 3), int(analysis.bar_coords[1] / 3)))
+
+                if self.instrumentation is not None:
+                    self.instrumentation.record_frame(analysis)
+
+                if not rendering:
+                    if self.live_capture is not None:
+                        self.live_capture.record_display(analysis.frame_index)
+                    continue
+                if analysis.squat_pose is None and not self.headless:
+                    # Frames without a pose are not shown
+                    if self.instrumentation is not None:
+                        self.instrumentation.increment("frames_dropped")
+                    continue
+
+                frame = self.render_frame(frame, analysis, bar_path)
+                if not self._emit_frame(frame):
+                    completed = False
+                    break
+                if self.live_capture is not None:
+                    self.live_capture.record_display(analysis.frame_index)
+        finally:
+            analyzed_frames.close()
+            if metrics_writer is not None:
+                metrics_writer.close()
+            self._release_writer()
+
+        if recording and completed:
+            self.landmark_cache.save()
+            self.landmark_cache.load()
+
+        elapsed = time.perf_counter() - start_time
+        stats = {
+            "frames": frame_count,
+            "seconds": elapsed,
+            "fps": frame_count / elapsed if elapsed > 0 else 0.0,
+        }
+        if self.barbell_tracker is not None:
+            stats["barbell"] = self.barbell_tracker.stats
+        if self.pose_stride is not None:
+            stats["pose"] = self.pose_stride.stats
+        if self.quality_controller is not None:
+            stats["quality"] = self.quality_controller.stats
+        stats["reps"] = dict(self.rep_segmenter.stats, records=[rep.to_dict() for rep in self.rep_segmenter.reps])
+        stats["views"] = self.view_classifier.stats
+        if self.static_filter is not None:
+            stats["static"] = self.static_filter.stats
+        if metrics_writer is not None:
+            stats["metrics"] = metrics_writer.path
+        if self.live_capture is not None:
+            stats["live"] = self.live_capture.stats
+        if self.instrumentation is not None:
+            stats["instrumentation"] = self.instrumentation.to_dict()
+        if windows is not None:
+            stats["windows"] = [list(window) for window in windows]
+        if self.landmark_cache is not None:
+            stats["cache"] = "hit" if cache_hit else "miss"
+        return stats
@@ -0,0 +1,234 @@
+import bisect
+import functools
+import json
+import os
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; the memory high-water mark is not reported there
+    resource = None
+
+from src.MovementPatterns import FrameAnalysis
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+COUNTERS = ("frames", "frames_without_landmarks", "side_angle_frames", "back_angle_frames",
+            "barbell_hits", "barbell_misses", "frames_dropped")
+
+# Prefix of the exported Prometheus metrics
+METRIC_PREFIX = "squat_analysis"
+
+
+class Histogram:
+    """
+    Latency histogram with fixed buckets, as exported to Prometheus.
+    """
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates a quantile as the upper bound of the bucket it falls into.
+
+        :param q: Quantile between 0 and 1
+        :return: Upper bound in seconds, or the maximum for the overflow bucket
+        """
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": dict(zip([str(bound) for bound in self.buckets] + ["+Inf"], self.counts)),
+        }
+
+
+def get_max_rss() -> int:
+    """
+    Returns the peak resident memory of the process.
+
+    :return: High-water mark in bytes, or 0 where it is not available
+    """
+    if resource is None:
+        return 0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class Instrumentation:
+    """
+    Per-stage latency histograms, frame counters and the memory high-water mark of the analysis.
+
+    FrameHandler only creates it when instrumentation is turned on and then wraps its stage methods
+    with timed(), so runs without instrumentation execute no timing code at all. Every stage runs on
+    a single thread, also in the pipelined mode, so the histograms need no locking.
+    """
+
+    def __init__(self, labels: dict = None):
+        """
+        Initialize the Instrumentation class.
+        :param labels: Prometheus labels added to every metric, e.g. the host or job
+        """
+        self.labels = labels or {}
+        self.histograms = {}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+
+    def observe(self, stage: str, seconds: float):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = Histogram()
+        histogram.observe(seconds)
+
+    def increment(self, counter: str, value: int = 1):
+        self.counters[counter] += value
+
+    def timed(self, stage: str, function):
+        """
+        Wraps a function to record its latency.
+
+        :param stage: Name of the stage
+        :param function: The function
+        :return: The wrapped function
+        """
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.observe(stage, time.perf_counter() - start)
+        return wrapper
+
+    def timed_generator(self, stage: str, function):
+        """
+        Wraps a generator function to record the latency of producing every item.
+
+        :param stage: Name of the stage
+        :param function: The generator function
+        :return: The wrapped generator function
+        """
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            items = function(*args, **kwargs)
+            try:
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        return
+                    self.observe(stage, time.perf_counter() - start)
+                    yield item
+            finally:
+                items.close()
+        return wrapper
+
+    def record_frame(self, analysis: FrameAnalysis):
+        """
+        Counts the results of an analyzed frame.
+
+        :param analysis: Analysis of the frame
+        """
+        counters = self.counters
+        counters["frames"] += 1
+        if analysis.squat_pose is None:
+            counters["frames_without_landmarks"] += 1
+        elif analysis.video_angle == "Side Angle":
+            counters["side_angle_frames"] += 1
+            counters["barbell_hits" if analysis.bar_coords else "barbell_misses"] += 1
+        elif analysis.video_angle == "Back Angle":
+            counters["back_angle_frames"] += 1
+
+    def to_dict(self) -> dict:
+        """
+        Summarizes the instrumentation as JSON serializable data.
+
+        :return: Counters, stage latencies in seconds and the memory high-water mark
+        """
+        return {
+            "counters": dict(self.counters),
+            "stages": {stage: histogram.to_dict() for stage, histogram in self.histograms.items()},
+            "max_rss_bytes": get_max_rss(),
+        }
+
+    def _format_labels(self, **labels) -> str:
+        labels = {**self.labels, **labels}
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{name}="{value}"' for name, value in labels.items()) + "}"
+
+    def to_prometheus(self) -> str:
+        """
+        Formats the instrumentation in the Prometheus text format.
+
+        :return: The metrics text
+        """
+        lines = []
+        for counter, value in self.counters.items():
+            name = f"{METRIC_PREFIX}_{counter}_total"
+            lines += [f"# TYPE {name} counter", f"{name}{self._format_labels()} {value}"]
+
+        name = f"{METRIC_PREFIX}_stage_seconds"
+        lines += [f"# HELP {name} Latency of the analysis stages per frame", f"# TYPE {name} histogram"]
+        for stage, histogram in self.histograms.items():
+            cumulative = 0
+            for bound, count in zip([str(bound) for bound in histogram.buckets] + ["+Inf"], histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{self._format_labels(stage=stage, le=bound)} {cumulative}")
+            lines.append(f"{name}_sum{self._format_labels(stage=stage)} {histogram.sum}")
+            lines.append(f"{name}_count{self._format_labels(stage=stage)} {histogram.count}")
+
+        name = f"{METRIC_PREFIX}_max_rss_bytes"
+        lines += [f"# TYPE {name} gauge", f"{name}{self._format_labels()} {get_max_rss()}"]
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: str):
+        """
+        Writes the JSON summary.
+
+        :param path: Path of the JSON file
+        """
+        with open(path, "w") as json_file:
+            json.dump(self.to_dict(), json_file, indent=2)
+
+    def write_prometheus(self, path: str):
+        """
+        Writes the metrics for node-exporter's textfile collector.
+
+        The file is replaced atomically, so the collector never reads a partial file.
+
+        :param path: Path of the .prom file
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        file_descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(file_descriptor, "w") as prom_file:
+            prom_file.write(self.to_prometheus())
+        os.replace(temp_path, path)
@@ -0,0 +1,496 @@
+"""
+Local job service for analyzing uploaded squat videos.
+
+Jobs are submitted over a small JSON HTTP API, queued and dispatched to a pool of worker processes.
+Every worker imports OpenCV and MediaPipe and loads its Pose model once when it starts, so a job only
+pays for the analysis itself.
+
+    POST   /jobs                 {"video": "<path>", "metrics": "csv"}  -> 202 job, 429 when the queue is full
+    GET    /jobs                 all jobs
+    GET    /jobs/<id>            state and progress of a job
+    GET    /jobs/<id>/result     result of a finished job, 409 while it is queued or running
+    GET    /jobs/<id>/progress   newline delimited JSON progress updates until the job finishes
+    DELETE /jobs/<id>            cancels a queued or running job
+
+Run from the repository root: python -m src.JobService results --port 8765 --workers 2
+"""
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Optional
+
+from src.BatchAnalyzer import analyze_video, init_worker
+from src.PosePool import get_pose_pool
+
+FINISHED_STATES = ("done", "failed", "cancelled")
+
+# Number of cancel flags shared with the workers; a job uses the flag of its sequence number modulo this
+CANCEL_SLOTS = 4096
+
+# Seconds a client should wait before resubmitting a job rejected because of a full queue
+RETRY_AFTER = 5
+
+# Progress queue and cancel flags of the current worker process, set by init_service_worker
+_progress_queue = None
+_cancel_flags = None
+
+
+class QueueFullError(Exception):
+    """
+    Raised when a job is submitted while the job queue is full.
+    """
+
+
+def warm_up():
+    """
+    Imports the analysis modules and loads two Pose models into the pool of the process, so one is ready
+    for the next job while the other is reset in the background after the previous job.
+    """
+    import src.ImageHandler  # noqa: F401
+
+    get_pose_pool().warm_up(count=2)
+
+
+def init_service_worker(progress_queue, cancel_flags, warm: bool = True):
+    """
+    Initializes a worker process of the job service.
+
+    :param progress_queue: Queue receiving (job id, analyzed frames, total frames) tuples, with the record of
+        a completed rep appended when one was completed
+    :param cancel_flags: Shared array of cancel flags
+    :param warm: Load the Pose model now instead of on the first job
+    """
+    global _progress_queue, _cancel_flags
+    _progress_queue = progress_queue
+    _cancel_flags = cancel_flags
+    init_worker()
+    if warm:
+        warm_up()
+
+
+def get_worker_pid() -> int:
+    return os.getpid()
+
+
+def run_job(job_id: str, slot: int, video_path: str, output_dir: str, scale: float = 1,
+            metrics_format: str = None) -> dict:
+    """
+    Analyzes the video of a job in a worker process and reports its progress after every frame and every
+    completed rep.
+
+    The result files are written to a subdirectory named after the job id, so uploads with the same file
+    name don't overwrite each other.
+
+    :param job_id: Id of the job
+    :param slot: Index of the job's cancel flag
+    :param video_path: The path to the video file
+    :param output_dir: Directory for the result directories of the jobs
+    :param scale: The scale of the analyzed frames
+    :param metrics_format: File format of the per-frame metrics, or None for an annotated video
+    :return: Result of the video, with "cancelled" set if the job was cancelled while running
+    """
+    import cv2
+
+    cap = cv2.VideoCapture(video_path)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    _progress_queue.put((job_id, 0, total_frames))
+    analyzed_frames = 0
+
+    def progress(frames: int) -> bool:
+        nonlocal analyzed_frames
+        analyzed_frames = frames
+        _progress_queue.put((job_id, frames, total_frames))
+        return not _cancel_flags[slot]
+
+    def on_rep(rep):
+        _progress_queue.put((job_id, analyzed_frames, total_frames, rep.to_dict()))
+
+    job_dir = os.path.join(output_dir, job_id)
+    os.makedirs(job_dir, exist_ok=True)
+    result = analyze_video(video_path, job_dir, scale, metrics_format, progress, on_rep=on_rep)
+    if _cancel_flags[slot]:
+        result["cancelled"] = True
+    return result
+
+
+@dataclass
+class Job:
+    id: str
+    video: str
+    slot: int
+    metrics_format: Optional[str] = None
+    state: str = "queued"
+    frames: int = 0
+    total_frames: int = 0
+    reps: list = field(default_factory=list)
+    result: Optional[dict] = None
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    subscribers: list = field(default_factory=list, repr=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "video": self.video,
+            "state": self.state,
+            "frames": self.frames,
+            "total_frames": self.total_frames,
+            "reps": list(self.reps),
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class JobService:
+    """
+    Queues analysis jobs and runs them on a pool of warm worker processes.
+
+    The queue is bounded: submitting to a full queue raises QueueFullError, which the HTTP API answers
+    with 429 so clients back off instead of piling up work. Workers report their progress through a
+    multiprocessing queue that a thread forwards to the event loop, and poll a shared cancel flag
+    after every frame. Finished jobs are forgotten after finished_ttl seconds, or earlier when more
+    than max_finished of them are kept.
+    """
+
+    def __init__(self, output_dir: str, workers: int = None, queue_size: int = 16, scale: float = 1,
+                 warm: bool = True, max_finished: int = 256, finished_ttl: float = 3600):
+        """
+        Initialize the JobService class.
+        :param output_dir: Directory for the result files
+        :param workers: Number of worker processes, defaults to the number of CPUs
+        :param queue_size: Maximum number of queued jobs
+        :param scale: The scale of the analyzed frames
+        :param warm: Load the Pose model when a worker starts instead of on its first job
+        :param max_finished: Maximum number of finished jobs kept; the oldest are forgotten first
+        :param finished_ttl: Seconds a finished job is kept
+        """
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.scale = scale
+        self.warm = warm
+        self.max_finished = max_finished
+        self.finished_ttl = finished_ttl
+        self.jobs = {}
+        # Finished jobs in the order they finished
+        self._finished = collections.deque()
+
+        self._sequence = itertools.count()
+        self._loop = None
+        self._queue = None
+        # Number of queued jobs that were not cancelled; cancelled jobs stay in the queue until dispatched
+        self._queued = 0
+        self._context = None
+        self._executor = None
+        self._dispatchers = []
+        self._progress_queue = None
+        self._progress_thread = None
+        self._cancel_flags = None
+
+    def _create_executor(self, context):
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=context, initializer=init_service_worker,
+                                   initargs=(self._progress_queue, self._cancel_flags, self.warm))
+
+    async def start(self):
+        """
+        Starts the worker processes and waits until they are warmed up.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._loop = asyncio.get_running_loop()
+        # Spawned workers don't inherit OpenCV/MediaPipe threads of the parent process
+        self._context = multiprocessing.get_context("spawn")
+        self._progress_queue = self._context.Queue()
+        self._cancel_flags = self._context.RawArray("b", CANCEL_SLOTS)
+        self._executor = self._create_executor(self._context)
+        self._progress_thread = threading.Thread(target=self._read_progress, name="job-progress", daemon=True)
+        self._progress_thread.start()
+
+        # Submitting one task per worker at once makes the pool start all of them
+        await asyncio.gather(*(self._loop.run_in_executor(self._executor, get_worker_pid)
+                               for _ in range(self.workers)))
+        self._queue = asyncio.Queue()
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """
+        Stops dispatching, cancels the running jobs and shuts the workers down.
+        """
+        # Cancelling may evict finished jobs
+        for job in list(self.jobs.values()):
+            if job.state in ("queued", "running"):
+                self.cancel(job.id)
+        for dispatcher in self._dispatchers:
+            dispatcher.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = []
+        await self._loop.run_in_executor(None, self._executor.shutdown)
+        self._progress_queue.put(None)
+        self._progress_thread.join()
+        self._progress_queue.close()
+        self._progress_queue.join_thread()
+
+    def submit(self, video: str, metrics_format: str = None) -> Job:
+        """
+        Queues the analysis of a video.
+
+        :param video: The path to the video file
+        :param metrics_format: File format of the per-frame metrics (csv, parquet or npy), or None for a video
+        :return: The queued job
+        """
+        if self._queued >= self.queue_size:
+            raise QueueFullError(f"The job queue is full ({self.queue_size} jobs)")
+        self._evict_finished()
+        job = Job(uuid.uuid4().hex, video, next(self._sequence) % CANCEL_SLOTS, metrics_format)
+        self._cancel_flags[job.slot] = 0
+        self._queue.put_nowait(job)
+        self._queued += 1
+        self.jobs[job.id] = job
+        return job
+
+    def cancel(self, job_id: str) -> Job:
+        """
+        Cancels a job. A queued job is never started; a running job stops after its current frame.
+
+        :param job_id: Id of the job
+        :return: The job
+        """
+        job = self.jobs[job_id]
+        if job.state == "queued":
+            self._queued -= 1
+            self._finish(job, "cancelled")
+        elif job.state == "running":
+            self._cancel_flags[job.slot] = 1
+        return job
+
+    async def progress(self, job_id: str):
+        """
+        Streams the progress of a job.
+
+        :param job_id: Id of the job
+        :return: Async generator of job states, ending after the job finished
+        """
+        job = self.jobs[job_id]
+        updates = asyncio.Queue()
+        job.subscribers.append(updates)
+        try:
+            update = job.to_dict()
+            yield update
+            while update["state"] not in FINISHED_STATES:
+                update = await updates.get()
+                yield update
+        finally:
+            job.subscribers.remove(updates)
+
+    async def _dispatch(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.state == "cancelled":
+                    continue
+                self._queued -= 1
+                job.state = "running"
+                job.started = time.time()
+                self._notify(job)
+                executor = self._executor
+                try:
+                    result = await self._loop.run_in_executor(
+                        executor, run_job, job.id, job.slot, job.video, self.output_dir, self.scale,
+                        job.metrics_format)
+                except BrokenProcessPool as error:
+                    result = {"video": job.video, "error": f"{type(error).__name__}: {error}"}
+                    self._replace_executor(executor)
+                except Exception as error:
+                    result = {"video": job.video, "error": f"{type(error).__name__}: {error}"}
+                job.result = result
+                # The last progress updates may still be on their way from the worker
+                job.frames = result.get("stats", {}).get("frames", job.frames)
+                self._finish(job, "cancelled" if result.get("cancelled") else "failed" if "error" in result else "done")
+            finally:
+                self._queue.task_done()
+
+    def _replace_executor(self, broken_executor):
+        # Every job of a crashed pool fails with BrokenProcessPool; only the first one starts a new pool
+        if self._executor is broken_executor:
+            self._executor = self._create_executor(self._context)
+            broken_executor.shutdown(wait=False)
+
+    def _finish(self, job: Job, state: str):
+        job.state = state
+        job.finished = time.time()
+        self._notify(job)
+        self._finished.append(job)
+        self._evict_finished()
+
+    def _evict_finished(self):
+        expired = time.time() - self.finished_ttl
+        while self._finished and (len(self._finished) > self.max_finished or self._finished[0].finished < expired):
+            self.jobs.pop(self._finished.popleft().id, None)
+
+    def _read_progress(self):
+        while True:
+            update = self._progress_queue.get()
+            if update is None:
+                return
+            self._loop.call_soon_threadsafe(self._update_progress, *update)
+
+    def _update_progress(self, job_id: str, frames: int, total_frames: int, rep: dict = None):
+        job = self.jobs.get(job_id)
+        if job is None or job.state != "running":
+            return
+        job.frames = frames
+        job.total_frames = total_frames
+        if rep is not None:
+            job.reps.append(rep)
+        self._notify(job)
+
+    @staticmethod
+    def _notify(job: Job):
+        update = job.to_dict()
+        for subscriber in job.subscribers:
+            subscriber.put_nowait(update)
+
+    async def handle_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Answers a single HTTP request and closes the connection.
+
+        :param reader: Stream of the request
+        :param writer: Stream of the response
+        """
+        try:
+            method, target, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            await self._route(method, target.split("?")[0].strip("/").split("/"), body, writer)
+        except (ValueError, asyncio.IncompleteReadError):
+            self._write_json(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request"})
+        except ConnectionError:
+            pass
+        finally:
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+            writer.close()
+
+    async def _route(self, method: str, parts: list, body: bytes, writer: asyncio.StreamWriter):
+        if parts[0] != "jobs" or len(parts) > 3:
+            self._write_json(writer, HTTPStatus.NOT_FOUND, {"error": "Unknown endpoint"})
+            return
+
+        if len(parts) == 1:
+            if method == "GET":
+                self._write_json(writer, HTTPStatus.OK, [job.to_dict() for job in self.jobs.values()])
+            elif method == "POST":
+                self._submit_request(body, writer)
+            else:
+                self._write_json(writer, HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"{method} not allowed"})
+            return
+
+        job = self.jobs.get(parts[1])
+        action = parts[2] if len(parts) == 3 else None
+        if job is None:
+            self._write_json(writer, HTTPStatus.NOT_FOUND, {"error": f"Unknown job {parts[1]}"})
+        elif method == "GET" and action is None:
+            self._write_json(writer, HTTPStatus.OK, job.to_dict())
+        elif method == "GET" and action == "result":
+            if job.state in FINISHED_STATES:
+                self._write_json(writer, HTTPStatus.OK, {**job.to_dict(), "result": job.result})
+            else:
+                self._write_json(writer, HTTPStatus.CONFLICT, {"error": f"Job is {job.state}"})
+        elif method == "GET" and action == "progress":
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n")
+            async for update in self.progress(job.id):
+                writer.write(json.dumps(update).encode() + b"\n")
+                await writer.drain()
+        elif method == "DELETE" and action is None:
+            self._write_json(writer, HTTPStatus.OK, self.cancel(job.id).to_dict())
+        else:
+            self._write_json(writer, HTTPStatus.NOT_FOUND, {"error": "Unknown endpoint"})
+
+    def _submit_request(self, body: bytes, writer: asyncio.StreamWriter):
+        try:
+            request = json.loads(body or b"{}")
+            video = request["video"]
+        except (ValueError, KeyError, TypeError):
+            self._write_json(writer, HTTPStatus.BAD_REQUEST, {"error": 'Expected {"video": "<path>"}'})
+            return
+        metrics_format = request.get("metrics")
+        if metrics_format not in (None, "csv", "parquet", "npy"):
+            self._write_json(writer, HTTPStatus.BAD_REQUEST, {"error": f"Unknown metrics format {metrics_format}"})
+            return
+        if not os.path.isfile(video):
+            self._write_json(writer, HTTPStatus.BAD_REQUEST, {"error": f"No such video {video}"})
+            return
+
+        try:
+            job = self.submit(video, metrics_format)
+        except QueueFullError as error:
+            self._write_json(writer, HTTPStatus.TOO_MANY_REQUESTS, {"error": str(error)},
+                             {"Retry-After": str(RETRY_AFTER)})
+            return
+        self._write_json(writer, HTTPStatus.ACCEPTED, job.to_dict())
+
+    @staticmethod
+    def _write_json(writer: asyncio.StreamWriter, status: HTTPStatus, data, headers: dict = None):
+        body = json.dumps(data).encode()
+        head = [f"HTTP/1.1 {status.value} {status.phrase}", "Content-Type: application/json",
+                f"Content-Length: {len(body)}", "Connection: close"]
+        head += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765):
+        """
+        Starts the workers and answers requests until cancelled.
+
+        :param host: Address to listen on
+        :param port: Port to listen on
+        """
+        await self.start()
+        server = await asyncio.start_server(self.handle_request, host, port)
+        print(f"Serving on http://{host}:{port} with {self.workers} workers")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output_dir", help="Directory for the annotated videos and result files")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--queue-size", type=int, default=16, help="Maximum number of queued jobs")
+    parser.add_argument("--scale", type=float, default=1, help="Scale of the analyzed frames")
+    parser.add_argument("--max-finished", type=int, default=256, help="Maximum number of finished jobs kept")
+    parser.add_argument("--finished-ttl", type=float, default=3600, help="Seconds a finished job is kept")
+    args = parser.parse_args()
+
+    service = JobService(args.output_dir, args.workers, args.queue_size, args.scale,
+                         max_finished=args.max_finished, finished_ttl=args.finished_ttl)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+from src.MovementPatterns import LANDMARK_COUNT
+
+# Marks a frame without barbell detection in the cached barbell coordinates
+NO_BARBELL = -1
+
+
+def hash_video(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Hash the content of a video file.
+
+    :param file_path: The path to the video file
+    :param chunk_size: Number of bytes read at once
+    :return: SHA-256 hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as video_file:
+        while chunk := video_file.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LandmarkCache:
+    """
+    On-disk cache of the per-frame pose landmarks and barbell detections of a video.
+
+    Entries are keyed by the content hash of the video and the analysis configuration (Pose settings,
+    inference resolution, ...). Each entry is a directory with memory-mappable .npy files:
+    landmarks.npy of shape (frames, 33, 4) with NaN rows for frames without a pose, and
+    barbell.npy of shape (frames, 2) with -1 for frames without a detected barbell.
+    """
+
+    def __init__(self, cache_dir: str, file_path: str, config: dict):
+        """
+        Initialize the LandmarkCache class.
+        :param cache_dir: Directory holding all cache entries
+        :param file_path: The path to the video file
+        :param config: Analysis settings that change the landmarks or barbell detections
+        """
+        key_data = json.dumps({"video": hash_video(file_path), "config": config}, sort_keys=True)
+        self.key = hashlib.sha256(key_data.encode()).hexdigest()
+        self.path = os.path.join(cache_dir, self.key)
+
+        self.landmarks = None
+        self.bar_coords = None
+        self._recorded_landmarks = []
+        self._recorded_bar_coords = []
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.landmarks is not None
+
+    def load(self) -> bool:
+        """
+        Opens the cache entry as memory maps, so frames are only read from disk when they are accessed.
+
+        :return: True if the entry exists
+        """
+        try:
+            self.landmarks = np.load(os.path.join(self.path, "landmarks.npy"), mmap_mode="r")
+            self.bar_coords = np.load(os.path.join(self.path, "barbell.npy"), mmap_mode="r")
+        except FileNotFoundError:
+            self.landmarks = None
+            self.bar_coords = None
+        return self.is_loaded
+
+    def get_landmarks(self, frame_index: int) -> Optional[np.ndarray]:
+        """
+        Returns the cached landmarks of a frame.
+
+        :param frame_index: Index of the frame
+        :return: Landmark array of shape (33, 4), or None if the frame has no pose
+        """
+        if frame_index >= len(self.landmarks):
+            return None
+        landmarks = self.landmarks[frame_index]
+        if np.isnan(landmarks[0, 0]):
+            return None
+        return np.asarray(landmarks)
+
+    def get_bar_coords(self, frame_index: int) -> Optional[tuple]:
+        """
+        Returns the cached barbell detection of a frame.
+
+        :param frame_index: Index of the frame
+        :return: A tuple (x, y) with the barbell's center, or None if no barbell was detected
+        """
+        if frame_index >= len(self.bar_coords):
+            return None
+        x, y = self.bar_coords[frame_index]
+        if x == NO_BARBELL:
+            return None
+        return int(x), int(y)
+
+    def record(self, frame_index: int, landmarks: Optional[np.ndarray], bar_coords: Optional[tuple]):
+        """
+        Records the results of the next frame of an analysis run.
+
+        :param frame_index: Index of the frame; frames have to be recorded in order starting at 0
+        :param landmarks: Landmark array of shape (33, 4), or None if the frame has no pose
+        :param bar_coords: The barbell's center, or None if no barbell was detected
+        """
+        if frame_index == 0:
+            # A new run starts; drop what an interrupted run recorded
+            self._recorded_landmarks = []
+            self._recorded_bar_coords = []
+        if frame_index != len(self._recorded_landmarks):
+            raise ValueError(f"Expected frame {len(self._recorded_landmarks)}, got frame {frame_index}")
+
+        if landmarks is None:
+            landmarks = np.full((LANDMARK_COUNT, 4), np.nan, np.float32)
+        self._recorded_landmarks.append(landmarks)
+        self._recorded_bar_coords.append(bar_coords if bar_coords is not None else (NO_BARBELL, NO_BARBELL))
+
+    def save(self):
+        """
+        Writes the recorded frames as the cache entry.
+        """
+        landmarks = np.array(self._recorded_landmarks, np.float32).reshape(-1, LANDMARK_COUNT, 4)
+        bar_coords = np.array(self._recorded_bar_coords, np.int32).reshape(-1, 2)
+
+        # Write into a temporary directory first, so concurrent runs never see a partial entry
+        cache_dir = os.path.dirname(self.path)
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = tempfile.mkdtemp(dir=cache_dir)
+        np.save(os.path.join(temp_path, "landmarks.npy"), landmarks)
+        np.save(os.path.join(temp_path, "barbell.npy"), bar_coords)
+        try:
+            os.rename(temp_path, self.path)
+        except OSError:
+            # Another run saved the same entry in the meantime
+            shutil.rmtree(temp_path)
+
+        self._recorded_landmarks = []
+        self._recorded_bar_coords = []
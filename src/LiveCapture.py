@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+
+from src.Instrumentation import Histogram
+
+# Number of handed out frames whose capture time is kept until they are displayed
+MAX_PENDING_FRAMES = 64
+
+
+class LiveCapture:
+    """
+    Captures frames on a separate thread and always hands out the newest frame.
+
+    Frames captured while the analysis is still busy replace the waiting frame, so the latency stays
+    bounded when inference is slower than the camera. Frames older than the latency budget are skipped,
+    and the frame rate can be capped to save CPU. File sources can be played back at their real frame
+    rate to reproduce a live camera.
+    """
+
+    def __init__(self, cap: cv2.VideoCapture, realtime: bool = False, fps: float = 30,
+                 max_latency: float = None, max_fps: float = None):
+        """
+        Initialize the LiveCapture class.
+        :param cap: The opened VideoCapture of the camera or file
+        :param realtime: Pace reading to the frame rate, for file sources
+        :param fps: Frame rate of the source
+        :param max_latency: Latency budget in seconds; older frames are skipped, slower displays are counted
+        :param max_fps: Maximum number of frames handed out per second, or None for no limit
+        """
+        self.cap = cap
+        self.realtime = realtime
+        self.fps = fps
+        self.max_latency = max_latency
+        self.max_fps = max_fps
+
+        self._condition = threading.Condition()
+        self._latest = None
+        self._ended = False
+        self._stop = threading.Event()
+        self._thread = None
+        self._capture_times = OrderedDict()
+
+        self.captured = 0
+        self.dropped = 0
+        self.stale = 0
+        self.processed = 0
+        self.over_budget = 0
+        self.latency = Histogram()
+
+    @property
+    def stats(self) -> dict:
+        """
+        Counts of captured frames, frames replaced before processing (dropped), frames skipped for exceeding
+        the latency budget (stale), processed frames and displays over the budget, plus the
+        capture-to-display latency in seconds.
+        """
+        return {
+            "captured": self.captured,
+            "dropped": self.dropped,
+            "stale": self.stale,
+            "processed": self.processed,
+            "over_budget": self.over_budget,
+            "latency_mean": self.latency.sum / self.latency.count if self.latency.count else 0.0,
+            "latency_p50": self.latency.quantile(0.5),
+            "latency_p95": self.latency.quantile(0.95),
+            "latency_max": self.latency.max,
+        }
+
+    def _capture(self):
+        start_time = time.perf_counter()
+        frame_index = 0
+        while not self._stop.is_set():
+            if self.realtime:
+                delay = start_time + frame_index / self.fps - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            ret, frame = self.cap.read()
+            capture_time = time.perf_counter()
+            with self._condition:
+                if not ret:
+                    self._ended = True
+                    self._condition.notify()
+                    return
+                if self._latest is not None:
+                    self.dropped += 1
+                self._latest = (frame_index, frame, capture_time)
+                self.captured += 1
+                self._condition.notify()
+            frame_index += 1
+
+    def frames(self):
+        """
+        Starts capturing and hands out the newest frame whenever the caller is ready for the next one.
+
+        :return: Generator of (frame index, frame) tuples; the indices skip dropped frames.
+        """
+        self._stop.clear()
+        self._latest = None
+        self._ended = False
+        self._thread = threading.Thread(target=self._capture, name="live-capture", daemon=True)
+        self._thread.start()
+        last_time = None
+        try:
+            while True:
+                if self.max_fps is not None and last_time is not None:
+                    delay = last_time + 1 / self.max_fps - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+
+                with self._condition:
+                    self._condition.wait_for(lambda: self._latest is not None or self._ended)
+                    if self._latest is None:
+                        return
+                    frame_index, frame, capture_time = self._latest
+                    self._latest = None
+
+                last_time = time.perf_counter()
+                if self.max_latency is not None and last_time - capture_time > self.max_latency:
+                    self.stale += 1
+                    continue
+
+                self.processed += 1
+                self._capture_times[frame_index] = capture_time
+                if len(self._capture_times) > MAX_PENDING_FRAMES:
+                    self._capture_times.popitem(last=False)
+                yield frame_index, frame
+        finally:
+            self.stop()
+
+    def record_display(self, frame_index: int):
+        """
+        Records that the results of a frame were displayed.
+
+        :param frame_index: Index of the frame
+        """
+        capture_time = self._capture_times.pop(frame_index, None)
+        if capture_time is None:
+            return
+        latency = time.perf_counter() - capture_time
+        self.latency.observe(latency)
+        if self.max_latency is not None and latency > self.max_latency:
+            self.over_budget += 1
+
+    def stop(self):
+        """
+        Stops capturing.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
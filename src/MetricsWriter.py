@@ -0,0 +1,142 @@
+import csv
+import math
+import os
+import shutil
+import warnings
+
+import numpy as np
+
+from src.MovementPatterns import FrameAnalysis
+
+# Joints of FrameAnalysis.side_coords, in order
+SIDE_JOINTS = ("hip", "knee", "ankle", "shoulder", "foot", "heel")
+
+METRICS_DTYPE = np.dtype(
+    [("frame_index", np.int64), ("video_angle", "U10"), ("filmed_side", "U5")]
+    + [(f"{joint}_{axis}", np.float32) for joint in SIDE_JOINTS for axis in ("x", "y")]
+    + [(name, np.float64) for name in ("knee_angle", "hip_angle", "shin_angle", "hip_shift_angle")]
+    + [("bar_x", np.float32), ("bar_y", np.float32)]
+)
+
+
+class MetricsWriter:
+    """
+    Writes the per-frame analysis results as a columnar file while the video is processed.
+
+    Rows are collected in a preallocated NumPy structured array and written in chunks, so memory stays
+    constant regardless of the video length. The format follows the file extension: .csv, .parquet
+    (requires pyarrow) or .npy, a structured NumPy array that is also the fallback without pyarrow.
+    Missing values are NaN, or empty in CSV files.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 1024):
+        """
+        Initialize the MetricsWriter class.
+        :param path: Path of the metrics file
+        :param chunk_size: Number of rows written at once
+        """
+        self.format = os.path.splitext(path)[1].lower().lstrip(".")
+        if self.format not in ("csv", "parquet", "npy"):
+            raise ValueError(f"Unsupported metrics format {path}")
+
+        if self.format == "parquet":
+            try:
+                import pyarrow
+                import pyarrow.parquet
+                self._pyarrow = pyarrow
+            except ImportError:
+                path = os.path.splitext(path)[0] + ".npy"
+                warnings.warn(f"pyarrow is not installed, writing the metrics to {path} instead")
+                self.format = "npy"
+
+        self.path = path
+        self.chunk = np.zeros(chunk_size, METRICS_DTYPE)
+        self.rows = 0
+        self.written = 0
+        self._file = None
+        self._writer = None
+
+        match self.format:
+            case "csv":
+                self._file = open(path, "w", newline="")
+                self._writer = csv.writer(self._file)
+                self._writer.writerow(METRICS_DTYPE.names)
+            case "parquet":
+                self._writer = self._pyarrow.parquet.ParquetWriter(path, self._get_arrow_schema())
+            case "npy":
+                # The header needs the row count, so the rows are collected in a side file until close()
+                self._file = open(f"{path}.rows", "wb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _get_arrow_schema(self):
+        pyarrow = self._pyarrow
+        types = {np.dtype(np.int64): pyarrow.int64(), np.dtype(np.float32): pyarrow.float32(),
+                 np.dtype(np.float64): pyarrow.float64()}
+        return pyarrow.schema([(name, types.get(METRICS_DTYPE[name], pyarrow.string()))
+                               for name in METRICS_DTYPE.names])
+
+    def write(self, analysis: FrameAnalysis):
+        """
+        Adds the results of a frame.
+
+        :param analysis: Analysis of the frame
+        """
+        row = self.chunk[self.rows]
+        row["frame_index"] = analysis.frame_index
+        row["video_angle"] = analysis.video_angle or ""
+        row["filmed_side"] = analysis.filmed_side or ""
+        for joint, coords in zip(SIDE_JOINTS, analysis.side_coords or (None,) * len(SIDE_JOINTS)):
+            row[f"{joint}_x"], row[f"{joint}_y"] = coords if coords is not None else (np.nan, np.nan)
+        for name in ("knee_angle", "hip_angle", "shin_angle", "hip_shift_angle"):
+            value = getattr(analysis, name)
+            row[name] = value if value is not None else np.nan
+        row["bar_x"], row["bar_y"] = analysis.bar_coords if analysis.bar_coords else (np.nan, np.nan)
+
+        self.rows += 1
+        if self.rows == len(self.chunk):
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the collected rows.
+        """
+        rows = self.chunk[:self.rows]
+        match self.format:
+            case "csv":
+                self._writer.writerows(
+                    ["" if isinstance(value, float) and math.isnan(value) else value for value in row]
+                    for row in rows.tolist()
+                )
+            case "parquet":
+                self._writer.write_table(self._pyarrow.table(
+                    {name: rows[name] for name in METRICS_DTYPE.names}, schema=self._writer.schema))
+            case "npy":
+                self._file.write(rows.tobytes())
+        self.written += self.rows
+        self.rows = 0
+
+    def close(self):
+        """
+        Writes the remaining rows and closes the file.
+        """
+        if self._file is None and self._writer is None:
+            return
+        self.flush()
+        if self.format == "parquet":
+            self._writer.close()
+        else:
+            self._file.close()
+        if self.format == "npy":
+            header = {"descr": np.lib.format.dtype_to_descr(METRICS_DTYPE), "fortran_order": False,
+                      "shape": (self.written,)}
+            with open(self.path, "wb") as npy_file, open(f"{self.path}.rows", "rb") as rows_file:
+                np.lib.format.write_array_header_1_0(npy_file, header)
+                shutil.copyfileobj(rows_file, npy_file)
+            os.remove(f"{self.path}.rows")
+        self._file = None
+        self._writer = None
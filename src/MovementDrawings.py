@@ -1,3 +1,5 @@
+from collections import deque
+
 import cv2
 import numpy as np
 
@@ -12,6 +14,11 @@ COLORS = {
 }
 
 
+def get_line_thickness(width: int, height: int) -> int:
+    # Line thickness based on image size
+    return max(1, int(min(width, height) / 500))
+
+
 class SquatDrawings:
     def __init__(self, image: np.ndarray, width: int, height: int):
         self.width = width
@@ -20,13 +27,21 @@ class SquatDrawings:
 
         # Calculate font scale and line thickness based on image size
         self.font_scale = min(self.width, self.height) / 1500
-        self.line_thickness = int(min(self.width, self.height) / 500)
-        if self.line_thickness < 1:
-            self.line_thickness = 1
+        self.line_thickness = get_line_thickness(self.width, self.height)
 
         self.header_text_x = 30
         self.header_text_y = int(self.font_scale * 50)
 
+    def draw_header(self, text: str):
+        cv2.putText(self.image,
+                    text,
+                    (self.header_text_x, self.header_text_y),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    self.font_scale,
+                    COLORS["white"],
+                    self.line_thickness,
+                    cv2.LINE_AA)
+
     def draw_side_angle_squat(self,
                               camera_angle: str,
                               hip: tuple[int, int],
@@ -37,17 +52,12 @@ class SquatDrawings:
                               hip_angle: float,
                               knee_angle: float,
                               shin_angle: float,
-                              scale: float
+                              scale: float,
+                              header: bool = True
                               ):
         # Draw the image
-        cv2.putText(self.image,
-                    f"Camera Angle: {camera_angle}",
-                    (self.header_text_x, self.header_text_y),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    self.font_scale,
-                    COLORS["white"],
-                    self.line_thickness,
-                    cv2.LINE_AA)
+        if header:
+            self.draw_header(f"Camera Angle: {camera_angle}")
 
         marker_lst = [hip, knee, ankle, shoulder, feet]
         for marker in marker_lst:
@@ -145,28 +155,20 @@ class SquatDrawings:
                     cv2.FONT_HERSHEY_SIMPLEX, self.font_scale, (0, 255, 0), self.line_thickness, cv2.LINE_AA)
         cv2.line(self.image, shoulder_middle, hip_middle, (0, 255, 0), 2)
 
-    def draw_bar_path(self, bar_path: list):
-        cv2.putText(self.image,
-                    "Bar Path",
-                    (self.header_text_x, self.header_text_y),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    self.font_scale,
-                    (255, 255, 255),
-                    self.line_thickness,
-                    cv2.LINE_AA)
+    def draw_bar_path(self, bar_path, header: bool = True):
+        if header:
+            self.draw_header("Bar Path")
+
+        if isinstance(bar_path, BarPathLayer):
+            bar_path.composite(self.image)
+            return
 
         for i in range(1, len(bar_path)):
             cv2.line(self.image, bar_path[i - 1], bar_path[i], (255, 255, 255), self.line_thickness)
 
-    def draw_balance(self, shoulder: tuple, feet: tuple, scale: float) -> None:
-        cv2.putText(self.image,
-                    "Balance Points",
-                    (self.header_text_x, self.header_text_y),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    self.font_scale,
-                    (255, 255, 255),
-                    self.line_thickness,
-                    cv2.LINE_AA)
+    def draw_balance(self, shoulder: tuple, feet: tuple, scale: float, header: bool = True) -> None:
+        if header:
+            self.draw_header("Balance Points")
 
         cv2.drawMarker(self.image,
                        (int(shoulder[0] * scale),
@@ -215,3 +217,77 @@ class SquatDrawings:
                  (0, 0, 255),
                  self.line_thickness
                  )
+
+
+class BarPathLayer:
+    """
+    Persistent canvas of the bar path that only draws the newest segment per point.
+
+    The canvas is composited onto a panel with a per-pixel maximum, so the cost per frame is constant
+    instead of growing with the length of the path. Old segments can fade out, or be dropped by a window
+    over the most recent points.
+    """
+
+    def __init__(self, width: int, height: int, line_thickness: int = 1, fade: int = None, window: int = None):
+        """
+        Initialize the BarPathLayer class.
+        :param width: Width of the panel the path is drawn on
+        :param height: Height of the panel the path is drawn on
+        :param line_thickness: Thickness of the path
+        :param fade: Number of new points after which a segment has faded out completely, or None to keep it
+        :param window: Number of most recent points that stay visible, or None to keep all of them;
+            older points are removed in batches, so up to 2 * window - 1 points are visible
+        """
+        if fade is not None and fade < 1:
+            raise ValueError("Fade must be at least 1 point")
+        if window is not None and window < 2:
+            raise ValueError("Window must be at least 2 points")
+
+        self.canvas = np.zeros((height, width, 3), np.uint8)
+        self.line_thickness = line_thickness
+        self.fade_step = -(-255 // fade) if fade is not None else 0
+        self.window = window
+        self.points = deque(maxlen=window if window is not None else 1)
+        self.points_since_redraw = 0
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def clear(self):
+        """
+        Removes the whole path.
+        """
+        self.canvas[:] = 0
+        self.points.clear()
+        self.points_since_redraw = 0
+
+    def add_point(self, point: tuple):
+        """
+        Appends a point to the path and draws the segment from the previous point.
+
+        :param point: Position (x, y) on the panel
+        """
+        if self.fade_step:
+            cv2.subtract(self.canvas, (self.fade_step,) * 3 + (0,), dst=self.canvas)
+
+        if self.window is not None and self.points_since_redraw >= self.window:
+            # Redraw only the window; done once every window points, so the cost per point stays constant
+            self.canvas[:] = 0
+            self.points_since_redraw = 0
+            for i in range(1, len(self.points)):
+                # Faded segments keep the intensity they had before the redraw
+                intensity = max(0, 255 - (len(self.points) - i) * self.fade_step)
+                cv2.line(self.canvas, self.points[i - 1], self.points[i], (intensity,) * 3, self.line_thickness)
+
+        if self.points:
+            cv2.line(self.canvas, self.points[-1], point, COLORS["white"], self.line_thickness)
+        self.points.append(point)
+        self.points_since_redraw += 1
+
+    def composite(self, image: np.ndarray):
+        """
+        Draws the path onto an image of the panel size.
+
+        :param image: The panel image
+        """
+        np.maximum(image, self.canvas, out=image)
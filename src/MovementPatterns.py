@@ -1,82 +1,220 @@
-from typing import Tuple, List
-import mediapipe as mp
+from typing import Tuple, Optional
+import numpy as np
 from dataclasses import dataclass
+from enum import IntEnum
 
-# Initialize Mediapipe Pose
-mp_pose = mp.solutions.pose
+
+class PoseLandmark(IntEnum):
+    """
+    Indices of the 33 landmarks of MediaPipe Pose, mirrored so the analysis runs without importing MediaPipe.
+    """
+    NOSE = 0
+    LEFT_EYE_INNER = 1
+    LEFT_EYE = 2
+    LEFT_EYE_OUTER = 3
+    RIGHT_EYE_INNER = 4
+    RIGHT_EYE = 5
+    RIGHT_EYE_OUTER = 6
+    LEFT_EAR = 7
+    RIGHT_EAR = 8
+    MOUTH_LEFT = 9
+    MOUTH_RIGHT = 10
+    LEFT_SHOULDER = 11
+    RIGHT_SHOULDER = 12
+    LEFT_ELBOW = 13
+    RIGHT_ELBOW = 14
+    LEFT_WRIST = 15
+    RIGHT_WRIST = 16
+    LEFT_PINKY = 17
+    RIGHT_PINKY = 18
+    LEFT_INDEX = 19
+    RIGHT_INDEX = 20
+    LEFT_THUMB = 21
+    RIGHT_THUMB = 22
+    LEFT_HIP = 23
+    RIGHT_HIP = 24
+    LEFT_KNEE = 25
+    RIGHT_KNEE = 26
+    LEFT_ANKLE = 27
+    RIGHT_ANKLE = 28
+    LEFT_HEEL = 29
+    RIGHT_HEEL = 30
+    LEFT_FOOT_INDEX = 31
+    RIGHT_FOOT_INDEX = 32
+
+
+def __getattr__(name: str):
+    # mp_pose used to be created at import time; it is still available, but only imports MediaPipe when used
+    if name == "mp_pose":
+        import mediapipe as mp
+
+        return mp.solutions.pose
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Landmarks of the joints stored in JointCoordinates, in attribute order
+JOINT_NAMES = (
+    "left_shoulder", "right_shoulder",
+    "left_hip", "right_hip",
+    "left_elbow", "right_elbow",
+    "left_knee", "right_knee",
+    "left_ankle", "right_ankle",
+    "left_foot", "right_foot",
+    "left_heel", "right_heel",
+)
+JOINT_LANDMARKS = np.array([
+    PoseLandmark.LEFT_SHOULDER.value, PoseLandmark.RIGHT_SHOULDER.value,
+    PoseLandmark.LEFT_HIP.value, PoseLandmark.RIGHT_HIP.value,
+    PoseLandmark.LEFT_ELBOW.value, PoseLandmark.RIGHT_ELBOW.value,
+    PoseLandmark.LEFT_KNEE.value, PoseLandmark.RIGHT_KNEE.value,
+    PoseLandmark.LEFT_ANKLE.value, PoseLandmark.RIGHT_ANKLE.value,
+    PoseLandmark.LEFT_FOOT_INDEX.value, PoseLandmark.RIGHT_FOOT_INDEX.value,
+    PoseLandmark.LEFT_HEEL.value, PoseLandmark.RIGHT_HEEL.value,
+])
+
+# Landmarks of shoulders, hips, elbows, knees and ankles compared to detect the camera angle;
+# the first row holds the left side, the second row the right side
+SIDE_JOINT_LANDMARKS = np.stack([JOINT_LANDMARKS[[0, 2, 4, 6, 8]], JOINT_LANDMARKS[[1, 3, 5, 7, 9]]])
+
+# Pairs of joint rows averaged into the midpoints: shoulders, hips, left foot, right foot
+MIDPOINT_PAIRS = ((0, 1), (2, 3), (10, 12), (11, 13))
+
+LANDMARK_COUNT = 33
+
+
+def landmarks_to_array(landmarks) -> np.ndarray:
+    """
+    Convert Mediapipe pose landmarks into one array.
+
+    Args:
+        landmarks: NormalizedLandmarkList, sequence of the 33 pose landmarks, or an array of shape (33, 4)
+
+    Returns:
+        np.ndarray: Array of shape (33, 4) with the columns x, y, z and visibility
+    """
+    if isinstance(landmarks, np.ndarray):
+        return landmarks.astype(np.float32, copy=False)
+
+    if hasattr(landmarks, "landmark"):
+        landmarks = landmarks.landmark
+    values = [float(value) for i in range(LANDMARK_COUNT)
+              for value in (landmarks[i].x, landmarks[i].y, landmarks[i].z, landmarks[i].visibility)]
+    return np.array(values, np.float32).reshape(LANDMARK_COUNT, 4)
+
+
+class LandmarkView:
+    """
+    Read-only view on one row of a landmark array with the attributes of a Mediapipe landmark
+    """
+    __slots__ = ("_landmarks", "_index")
+
+    def __init__(self, landmarks: np.ndarray, index: int):
+        self._landmarks = landmarks
+        self._index = index
+
+    @property
+    def x(self) -> float:
+        return float(self._landmarks[self._index, 0])
+
+    @property
+    def y(self) -> float:
+        return float(self._landmarks[self._index, 1])
+
+    @property
+    def z(self) -> float:
+        return float(self._landmarks[self._index, 2])
+
+    @property
+    def visibility(self) -> float:
+        return float(self._landmarks[self._index, 3])
+
+
+def _joint_property(row: int) -> property:
+    return property(lambda self: self._points[row], doc=f"Pixel coordinates [x, y] of the {JOINT_NAMES[row]}")
 
 
-@dataclass
 class JointCoordinates:
     """
-    Dataclass to store joint coordinates
+    Class to store joint coordinates
+
+    The joints are projected to pixel coordinates in one vectorized operation and exposed as [x, y] lists.
     """
-    left_shoulder: List
-    right_shoulder: List
-    left_hip: List
-    right_hip: List
-    left_elbow: List
-    right_elbow: List
-    left_knee: List
-    right_knee: List
-    left_ankle: List
-    right_ankle: List
-    left_foot: List
-    right_foot: List
-    left_heel: List
-    right_heel: List
-    video_width: int
-    video_height: int
+    __slots__ = ("pixels", "video_width", "video_height", "_points", "_midpoints")
+
+    def __init__(self, left_shoulder, right_shoulder, left_hip, right_hip, left_elbow, right_elbow,
+                 left_knee, right_knee, left_ankle, right_ankle, left_foot, right_foot,
+                 left_heel, right_heel, video_width: int, video_height: int):
+        joints = (left_shoulder, right_shoulder, left_hip, right_hip, left_elbow, right_elbow,
+                  left_knee, right_knee, left_ankle, right_ankle, left_foot, right_foot,
+                  left_heel, right_heel)
+        normalized = np.array([(float(joint.x), float(joint.y)) for joint in joints], np.float32)
+        self._project(normalized, video_width, video_height)
+
+    @classmethod
+    def from_array(cls, landmarks: np.ndarray, video_width: int, video_height: int) -> "JointCoordinates":
+        """
+        Create the joint coordinates from a (33, 4) landmark array.
+
+        Args:
+            landmarks (np.ndarray): Landmark array as returned by landmarks_to_array
+            video_width (int): Width of the video in pixels
+            video_height (int): Height of the video in pixels
+
+        Returns:
+            JointCoordinates: The joint coordinates
+        """
+        coordinates = cls.__new__(cls)
+        coordinates._project(landmarks[JOINT_LANDMARKS, :2], video_width, video_height)
+        return coordinates
+
+    def _project(self, normalized: np.ndarray, video_width: int, video_height: int):
+        self.video_width = video_width
+        self.video_height = video_height
+        # Truncating like int(), in float64 so the results match the Mediapipe values exactly
+        self.pixels = (normalized * np.array([video_width, video_height], np.float64)).astype(int)
+        self._points = self.pixels.tolist()
+        self._midpoints = [None, None, None, None]
+
+    def _get_midpoint(self, index: int) -> list:
+        # Computed on first access, in plain Python since the pair is already a list
+        midpoint = self._midpoints[index]
+        if midpoint is None:
+            first, second = MIDPOINT_PAIRS[index]
+            first, second = self._points[first], self._points[second]
+            midpoint = [int((first[0] + second[0]) / 2), int((first[1] + second[1]) / 2)]
+            self._midpoints[index] = midpoint
+        return midpoint
+
+    left_shoulder = _joint_property(0)
+    right_shoulder = _joint_property(1)
+    left_hip = _joint_property(2)
+    right_hip = _joint_property(3)
+    left_elbow = _joint_property(4)
+    right_elbow = _joint_property(5)
+    left_knee = _joint_property(6)
+    right_knee = _joint_property(7)
+    left_ankle = _joint_property(8)
+    right_ankle = _joint_property(9)
+    left_foot = _joint_property(10)
+    right_foot = _joint_property(11)
+    left_heel = _joint_property(12)
+    right_heel = _joint_property(13)
 
     @property
     def shoulder_midpoint(self):
-        return [int((self.left_shoulder[0] + self.right_shoulder[0]) / 2),
-                int((self.left_shoulder[1] + self.right_shoulder[1]) / 2)]
+        return self._get_midpoint(0)
 
     @property
     def hip_midpoint(self):
-        return [int((self.left_hip[0] + self.right_hip[0]) / 2),
-                int((self.left_hip[1] + self.right_hip[1]) / 2)]
+        return self._get_midpoint(1)
 
     @property
     def left_foot_midpoint(self):
-        return [int((self.left_foot[0] + self.left_heel[0]) / 2),
-                int((self.left_foot[1] + self.left_heel[1]) / 2)]
+        return self._get_midpoint(2)
 
     @property
     def right_foot_midpoint(self):
-        return [int((self.right_foot[0] + self.right_heel[0]) / 2),
-                int((self.right_foot[1] + self.right_heel[1]) / 2)]
-
-    def __post_init__(self):
-        self.left_shoulder = [int(self.left_shoulder.x * self.video_width),
-                              int(self.left_shoulder.y * self.video_height)]
-        self.right_shoulder = [int(self.right_shoulder.x * self.video_width),
-                               int(self.right_shoulder.y * self.video_height)]
-        self.left_hip = [int(self.left_hip.x * self.video_width),
-                         int(self.left_hip.y * self.video_height)]
-        self.right_hip = [int(self.right_hip.x * self.video_width),
-                          int(self.right_hip.y * self.video_height)]
-        self.left_elbow = [int(self.left_elbow.x * self.video_width),
-                           int(self.left_elbow.y * self.video_height)]
-        self.right_elbow = [int(self.right_elbow.x * self.video_width),
-                            int(self.right_elbow.y * self.video_height)]
-        self.left_knee = [int(self.left_knee.x * self.video_width),
-                          int(self.left_knee.y * self.video_height)]
-        self.right_knee = [int(self.right_knee.x * self.video_width),
-                           int(self.right_knee.y * self.video_height)]
-        self.left_ankle = [int(self.left_ankle.x * self.video_width),
-                           int(self.left_ankle.y * self.video_height)]
-        self.right_ankle = [int(self.right_ankle.x * self.video_width),
-                            int(self.right_ankle.y * self.video_height)]
-        self.left_foot = [int(self.left_foot.x * self.video_width),
-                          int(self.left_foot.y * self.video_height)]
-        self.right_foot = [int(self.right_foot.x * self.video_width),
-                           int(self.right_foot.y * self.video_height)]
-        self.left_heel = [int(self.left_heel.x * self.video_width),
-                          int(self.left_heel.y * self.video_height)]
-        self.right_heel = [int(self.right_heel.x * self.video_width),
-                           int(self.right_heel.y * self.video_height)]
+        return self._get_midpoint(3)
 
 
 class SquatPose:
@@ -85,74 +223,62 @@ class SquatPose:
     """
 
     def __init__(self, landmarks, video_width: int, video_height: int):
-        self.landmarks = landmarks
-
-        self.shoulders = (landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value],
-                          landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value])
-        self.hips = (landmarks[mp_pose.PoseLandmark.LEFT_HIP.value],
-                     landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value])
-        self.elbows = (landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value],
-                       landmarks[mp_pose.PoseLandmark.RIGHT_ELBOW.value])
-        self.knees = (landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value],
-                      landmarks[mp_pose.PoseLandmark.RIGHT_KNEE.value])
-        self.ankles = (landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value],
-                       landmarks[mp_pose.PoseLandmark.RIGHT_ANKLE.value])
-        self.feet = (landmarks[mp_pose.PoseLandmark.LEFT_FOOT_INDEX.value],
-                     landmarks[mp_pose.PoseLandmark.RIGHT_FOOT_INDEX.value])
-        self.heels = (landmarks[mp_pose.PoseLandmark.LEFT_HEEL.value],
-                      landmarks[mp_pose.PoseLandmark.RIGHT_HEEL.value])
+        self.landmarks = landmarks_to_array(landmarks)
 
         self.video_width = video_width
         self.video_height = video_height
 
-        self.coordinates = JointCoordinates(self.shoulders[0], self.shoulders[1],
-                                            self.hips[0], self.hips[1],
-                                            self.elbows[0], self.elbows[1],
-                                            self.knees[0], self.knees[1],
-                                            self.ankles[0], self.ankles[1],
-                                            self.feet[0], self.feet[1],
-                                            self.heels[0], self.heels[1],
-                                            self.video_width,
-                                            self.video_height)
+        self.coordinates = JointCoordinates.from_array(self.landmarks, self.video_width, self.video_height)
+
+    def _landmark_pair(self, left: PoseLandmark, right: PoseLandmark) -> tuple:
+        return LandmarkView(self.landmarks, left.value), LandmarkView(self.landmarks, right.value)
+
+    @property
+    def shoulders(self) -> tuple:
+        return self._landmark_pair(PoseLandmark.LEFT_SHOULDER, PoseLandmark.RIGHT_SHOULDER)
+
+    @property
+    def hips(self) -> tuple:
+        return self._landmark_pair(PoseLandmark.LEFT_HIP, PoseLandmark.RIGHT_HIP)
+
+    @property
+    def elbows(self) -> tuple:
+        return self._landmark_pair(PoseLandmark.LEFT_ELBOW, PoseLandmark.RIGHT_ELBOW)
+
+    @property
+    def knees(self) -> tuple:
+        return self._landmark_pair(PoseLandmark.LEFT_KNEE, PoseLandmark.RIGHT_KNEE)
+
+    @property
+    def ankles(self) -> tuple:
+        return self._landmark_pair(PoseLandmark.LEFT_ANKLE, PoseLandmark.RIGHT_ANKLE)
+
+    @property
+    def feet(self) -> tuple:
+        return self._landmark_pair(PoseLandmark.LEFT_FOOT_INDEX, PoseLandmark.RIGHT_FOOT_INDEX)
+
+    @property
+    def heels(self) -> tuple:
+        return self._landmark_pair(PoseLandmark.LEFT_HEEL, PoseLandmark.RIGHT_HEEL)
 
     @staticmethod
-    def visibility_difference(relevant_landmarks: Tuple[mp_pose.PoseLandmark, mp_pose.PoseLandmark],
+    def visibility_difference(relevant_landmarks: Tuple[PoseLandmark, PoseLandmark],
                               threshold: float = 0.2) -> bool:
         """Calculate the difference in visibility between two landmarks"""
         return abs(relevant_landmarks[0].visibility - relevant_landmarks[1].visibility) < threshold
 
     def check_visibility(self, threshold: float = 0.2) -> str:
-        """Check visibility differences for all landmarks"""
-        visibility = {
-            'shoulders': self.visibility_difference(self.shoulders, threshold),
-            'hips': self.visibility_difference(self.hips, threshold),
-            'elbows': self.visibility_difference(self.elbows, threshold),
-            'knees': self.visibility_difference(self.knees, threshold),
-            'ankles': self.visibility_difference(self.ankles, threshold),
-        }
-        if all(visibility.values()):
+        """Check visibility differences of shoulders, hips, elbows, knees and ankles"""
+        visibility = self.landmarks[SIDE_JOINT_LANDMARKS, 3]
+        if np.abs(visibility[0] - visibility[1]).max() < threshold:
             return "Back Angle"
         else:
             return "Side Angle"
 
     def check_which_side_is_visible(self) -> str:
         """Check which side is visible"""
-        right_side_joints = [
-            self.shoulders[1],
-            self.hips[1],
-            self.elbows[1],
-            self.knees[1],
-            self.ankles[1]
-        ]
-        left_side_joints = [
-            self.shoulders[0],
-            self.hips[0],
-            self.elbows[0],
-            self.knees[0],
-            self.ankles[0]
-        ]
-        right_side_visibility = sum(joint.visibility for joint in right_side_joints)
-        left_side_visibility = sum(joint.visibility for joint in left_side_joints)
+        left_side_visibility, right_side_visibility = self.landmarks[SIDE_JOINT_LANDMARKS, 3].sum(axis=1,
+                                                                                                   dtype=np.float64)
 
         if right_side_visibility > left_side_visibility:
             return "Right"
@@ -193,3 +319,22 @@ class SquatPose:
 
     def get_hip_midpoint(self) -> list[int]:
         return self.coordinates.hip_midpoint
+
+
+@dataclass
+class FrameAnalysis:
+    """
+    Dataclass to store the analysis results of a single frame
+    """
+    frame_index: int
+    squat_pose: Optional[SquatPose] = None
+    video_angle: Optional[str] = None
+    filmed_side: Optional[str] = None
+    side_coords: Optional[tuple] = None
+    knee_angle: Optional[float] = None
+    hip_angle: Optional[float] = None
+    shin_angle: Optional[float] = None
+    hip_shift_angle: Optional[float] = None
+    bar_coords: Optional[tuple] = None
+    # Copied from the last analyzed frame because the frame was static
+    reused: bool = False
@@ -0,0 +1,172 @@
+import queue
+import threading
+
+# Marks the end of the frame stream between two pipeline stages
+_END_OF_STREAM = object()
+
+
+class _StageError:
+    """
+    Wraps an exception raised in a pipeline stage so it can be re-raised on the consuming thread.
+    """
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class FramePipeline:
+    """
+    Runs the decode, pose and barbell stages of a FrameHandler on separate threads.
+
+    The stages are connected by bounded queues and each stage runs on exactly one thread,
+    so frames leave the pipeline in the same order they were decoded. Rendering and output
+    stay on the consuming thread, which keeps HighGUI calls on the main thread.
+    """
+
+    def __init__(self, frame_handler, queue_size: int = 4, frame_ranges: list = None):
+        """
+        Initialize the FramePipeline class.
+        :param frame_handler: FrameHandler providing read_frames, analyze_pose and detect_barbell
+        :param queue_size: Maximum number of frames buffered between two stages
+        :param frame_ranges: (start frame, end frame) ranges decoded in order, or None to decode the whole video
+        """
+        if queue_size < 1:
+            raise ValueError("Queue size must be at least 1")
+
+        self.frame_handler = frame_handler
+        self.queue_size = queue_size
+        self.frame_ranges = frame_ranges
+        self._stop_event = threading.Event()
+
+    def _put(self, output_queue: queue.Queue, item) -> bool:
+        """
+        Puts an item into a queue while watching for a stop request.
+
+        :param output_queue: Queue of the next stage.
+        :param item: Item to put.
+        :return: False if the pipeline was stopped before the item could be queued.
+        """
+        while not self._stop_event.is_set():
+            try:
+                output_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, input_queue: queue.Queue):
+        """
+        Gets an item from a queue while watching for a stop request.
+
+        :param input_queue: Queue of the previous stage.
+        :return: The item, or the end of stream marker if the pipeline was stopped.
+        """
+        while not self._stop_event.is_set():
+            try:
+                return input_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END_OF_STREAM
+
+    def _read_frames(self):
+        if self.frame_ranges is None:
+            yield from self.frame_handler.read_frames()
+            return
+        for start_frame, end_frame in self.frame_ranges:
+            yield from self.frame_handler.read_frames(start_frame, end_frame)
+
+    def _decode_stage(self, output_queue: queue.Queue):
+        """
+        Decodes and resizes frames.
+
+        :param output_queue: Queue of the pose stage.
+        """
+        try:
+            for frame_index, frame in self._read_frames():
+                if not self._put(output_queue, (frame_index, frame)):
+                    return
+        except Exception as error:
+            self._put(output_queue, _StageError(error))
+            return
+        self._put(output_queue, _END_OF_STREAM)
+
+    def _pose_stage(self, input_queue: queue.Queue, output_queue: queue.Queue):
+        """
+        Runs pose inference and angle calculations.
+
+        :param input_queue: Queue of the decode stage.
+        :param output_queue: Queue of the barbell stage.
+        """
+        while True:
+            item = self._get(input_queue)
+            if item is _END_OF_STREAM or isinstance(item, _StageError):
+                self._put(output_queue, item)
+                return
+
+            frame_index, frame = item
+            try:
+                analysis = self.frame_handler.analyze_pose(frame_index, frame)
+            except Exception as error:
+                self._put(output_queue, _StageError(error))
+                return
+            if not self._put(output_queue, (frame, analysis)):
+                return
+
+    def _barbell_stage(self, input_queue: queue.Queue, output_queue: queue.Queue):
+        """
+        Runs barbell detection.
+
+        :param input_queue: Queue of the pose stage.
+        :param output_queue: Queue read by the consuming thread.
+        """
+        while True:
+            item = self._get(input_queue)
+            if item is _END_OF_STREAM or isinstance(item, _StageError):
+                self._put(output_queue, item)
+                return
+
+            frame, analysis = item
+            try:
+                analysis = self.frame_handler.detect_barbell(analysis, frame)
+            except Exception as error:
+                self._put(output_queue, _StageError(error))
+                return
+            if not self._put(output_queue, (frame, analysis)):
+                return
+
+    def run(self):
+        """
+        Starts the stage threads and yields their results.
+
+        Closing the generator early stops all stages.
+
+        :return: Generator of (frame, analysis) tuples in frame order.
+        """
+        decoded_frames = queue.Queue(self.queue_size)
+        posed_frames = queue.Queue(self.queue_size)
+        analyzed_frames = queue.Queue(self.queue_size)
+
+        threads = [
+            threading.Thread(target=self._decode_stage, args=(decoded_frames,),
+                             name="FormCoachAI-decode", daemon=True),
+            threading.Thread(target=self._pose_stage, args=(decoded_frames, posed_frames),
+                             name="FormCoachAI-pose", daemon=True),
+            threading.Thread(target=self._barbell_stage, args=(posed_frames, analyzed_frames),
+                             name="FormCoachAI-barbell", daemon=True),
+        ]
+        self._stop_event.clear()
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = self._get(analyzed_frames)
+                if item is _END_OF_STREAM:
+                    return
+                if isinstance(item, _StageError):
+                    raise item.error
+                yield item
+        finally:
+            self._stop_event.set()
+            for thread in threads:
+                thread.join()
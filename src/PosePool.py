@@ -0,0 +1,142 @@
+import threading
+
+import numpy as np
+
+# Size of the blank frame used to initialize the inference graph of a new Pose instance
+WARM_UP_FRAME_SIZE = (64, 64)
+
+
+class PosePool:
+    """
+    Process-wide pool of MediaPipe Pose instances keyed by their configuration.
+
+    Loading the model and initializing its inference graph takes far longer than analyzing a frame, so
+    FrameHandlers take a Pose from the pool and hand it back when they are closed, and the next FrameHandler
+    with the same configuration reuses it. Resetting a Pose restarts its graph, so a released instance is reset
+    and initialized again on a background thread before it becomes idle. Every instance is used by one
+    FrameHandler at a time, since a Pose keeps tracking state and is not thread-safe. MediaPipe is only
+    imported when the first Pose is created.
+    """
+
+    def __init__(self):
+        self._idle = {}
+        self._warming = {}
+        self._condition = threading.Condition()
+        self.created = 0
+        self.reused = 0
+
+    @property
+    def stats(self) -> dict:
+        """
+        Counts of created and reused Pose instances, and of the instances currently idle in the pool.
+        """
+        with self._condition:
+            idle = sum(len(poses) for poses in self._idle.values())
+        return {"created": self.created, "reused": self.reused, "idle": idle}
+
+    @staticmethod
+    def _get_key(config: dict) -> tuple:
+        return tuple(sorted((config or {}).items()))
+
+    @staticmethod
+    def _create(config: dict):
+        import mediapipe as mp
+
+        return mp.solutions.pose.Pose(**(config or {}))
+
+    @staticmethod
+    def warm(pose):
+        """
+        Drops the tracking state and initializes the inference graph with one inference on a blank frame,
+        so the first analyzed frame is not slower than the rest.
+
+        :param pose: The Pose instance
+        """
+        pose.reset()
+        pose.process(np.zeros((*WARM_UP_FRAME_SIZE, 3), np.uint8))
+
+    def acquire(self, config: dict = None):
+        """
+        Takes an idle Pose with the configuration from the pool, or creates one.
+
+        Waits for an instance that is being initialized after its release rather than creating another one.
+
+        :param config: Keyword arguments for the Mediapipe Pose model
+        :return: The Pose instance, reserved for the caller until it is released
+        """
+        key = self._get_key(config)
+        with self._condition:
+            self._condition.wait_for(lambda: self._idle.get(key) or not self._warming.get(key))
+            idle = self._idle.get(key)
+            if idle:
+                self.reused += 1
+                return idle.pop()
+            self.created += 1
+        return self._create(config)
+
+    def _add_idle(self, key: tuple, pose):
+        with self._condition:
+            self._idle.setdefault(key, []).append(pose)
+            self._condition.notify_all()
+
+    def _warm_and_add(self, key: tuple, pose):
+        try:
+            self.warm(pose)
+            self._add_idle(key, pose)
+        finally:
+            with self._condition:
+                self._warming[key] -= 1
+                self._condition.notify_all()
+
+    def release(self, pose, config: dict = None):
+        """
+        Returns a Pose to the pool; it becomes idle once it is reset and initialized on a background thread.
+
+        :param pose: The Pose instance taken with acquire()
+        :param config: The configuration it was acquired with
+        """
+        key = self._get_key(config)
+        with self._condition:
+            self._warming[key] = self._warming.get(key, 0) + 1
+        # Not a daemon thread: the interpreter must not exit while MediaPipe is running
+        threading.Thread(target=self._warm_and_add, args=(key, pose), name="pose-warm-up").start()
+
+    def warm_up(self, config: dict = None, count: int = 1):
+        """
+        Creates and initializes Pose instances ahead of time, e.g. when a worker process starts.
+
+        :param config: Keyword arguments for the Mediapipe Pose model
+        :param count: Number of idle instances with the configuration the pool should hold
+        """
+        key = self._get_key(config)
+        with self._condition:
+            missing = count - len(self._idle.get(key, [])) - self._warming.get(key, 0)
+            self.created += max(0, missing)
+        for _ in range(missing):
+            pose = self._create(config)
+            self.warm(pose)
+            self._add_idle(key, pose)
+
+    def clear(self):
+        """
+        Closes all idle Pose instances, after the released ones finished initializing.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: not any(self._warming.values()))
+            idle, self._idle = self._idle, {}
+        for poses in idle.values():
+            for pose in poses:
+                pose.close()
+
+
+# Pool of the current process
+_pose_pool = PosePool()
+
+
+def get_pose_pool() -> PosePool:
+    """
+    Returns the Pose pool of the current process.
+
+    :return: The process-wide PosePool
+    """
+    return _pose_pool
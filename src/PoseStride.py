@@ -0,0 +1,97 @@
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+from src.MovementPatterns import JOINT_LANDMARKS
+
+
+class AdaptivePoseStride:
+    """
+    Decides on which frames pose inference runs and estimates the landmarks of the frames in between.
+
+    While the joints barely move between two inferred keyframes, the stride doubles up to max_stride.
+    As soon as the motion exceeds the threshold, e.g. during descent and ascent, inference runs on
+    every frame again. Intermediate frames get landmarks extrapolated linearly from the last two
+    keyframes, since interpolating towards a later keyframe would require running MediaPipe's
+    tracking out of frame order.
+    """
+
+    def __init__(self, max_stride: int = 4, motion_threshold: float = 0.004):
+        """
+        Initialize the AdaptivePoseStride class.
+        :param max_stride: Maximum number of frames between two inferences
+        :param motion_threshold: Joint motion per frame, in normalized image coordinates, below which the stride grows
+        """
+        if max_stride < 1:
+            raise ValueError("Maximum stride must be at least 1")
+
+        self.max_stride = max_stride
+        self.motion_threshold = motion_threshold
+        self.stride = 1
+        self.keyframes = deque(maxlen=2)
+
+        self.inferences = 0
+        self.estimated = 0
+
+    @property
+    def stats(self) -> dict:
+        """
+        Counts of frames with pose inference and of frames whose inference was saved.
+        """
+        return {"inferences": self.inferences, "saved": self.estimated}
+
+    def should_infer(self, frame_index: int) -> bool:
+        """
+        Checks if pose inference has to run on a frame.
+
+        :param frame_index: Index of the frame
+        :return: True if the frame is a keyframe
+        """
+        if not self.keyframes:
+            return True
+        return frame_index - self.keyframes[-1][0] >= self.stride
+
+    def add_keyframe(self, frame_index: int, landmarks: Optional[np.ndarray]):
+        """
+        Records the inference result of a keyframe and adapts the stride to the joint motion.
+
+        :param frame_index: Index of the frame
+        :param landmarks: Landmark array of shape (33, 4), or None if no pose was found
+        """
+        self.inferences += 1
+        if landmarks is None:
+            # Without a pose there is nothing to extrapolate from
+            self.keyframes.clear()
+            self.stride = 1
+            return
+
+        self.keyframes.append((frame_index, landmarks))
+        if len(self.keyframes) < 2:
+            return
+
+        (previous_index, previous), (last_index, last) = self.keyframes
+        motion = np.abs(last[JOINT_LANDMARKS, :2] - previous[JOINT_LANDMARKS, :2]).max() / (last_index - previous_index)
+        if motion < self.motion_threshold:
+            self.stride = min(self.stride * 2, self.max_stride)
+        else:
+            self.stride = 1
+
+    def estimate(self, frame_index: int) -> np.ndarray:
+        """
+        Estimates the landmarks of a frame between keyframes.
+
+        :param frame_index: Index of the frame
+        :return: Landmark array of shape (33, 4)
+        """
+        self.estimated += 1
+        last_index, last = self.keyframes[-1]
+        if len(self.keyframes) < 2:
+            return last
+
+        previous_index, previous = self.keyframes[0]
+        landmarks = last.copy()
+        # Positions continue with the velocity between the keyframes; depth and visibility are held
+        velocity = (last[:, :2] - previous[:, :2]) / (last_index - previous_index)
+        landmarks[:, :2] += velocity * (frame_index - last_index)
+        return landmarks
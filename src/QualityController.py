@@ -0,0 +1,163 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+# Pose settings from the highest to the lowest quality. pose_width None infers on the scaled frame; a lower
+# tracking confidence keeps tracking the lifter instead of running the detector again.
+QUALITY_LEVELS = (
+    {"model_complexity": 2, "pose_width": None, "min_detection_confidence": 0.5, "min_tracking_confidence": 0.5},
+    {"model_complexity": 1, "pose_width": None, "min_detection_confidence": 0.5, "min_tracking_confidence": 0.5},
+    {"model_complexity": 1, "pose_width": 480, "min_detection_confidence": 0.5, "min_tracking_confidence": 0.5},
+    {"model_complexity": 0, "pose_width": 480, "min_detection_confidence": 0.5, "min_tracking_confidence": 0.5},
+    {"model_complexity": 0, "pose_width": 256, "min_detection_confidence": 0.5, "min_tracking_confidence": 0.3},
+)
+
+# Level with MediaPipe's default settings, where every run starts
+DEFAULT_QUALITY_LEVEL = 1
+
+
+@dataclass
+class QualitySegment:
+    """
+    Dataclass to store the Pose settings used for a range of frames.
+    """
+    start_frame: int
+    end_frame: int
+    level: int
+    settings: dict
+    inferences: int = 0
+    latency_sum: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "start_frame": self.start_frame,
+            "end_frame": self.end_frame,
+            "level": self.level,
+            "settings": self.settings,
+            "inferences": self.inferences,
+            "latency_mean": self.latency_sum / self.inferences if self.inferences else 0.0,
+        }
+
+
+class QualityController:
+    """
+    Chooses the Pose settings that keep the inference latency within a budget.
+
+    The median latency of the recent inferences is compared against the budget: above it, the controller
+    steps down one quality level, well below it, it steps up again unless that level was recently measured
+    to be too slow. The inferences right after a switch are not measured, since they include loading and
+    initializing the new model. Every switch starts a new segment recording the settings of its frame range.
+    """
+
+    def __init__(self, budget: float, levels: tuple = QUALITY_LEVELS, start_level: int = DEFAULT_QUALITY_LEVEL,
+                 window: int = 15, upgrade_ratio: float = 0.5, settle_frames: int = 5, retry_frames: int = 300):
+        """
+        Initialize the QualityController class.
+        :param budget: Target pose inference latency in seconds per frame
+        :param levels: Pose settings from the highest to the lowest quality, see QUALITY_LEVELS
+        :param start_level: Index of the level to start with
+        :param window: Number of recent inferences whose median latency is compared against the budget
+        :param upgrade_ratio: Share of the budget the latency must stay below to step up a level
+        :param settle_frames: Number of inferences after a switch that are not measured
+        :param retry_frames: Number of frames after which a level measured to be too slow is tried again
+        """
+        if not 0 <= start_level < len(levels):
+            raise ValueError(f"Invalid start level {start_level}")
+
+        self.budget = budget
+        self.levels = levels
+        self.level = start_level
+        self.upgrade_ratio = upgrade_ratio
+        self.settle_frames = settle_frames
+        self.retry_frames = retry_frames
+
+        self.latencies = deque(maxlen=window)
+        self.settling = settle_frames
+        # Level to (median latency, frame index) of its last measurement
+        self.measured = {}
+        self.unavailable = set()
+        self.segments = []
+
+    @property
+    def settings(self) -> dict:
+        """
+        The Pose settings of the current level.
+        """
+        return self.levels[self.level]
+
+    @property
+    def stats(self) -> dict:
+        """
+        Current level, number of switches, levels whose model could not be loaded, and the settings
+        used for every frame range.
+        """
+        return {
+            "level": self.level,
+            "switches": max(0, len(self.segments) - 1),
+            "unavailable": sorted(self.unavailable),
+            "segments": [segment.to_dict() for segment in self.segments],
+        }
+
+    def _find_level(self, step: int, frame_index: int) -> Optional[int]:
+        level = self.level + step
+        while 0 <= level < len(self.levels):
+            if level not in self.unavailable:
+                latency, measured_frame = self.measured.get(level, (0.0, frame_index))
+                # Stepping up to a level that was too slow is only retried after a while
+                if step > 0 or latency <= self.budget or frame_index - measured_frame >= self.retry_frames:
+                    return level
+                return None
+            level += step
+        return None
+
+    def observe(self, frame_index: int, seconds: float) -> Optional[int]:
+        """
+        Records the latency of an inference.
+
+        :param frame_index: Index of the frame
+        :param seconds: Latency of the inference
+        :return: Index of the level to switch to, or None to keep the current one
+        """
+        if not self.segments:
+            self.segments.append(QualitySegment(frame_index, frame_index, self.level, self.settings))
+        segment = self.segments[-1]
+        segment.end_frame = frame_index
+        segment.inferences += 1
+        segment.latency_sum += seconds
+
+        if self.settling > 0:
+            self.settling -= 1
+            return None
+        self.latencies.append(seconds)
+        if len(self.latencies) < self.latencies.maxlen:
+            return None
+
+        latency = float(np.median(self.latencies))
+        self.measured[self.level] = (latency, frame_index)
+        if latency > self.budget:
+            return self._find_level(1, frame_index)
+        if latency < self.budget * self.upgrade_ratio:
+            return self._find_level(-1, frame_index)
+        return None
+
+    def switch(self, level: int, frame_index: int):
+        """
+        Switches to a level once its settings are in use.
+
+        :param level: Index of the level
+        :param frame_index: Index of the first frame analyzed with the level
+        """
+        self.level = level
+        self.latencies.clear()
+        self.settling = self.settle_frames
+        self.segments.append(QualitySegment(frame_index, frame_index, level, self.settings))
+
+    def mark_unavailable(self, level: int):
+        """
+        Excludes a level whose model could not be loaded, e.g. because it can't be downloaded.
+
+        :param level: Index of the level
+        """
+        self.unavailable.add(level)
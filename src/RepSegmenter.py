@@ -0,0 +1,165 @@
+import dataclasses
+from dataclasses import dataclass
+from typing import List, Optional
+
+from src.MovementPatterns import FrameAnalysis
+
+# Angles tracked per rep, as attribute names of FrameAnalysis
+REP_ANGLES = ("knee_angle", "hip_angle", "shin_angle")
+
+
+@dataclass
+class RepRecord:
+    """
+    Dataclass to store the results of one completed rep
+    """
+    number: int
+    start_frame: int
+    bottom_frame: int
+    lockout_frame: int
+    # Hip below knee at the bottom in pixels; positive values are below parallel
+    depth: float
+    time_under_tension: float
+    descent_time: float
+    ascent_time: float
+    min_knee_angle: float
+    max_knee_angle: float
+    min_hip_angle: Optional[float]
+    max_hip_angle: Optional[float]
+    min_shin_angle: Optional[float]
+    max_shin_angle: Optional[float]
+
+    def to_dict(self) -> dict:
+        return dataclasses.asdict(self)
+
+
+class RepSegmenter:
+    """
+    Streaming state machine that splits the per-frame knee angles of a side angle video into reps.
+
+    A rep starts when the knee angle drops below start_angle, and completes when it rises above
+    lockout_angle again after the knee was bent below depth_angle. Every frame is processed with
+    constant work and memory, and a rep record is returned on the frame that completes the rep.
+    """
+
+    def __init__(self, fps: float, start_angle: float = 160, lockout_angle: float = 165,
+                 depth_angle: float = 120, max_gap: int = 15):
+        """
+        Initialize the RepSegmenter class.
+        :param fps: Frame rate of the video
+        :param start_angle: Knee angle below which the descent of a rep starts
+        :param lockout_angle: Knee angle above which the lifter is locked out
+        :param depth_angle: Knee angle the rep has to go below to count
+        :param max_gap: Number of consecutive frames without a side pose after which a running rep is dropped
+        """
+        if lockout_angle < start_angle:
+            raise ValueError("Lockout angle must not be below the start angle")
+
+        self.fps = fps
+        self.start_angle = start_angle
+        self.lockout_angle = lockout_angle
+        self.depth_angle = depth_angle
+        self.max_gap = max_gap
+
+        self.reps: List[RepRecord] = []
+        self.dropped = 0
+        self.reset()
+
+    def reset(self):
+        """
+        Drops the running rep and waits for the lifter to stand.
+        """
+        self.in_rep = False
+        self.last_standing_frame = None
+        self.last_frame = None
+        self.bottom_frame = None
+        self.bottom_angle = None
+        self.depth = None
+        self.angle_ranges = {}
+
+    @property
+    def stats(self) -> dict:
+        """
+        Counts of completed reps and of reps dropped because they were too shallow or the pose was lost.
+        """
+        return {"reps": len(self.reps), "dropped": self.dropped}
+
+    def _update_angle_ranges(self, analysis: FrameAnalysis):
+        for name in REP_ANGLES:
+            angle = getattr(analysis, name)
+            if angle is None:
+                continue
+            low, high = self.angle_ranges.get(name, (angle, angle))
+            self.angle_ranges[name] = (min(low, angle), max(high, angle))
+
+    def _complete_rep(self, lockout_frame: int) -> RepRecord:
+        start_frame = self.last_standing_frame
+        rep = RepRecord(
+            number=len(self.reps) + 1,
+            start_frame=start_frame,
+            bottom_frame=self.bottom_frame,
+            lockout_frame=lockout_frame,
+            depth=self.depth,
+            time_under_tension=(lockout_frame - start_frame) / self.fps,
+            descent_time=(self.bottom_frame - start_frame) / self.fps,
+            ascent_time=(lockout_frame - self.bottom_frame) / self.fps,
+            min_knee_angle=self.angle_ranges["knee_angle"][0],
+            max_knee_angle=self.angle_ranges["knee_angle"][1],
+            min_hip_angle=self.angle_ranges.get("hip_angle", (None, None))[0],
+            max_hip_angle=self.angle_ranges.get("hip_angle", (None, None))[1],
+            min_shin_angle=self.angle_ranges.get("shin_angle", (None, None))[0],
+            max_shin_angle=self.angle_ranges.get("shin_angle", (None, None))[1],
+        )
+        self.reps.append(rep)
+        return rep
+
+    def update(self, analysis: FrameAnalysis) -> Optional[RepRecord]:
+        """
+        Processes the analysis of the next frame.
+
+        :param analysis: Analysis of the frame
+        :return: The record of the rep completed on this frame, or None
+        """
+        knee_angle = analysis.knee_angle
+        if knee_angle is None or knee_angle != knee_angle:
+            # No side pose on this frame
+            return None
+
+        frame_index = analysis.frame_index
+        if self.last_frame is not None and frame_index - self.last_frame > self.max_gap:
+            # The pose was lost too long to trust the running rep
+            if self.in_rep:
+                self.dropped += 1
+            self.reset()
+        self.last_frame = frame_index
+
+        if not self.in_rep:
+            if knee_angle >= self.start_angle:
+                self.last_standing_frame = frame_index
+                return None
+            if self.last_standing_frame is None:
+                # The video started mid-rep
+                return None
+            self.in_rep = True
+            self.angle_ranges = {}
+
+        self._update_angle_ranges(analysis)
+        if self.bottom_angle is None or knee_angle < self.bottom_angle:
+            self.bottom_angle = knee_angle
+            self.bottom_frame = frame_index
+            hip, knee = analysis.side_coords[0], analysis.side_coords[1]
+            self.depth = float(hip[1] - knee[1])
+
+        if knee_angle < self.lockout_angle:
+            return None
+
+        # Locked out again
+        rep = None
+        if self.bottom_angle < self.depth_angle:
+            rep = self._complete_rep(frame_index)
+        else:
+            self.dropped += 1
+        self.reset()
+        self.last_standing_frame = frame_index
+        self.last_frame = frame_index
+        return rep
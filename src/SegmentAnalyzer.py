@@ -0,0 +1,160 @@
+import argparse
+import dataclasses
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+import cv2
+
+from src.BatchAnalyzer import init_worker, get_worker_frame_handler
+from src.MovementPatterns import FrameAnalysis
+
+
+@dataclass
+class VideoTimeline:
+    """
+    Dataclass to store the merged per-frame results of a video
+    """
+    frames: List[FrameAnalysis] = field(default_factory=list)
+    bar_path: List[Tuple[int, int]] = field(default_factory=list)
+    camera_angles: List[Tuple[int, int, str]] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """
+        Converts the timeline into JSON serializable data.
+
+        :return: Timeline as a dictionary
+        """
+        frames = []
+        for analysis in self.frames:
+            frame = dataclasses.asdict(dataclasses.replace(analysis, squat_pose=None))
+            del frame["squat_pose"]
+            frames.append(frame)
+        return {
+            "frames": frames,
+            "bar_path": [list(point) for point in self.bar_path],
+            "camera_angles": [list(angle_range) for angle_range in self.camera_angles],
+        }
+
+
+def split_frame_ranges(frame_count: int, segments: int, min_segment_length: int = 1) -> list[tuple[int, int]]:
+    """
+    Splits a video into contiguous frame ranges of roughly equal length.
+
+    :param frame_count: Number of frames in the video
+    :param segments: Requested number of ranges
+    :param min_segment_length: Minimum number of frames per range
+    :return: List of (start frame, end frame) ranges; the end frame is exclusive
+    """
+    segments = max(1, min(segments, frame_count // max(1, min_segment_length)))
+    boundaries = [frame_count * segment // segments for segment in range(segments + 1)]
+    return [(boundaries[i], boundaries[i + 1]) for i in range(segments)]
+
+
+def analyze_segment(video_path: str, start_frame: int, end_frame: int, warmup: int = 15,
+                    scale: float = 1) -> list[FrameAnalysis]:
+    """
+    Analyzes one frame range of a video in a worker process.
+
+    The analysis starts up to `warmup` frames before the range so MediaPipe's tracking has settled
+    when the range begins; the results of these warm-up frames are discarded.
+
+    :param video_path: The path to the video file
+    :param start_frame: First frame of the range
+    :param end_frame: Frame after the last frame of the range
+    :param warmup: Number of frames analyzed before the range
+    :param scale: The scale of the image
+    :return: Analyses of the frames in the range
+    """
+    frame_handler = get_worker_frame_handler(video_path, None, scale)
+    if not frame_handler.cap.isOpened():
+        raise IOError(f"Cannot open video {video_path}")
+
+    analyses = []
+    for _, analysis in frame_handler.analyze_frames(max(0, start_frame - warmup), end_frame):
+        if analysis.frame_index >= start_frame:
+            analyses.append(analysis)
+    return analyses
+
+
+def merge_segments(segment_results: list[list[FrameAnalysis]]) -> VideoTimeline:
+    """
+    Merges the analyses of consecutive frame ranges into one ordered timeline.
+
+    :param segment_results: Analyses of every range, in range order
+    :return: Timeline with the frames, the bar path and the camera angle decisions
+    """
+    timeline = VideoTimeline()
+    for analyses in segment_results:
+        for analysis in analyses:
+            timeline.frames.append(analysis)
+
+            if analysis.bar_coords:
+                timeline.bar_path.append((int(analysis.bar_coords[0] / 3), int(analysis.bar_coords[1] / 3)))
+
+            if analysis.video_angle is None:
+                continue
+            # Consecutive frames with the same camera angle form one (start, end, angle) range
+            if timeline.camera_angles and timeline.camera_angles[-1][2] == analysis.video_angle:
+                start_frame, _, video_angle = timeline.camera_angles[-1]
+                timeline.camera_angles[-1] = (start_frame, analysis.frame_index + 1, video_angle)
+            else:
+                timeline.camera_angles.append((analysis.frame_index, analysis.frame_index + 1, analysis.video_angle))
+    return timeline
+
+
+def analyze_video_segments(video_path: str, segments: int = None, warmup: int = 15, scale: float = 1,
+                           workers: int = None) -> VideoTimeline:
+    """
+    Analyzes a single video by splitting it into frame ranges that are analyzed in parallel.
+
+    :param video_path: The path to the video file
+    :param segments: Number of frame ranges, defaults to the number of workers
+    :param warmup: Number of frames analyzed before every range to warm up pose tracking
+    :param scale: The scale of the image
+    :param workers: Number of worker processes, defaults to the number of CPUs
+    :return: Merged timeline of the whole video
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video {video_path}")
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    workers = workers or os.cpu_count() or 1
+    frame_ranges = split_frame_ranges(frame_count, segments or workers, min_segment_length=4 * warmup)
+    # The frame count from the container can be off; the last range reads to the end of the video
+    frame_ranges[-1] = (frame_ranges[-1][0], None)
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker) as executor:
+        futures = [executor.submit(analyze_segment, video_path, start_frame, end_frame, warmup, scale)
+                   for start_frame, end_frame in frame_ranges]
+        return merge_segments([future.result() for future in futures])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze one long squat video in parallel frame ranges.")
+    parser.add_argument("video", help="Path to the video file")
+    parser.add_argument("output", help="Path of the JSON timeline")
+    parser.add_argument("--segments", type=int, default=None, help="Number of frame ranges (default: workers)")
+    parser.add_argument("--warmup", type=int, default=15, help="Warm-up frames analyzed before every range")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--scale", type=float, default=1, help="Scale of the analyzed frames")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    timeline = analyze_video_segments(args.video, args.segments, args.warmup, args.scale, args.workers)
+    elapsed = time.perf_counter() - start_time
+
+    with open(args.output, "w") as output_file:
+        json.dump(timeline.to_dict(), output_file, default=int)
+    print(f"Analyzed {len(timeline.frames)} frames in {elapsed:.1f}s ({len(timeline.frames) / elapsed:.1f} fps)")
+
+
+if __name__ == "__main__":
+    main()
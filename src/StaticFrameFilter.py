@@ -0,0 +1,123 @@
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+
+def get_thumbnail(frame: np.ndarray, width: int) -> np.ndarray:
+    """
+    Shrinks a frame to a tiny grayscale thumbnail for cheap motion checks.
+
+    :param frame: BGR or grayscale frame
+    :param width: Width of the thumbnail in pixels; the height keeps the aspect ratio
+    :return: Grayscale thumbnail
+    """
+    height = max(1, round(frame.shape[0] * width / frame.shape[1]))
+    # INTER_AREA would average out more noise but costs milliseconds at 1080p
+    thumbnail = cv2.resize(frame, (width, height), interpolation=cv2.INTER_LINEAR)
+    return cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY) if thumbnail.ndim == 3 else thumbnail
+
+
+def count_changed_pixels(thumbnail: np.ndarray, reference: np.ndarray, pixel_threshold: int) -> int:
+    """
+    Counts the thumbnail pixels whose gray value changed by more than a threshold.
+
+    :param thumbnail: Grayscale thumbnail of the frame
+    :param reference: Grayscale thumbnail it is compared with
+    :param pixel_threshold: Gray value difference above which a pixel counts as changed
+    :return: Number of changed pixels
+    """
+    return np.count_nonzero(cv2.absdiff(thumbnail, reference) > pixel_threshold)
+
+
+class StaticFrameFilter:
+    """
+    Detects frames that barely differ from the last analyzed frame, e.g. while the lifter chalks up or waits
+    before unracking, so their analysis can be reused instead of running pose inference and barbell detection.
+
+    Every frame is shrunk to a tiny grayscale thumbnail, and a frame is static while the share of thumbnail
+    pixels that changed by more than pixel_threshold stays below min_changed. Comparing against the last
+    analyzed frame instead of the previous one keeps slow motion from slipping through, and after max_skip
+    static frames in a row one frame is analyzed anyway so the reused result doesn't go stale.
+    """
+
+    def __init__(self, pixel_threshold: int = 12, min_changed: float = 0.005, thumbnail_width: int = 64,
+                 max_skip: int = 30):
+        """
+        Initialize the StaticFrameFilter class.
+        :param pixel_threshold: Gray value difference above which a thumbnail pixel counts as changed
+        :param min_changed: Share of changed thumbnail pixels from which a frame is analyzed
+        :param thumbnail_width: Width in pixels of the compared thumbnails
+        :param max_skip: Maximum number of static frames in a row whose analysis is reused
+        """
+        if max_skip < 0:
+            raise ValueError("Maximum number of skipped frames must not be negative")
+
+        self.pixel_threshold = pixel_threshold
+        self.min_changed = min_changed
+        self.thumbnail_width = thumbnail_width
+        self.max_skip = max_skip
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets the last analyzed frame and the statistics.
+        """
+        self.reference = None
+        self.last_frame = None
+        self.skipped_in_row = 0
+        self.analyzed = 0
+        self.skipped = 0
+        # (start frame, end frame) of the idle stretches; the end frame is exclusive
+        self.idle_segments: List[Tuple[int, int]] = []
+
+    def restart(self):
+        """
+        Forgets the last analyzed frame but keeps the statistics, e.g. after seeking to another part of the video.
+        """
+        self.reference = None
+        self.skipped_in_row = 0
+
+    @property
+    def stats(self) -> dict:
+        """
+        Counts of analyzed and skipped frames, and the frame ranges of the idle stretches.
+        """
+        return {
+            "analyzed": self.analyzed,
+            "skipped": self.skipped,
+            "idle_segments": [list(segment) for segment in self.idle_segments],
+        }
+
+    def is_static(self, frame_index: int, frame: np.ndarray, reusable: bool = True) -> bool:
+        """
+        Checks if the analysis of the last analyzed frame can be reused for a frame.
+
+        Only frames for which True is returned are counted as skipped; the caller has to reuse their analysis.
+
+        :param frame_index: Index of the frame; an index not after the last one starts over
+        :param frame: The resized frame
+        :param reusable: Whether an analysis to reuse exists; without one the frame is always analyzed
+        :return: True if the frame barely differs from the last analyzed frame
+        """
+        if self.last_frame is not None and frame_index <= self.last_frame:
+            self.reset()
+        self.last_frame = frame_index
+
+        thumbnail = get_thumbnail(frame, self.thumbnail_width)
+        if reusable and self.reference is not None and self.skipped_in_row < self.max_skip:
+            changed = count_changed_pixels(thumbnail, self.reference, self.pixel_threshold)
+            if changed < self.min_changed * thumbnail.size:
+                self.skipped += 1
+                self.skipped_in_row += 1
+                # A single analyzed frame within an idle stretch, e.g. after max_skip, doesn't end it
+                if self.idle_segments and self.idle_segments[-1][1] >= frame_index - 1:
+                    self.idle_segments[-1] = (self.idle_segments[-1][0], frame_index + 1)
+                else:
+                    self.idle_segments.append((frame_index, frame_index + 1))
+                return True
+
+        self.reference = thumbnail
+        self.skipped_in_row = 0
+        self.analyzed += 1
+        return False
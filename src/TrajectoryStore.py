@@ -0,0 +1,142 @@
+from typing import Optional
+
+import numpy as np
+
+# Number of dropped points after which the next point is kept regardless of the tolerance
+MAX_SKIPPED_POINTS = 64
+
+
+class TrajectoryStore:
+    """
+    Bounded store of the barbell trajectory in full-resolution frame coordinates.
+
+    The points live in NumPy ring buffers of twice the capacity: every point is written to both halves,
+    so the stored points always form one contiguous slice and can be exported as views without a copy.
+    With a tolerance, the trajectory is simplified while it is recorded: a point is dropped when it and
+    all points dropped since the last kept point lie within the tolerance of the segment between the last
+    kept point and the newest point, which bounds the error like Ramer-Douglas-Peucker does.
+    """
+
+    def __init__(self, capacity: int = 65536, tolerance: float = 0.0):
+        """
+        Initialize the TrajectoryStore class.
+        :param capacity: Maximum number of stored points; the oldest points are overwritten
+        :param tolerance: Maximum distance in pixels of a dropped point to the simplified path, 0 keeps every point
+        """
+        if capacity < 2:
+            raise ValueError("Capacity must be at least 2 points")
+
+        self.capacity = capacity
+        self.tolerance = tolerance
+        self._frame_indices = np.zeros(2 * capacity, np.int64)
+        self._timestamps = np.zeros(2 * capacity, np.float64)
+        self._points = np.zeros((2 * capacity, 2), np.float32)
+        self._next = 0
+        self._count = 0
+        self._skipped = []
+
+        self.added = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def clear(self):
+        """
+        Removes all points.
+        """
+        self._next = 0
+        self._count = 0
+        self._skipped = []
+        self.added = 0
+
+    def _write(self, position: int, frame_index: int, timestamp: float, point: tuple):
+        for offset in (position, position + self.capacity):
+            self._frame_indices[offset] = frame_index
+            self._timestamps[offset] = timestamp
+            self._points[offset] = point
+
+    def _can_drop_last(self, point: tuple) -> bool:
+        """
+        Checks if the last stored point and the points dropped before it lie within the tolerance
+        of the segment from the last kept point to the new point.
+
+        :param point: The new point
+        :return: True if the last stored point can be replaced by the new point
+        """
+        if self.tolerance <= 0 or self._count < 2 or len(self._skipped) >= MAX_SKIPPED_POINTS:
+            return False
+
+        anchor = self._points[(self._next - 2) % self.capacity].astype(np.float64)
+        candidates = np.array(self._skipped + [self._points[(self._next - 1) % self.capacity]], np.float64)
+        # Distance to the segment, not the line, so turning points like the bottom of a rep are kept
+        direction = np.asarray(point, np.float64) - anchor
+        offsets = candidates - anchor
+        squared_length = direction @ direction
+        projection = np.clip(offsets @ direction / squared_length, 0, 1) if squared_length > 0 else 0
+        distances = np.linalg.norm(offsets - np.outer(projection, direction), axis=1)
+        return bool(distances.max() <= self.tolerance)
+
+    def add(self, frame_index: int, timestamp: float, point: tuple):
+        """
+        Records the barbell position of a frame.
+
+        :param frame_index: Index of the frame
+        :param timestamp: Time of the frame in the video in seconds
+        :param point: Barbell center (x, y) in frame coordinates
+        """
+        self.added += 1
+        if self._can_drop_last(point):
+            self._skipped.append(self._points[(self._next - 1) % self.capacity].copy())
+            self._write((self._next - 1) % self.capacity, frame_index, timestamp, point)
+            return
+
+        self._skipped = []
+        self._write(self._next, frame_index, timestamp, point)
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def _view(self, buffer: np.ndarray) -> np.ndarray:
+        start = (self._next - self._count) % self.capacity
+        view = buffer[start:start + self._count]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def frame_indices(self) -> np.ndarray:
+        """
+        Frame indices of the stored points, oldest first; a read-only view valid until the next add.
+        """
+        return self._view(self._frame_indices)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """
+        Timestamps in seconds of the stored points, oldest first; a read-only view valid until the next add.
+        """
+        return self._view(self._timestamps)
+
+    @property
+    def points(self) -> np.ndarray:
+        """
+        Stored points of shape (n, 2), oldest first; a read-only view valid until the next add.
+        """
+        return self._view(self._points)
+
+    @property
+    def last_point(self) -> Optional[tuple]:
+        """
+        The most recent barbell center, or None if the store is empty.
+        """
+        if self._count == 0:
+            return None
+        x, y = self._points[(self._next - 1) % self.capacity]
+        return float(x), float(y)
+
+    def export(self) -> dict:
+        """
+        Exports the trajectory for analytics without copying.
+
+        :return: Dictionary of the frame_index, timestamp, x and y views
+        """
+        points = self.points
+        return {"frame_index": self.frame_indices, "timestamp": self.timestamps, "x": points[:, 0], "y": points[:, 1]}
@@ -0,0 +1,133 @@
+import dataclasses
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.MovementPatterns import SIDE_JOINT_LANDMARKS
+
+
+@dataclass
+class ViewSegment:
+    """
+    Dataclass to store the camera angle and filmed side of a range of frames; the end frame is exclusive
+    """
+    start_frame: int
+    end_frame: int
+    video_angle: str
+    filmed_side: Optional[str]
+
+    def to_dict(self) -> dict:
+        return dataclasses.asdict(self)
+
+
+class ViewClassifier:
+    """
+    Streaming classifier of the camera angle and the filmed side with hysteresis.
+
+    A pose is filmed from the side when the visibilities of the left and right shoulders, elbows, hips, knees
+    and ankles differ by at least threshold. To change the view, the difference has to cross the threshold by
+    margin for min_frames consecutive frames; the filmed side of the new segment is then decided once from the
+    summed visibilities of these frames, and a tie keeps the previous side. Every frame only compares the ten
+    visibilities against the current segment, so noise around the threshold no longer flips the view.
+    """
+
+    def __init__(self, threshold: float = 0.3, margin: float = 0.05, min_frames: int = 5, side_margin: float = 0.5):
+        """
+        Initialize the ViewClassifier class.
+        :param threshold: Visibility difference between the left and right joints above which a pose is side on
+        :param margin: Distance beyond the threshold the difference must reach to leave the current view
+        :param min_frames: Number of consecutive frames that must agree before the view or side changes
+        :param side_margin: Difference of the summed left and right visibilities needed to switch the filmed side
+        """
+        self.threshold = threshold
+        self.margin = margin
+        self.min_frames = min_frames
+        self.side_margin = side_margin
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets the current view and all segments.
+        """
+        self.video_angle = None
+        self.filmed_side = None
+        self.last_frame = None
+        self.segments: List[ViewSegment] = []
+        # Visibilities of the consecutive frames that disagree with the current segment, and their view
+        self.pending = []
+        self.pending_view = None
+
+    @property
+    def stats(self) -> dict:
+        """
+        Number of view changes and the camera angle and filmed side of every segment.
+        """
+        return {
+            "switches": max(0, len(self.segments) - 1),
+            "segments": [segment.to_dict() for segment in self.segments],
+        }
+
+    def _classify(self, visibility: np.ndarray) -> Tuple[str, Optional[str]]:
+        threshold = self.threshold
+        if self.video_angle == "Side Angle":
+            threshold -= self.margin
+        elif self.video_angle == "Back Angle":
+            threshold += self.margin
+        if np.abs(visibility[0] - visibility[1]).max() < threshold:
+            return "Back Angle", None
+
+        # Positive when the right side is more visible
+        side_score = visibility[1].sum(dtype=np.float64) - visibility[0].sum(dtype=np.float64)
+        if self.filmed_side == "Right" and side_score > -self.side_margin:
+            return "Side Angle", "Right"
+        if self.filmed_side == "Left" and side_score < self.side_margin:
+            return "Side Angle", "Left"
+        return "Side Angle", self._decide_side(visibility[np.newaxis])
+
+    def _decide_side(self, visibilities: np.ndarray) -> str:
+        left_visibility, right_visibility = visibilities.sum(axis=(0, 2), dtype=np.float64)
+        if right_visibility > left_visibility:
+            return "Right"
+        if left_visibility > right_visibility:
+            return "Left"
+        return self.filmed_side or "Left"
+
+    def _start_segment(self, frame_index: int, video_angle: str, filmed_side: Optional[str]):
+        self.video_angle = video_angle
+        self.filmed_side = filmed_side
+        self.segments.append(ViewSegment(frame_index, frame_index + 1, video_angle, filmed_side))
+
+    def update(self, frame_index: int, landmarks: np.ndarray) -> Tuple[str, Optional[str]]:
+        """
+        Processes the landmarks of the next frame with a pose.
+
+        :param frame_index: Index of the frame; an index not after the last one starts over
+        :param landmarks: Landmark array of shape (33, 4)
+        :return: Camera angle ("Side Angle" or "Back Angle") and filmed side ("Left", "Right" or None)
+        """
+        if self.last_frame is not None and frame_index <= self.last_frame:
+            self.reset()
+        self.last_frame = frame_index
+
+        visibility = landmarks[SIDE_JOINT_LANDMARKS, 3]
+        view = self._classify(visibility)
+        if self.video_angle is None:
+            # The first pose decides the view right away
+            self._start_segment(frame_index, *view)
+        elif view == (self.video_angle, self.filmed_side):
+            self.pending.clear()
+        else:
+            if view != self.pending_view:
+                self.pending.clear()
+                self.pending_view = view
+            self.pending.append(visibility)
+            if len(self.pending) >= self.min_frames:
+                video_angle = view[0]
+                filmed_side = self._decide_side(np.stack(self.pending)) if video_angle == "Side Angle" else None
+                self.pending.clear()
+                if (video_angle, filmed_side) != (self.video_angle, self.filmed_side):
+                    self._start_segment(frame_index, video_angle, filmed_side)
+
+        self.segments[-1].end_frame = frame_index + 1
+        return self.video_angle, self.filmed_side
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import time
+import unittest
+import cv2
+import numpy as np
+from src.ActiveWindows import ActiveWindowDetector
+
+
+class TestActiveWindowDetector(unittest.TestCase):
+    def setUp(self):
+        """
+        Setup for the ActiveWindowDetector tests.
+        """
+        self.detector = ActiveWindowDetector(sample_fps=5, min_duration=1.0, max_gap=1.0, padding=0.5)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def write_video(self, moving_frames: range, frame_count: int = 100) -> str:
+        video_path = os.path.join(self.temp_dir.name, "session.avi")
+        writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (160, 120))
+        for frame_index in range(frame_count):
+            frame = np.full((120, 160, 3), 80, np.uint8)
+            x = 20 + (frame_index % 10) * 10 if frame_index in moving_frames else 20
+            cv2.rectangle(frame, (x, 30), (x + 30, 90), (255, 255, 255), -1)
+            writer.write(frame)
+        writer.release()
+        return video_path
+
+    def test_find_windows_merges_and_drops(self):
+        """
+        Test that close active samples are merged, short windows dropped and the rest padded.
+        """
+        windows = self.detector.find_windows([10, 12, 14, 16, 18, 20, 60, 90, 92, 94, 96, 98, 100, 102],
+                                             step=2, fps=10, frame_count=105)
+        self.assertEqual(windows, [(3, 26), (83, 105)])
+
+    def test_detects_motion_window(self):
+        """
+        Test that the window with a moving object is found in a decoded video.
+        """
+        windows = self.detector.detect(self.write_video(range(40, 70)))
+
+        self.assertEqual(len(windows), 1)
+        start_frame, end_frame = windows[0]
+        self.assertTrue(30 <= start_frame <= 40)
+        self.assertTrue(70 <= end_frame <= 80)
+
+    def test_saved_windows_skip_detection(self):
+        """
+        Test that saved windows are reused, and detected again once the video or the settings changed.
+        """
+        video_path = self.write_video(range(40, 70))
+        windows_path = os.path.join(self.temp_dir.name, "session_windows.json")
+        windows = self.detector.get_windows(video_path, windows_path)
+
+        self.detector.detect = lambda path: self.fail("Windows were detected again")
+        self.assertEqual(self.detector.get_windows(video_path, windows_path), windows)
+
+        self.detector.padding = 0
+        self.assertIsNone(self.detector.load(video_path, windows_path))
+        self.detector.padding = 0.5
+        os.utime(video_path, (time.time() + 10, time.time() + 10))
+        self.assertIsNone(self.detector.load(video_path, windows_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
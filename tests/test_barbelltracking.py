@@ -0,0 +1,110 @@
+import unittest
+from unittest.mock import patch
+import cv2
+import numpy as np
+from src.BarbellTracking import RoiBarbellTracker, PredictiveBarbellTracker, detect_plate
+
+
+def create_plate_frame(center: tuple, width: int = 1280, height: int = 720) -> np.ndarray:
+    frame = np.full((height, width, 3), 40, np.uint8)
+    cv2.circle(frame, center, 170, (255, 255, 255), 8)
+    return frame
+
+
+class TestDetectPlate(unittest.TestCase):
+
+    def test_detects_plate(self):
+        center = detect_plate(create_plate_frame((500, 350)))
+        self.assertIsNotNone(center)
+        self.assertLess(abs(center[0] - 500) + abs(center[1] - 350), 10)
+
+    def test_offset_is_applied(self):
+        frame = create_plate_frame((500, 350))
+        center = detect_plate(frame[100:, 200:], offset=(200, 100))
+        self.assertLess(abs(center[0] - 500) + abs(center[1] - 350), 10)
+
+    def test_downsampled_search_maps_back(self):
+        center = detect_plate(create_plate_frame((500, 350)), scale=0.5)
+        self.assertIsNotNone(center)
+        self.assertLess(abs(center[0] - 500) + abs(center[1] - 350), 10)
+
+    def test_no_plate(self):
+        self.assertIsNone(detect_plate(np.zeros((720, 1280, 3), np.uint8)))
+
+
+class TestRoiBarbellTracker(unittest.TestCase):
+
+    def test_tracks_moving_plate_in_region(self):
+        tracker = RoiBarbellTracker()
+        for step in range(6):
+            center = tracker.detect(create_plate_frame((500, 250 + 20 * step)))
+            self.assertLess(abs(center[0] - 500) + abs(center[1] - (250 + 20 * step)), 10)
+
+        self.assertEqual(tracker.stats, {"hits": 5, "misses": 0, "fallbacks": 1})
+
+    def test_search_region_scales_with_plate(self):
+        tracker = RoiBarbellTracker(margin=20)
+        tracker.last_center = (960, 540)
+        x_start, y_start, x_end, y_end = tracker.get_search_region((1080, 1920, 3))
+        self.assertEqual((x_end - x_start, y_end - y_start), (400, 400))
+
+    def test_falls_back_to_full_frame(self):
+        tracker = RoiBarbellTracker()
+        tracker.detect(create_plate_frame((300, 360)))
+
+        with patch('src.BarbellTracking.detect_plate', wraps=detect_plate) as mock_detect_plate:
+            center = tracker.detect(create_plate_frame((1000, 360)))
+
+        self.assertEqual(mock_detect_plate.call_count, 2)
+        self.assertLess(abs(center[0] - 1000), 10)
+        self.assertEqual(tracker.stats, {"hits": 0, "misses": 1, "fallbacks": 2})
+
+    def test_lost_plate_is_reacquired(self):
+        tracker = RoiBarbellTracker()
+        tracker.detect(create_plate_frame((300, 360)))
+        self.assertIsNone(tracker.detect(np.zeros((720, 1280, 3), np.uint8)))
+        self.assertIsNone(tracker.last_center)
+        self.assertIsNotNone(tracker.detect(create_plate_frame((320, 360))))
+
+
+class TestPredictiveBarbellTracker(unittest.TestCase):
+
+    def test_continuous_path_with_fewer_detections(self):
+        tracker = PredictiveBarbellTracker(detection_interval=4)
+        for step in range(24):
+            expected = (500, 200 + 8 * step)
+            center = tracker.detect(create_plate_frame(expected))
+            self.assertIsNotNone(center)
+            self.assertLess(abs(center[0] - expected[0]) + abs(center[1] - expected[1]), 25)
+
+        self.assertLessEqual(tracker.stats["detections"], 24 // 4 + 2)
+        self.assertEqual(tracker.stats["detections"] + tracker.stats["predictions"], 24)
+
+    def test_plate_is_lost_after_prediction_limit(self):
+        tracker = PredictiveBarbellTracker(detection_interval=2, max_prediction_frames=5)
+        tracker.detect(create_plate_frame((500, 360)))
+
+        empty_frame = np.zeros((720, 1280, 3), np.uint8)
+        centers = [tracker.detect(empty_frame) for _ in range(6)]
+
+        self.assertTrue(all(center is not None for center in centers[:5]))
+        self.assertIsNone(centers[5])
+        self.assertEqual(tracker.stats["lost"], 1)
+
+    def test_occluded_plate_is_retried_every_interval(self):
+        tracker = PredictiveBarbellTracker(detection_interval=5, max_prediction_frames=30)
+        tracker.detect(create_plate_frame((500, 360)))
+
+        empty_frame = np.zeros((720, 1280, 3), np.uint8)
+        for _ in range(25):
+            tracker.detect(empty_frame)
+
+        self.assertEqual(tracker.stats["detections"], 1 + 25 // 5)
+
+    def test_invalid_detection_interval(self):
+        with self.assertRaises(ValueError):
+            PredictiveBarbellTracker(detection_interval=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
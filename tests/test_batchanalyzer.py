@@ -0,0 +1,132 @@
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock, patch
+from src import BatchAnalyzer
+from src.BatchAnalyzer import collect_videos, analyze_video, get_output_names, run_batch
+
+
+class TestCollectVideos(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        for name in ["b.mp4", "a.MOV", "notes.txt"]:
+            open(os.path.join(self.temp_dir.name, name), "w").close()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_collect_from_directory(self):
+        videos = collect_videos(self.temp_dir.name)
+        self.assertEqual([os.path.basename(video) for video in videos], ["a.MOV", "b.mp4"])
+
+    def test_collect_from_manifest(self):
+        manifest_path = os.path.join(self.temp_dir.name, "manifest.txt")
+        with open(manifest_path, "w") as manifest:
+            manifest.write("# squats\nb.mp4\n\n/data/c.mp4\n")
+
+        videos = collect_videos(manifest_path)
+        self.assertEqual(videos, [os.path.join(self.temp_dir.name, "b.mp4"), "/data/c.mp4"])
+
+    def test_output_names_are_unique(self):
+        names = get_output_names(["/a/squat.mp4", "/b/squat.mov", "/c/Squat.mp4", "/d/squat_2.mp4", "/e/bench.mp4"])
+        self.assertEqual(names, ["squat", "squat_2", "Squat_3", "squat_2_2", "bench"])
+
+
+class TestAnalyzeVideo(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        BatchAnalyzer._frame_handler = None
+
+    def tearDown(self):
+        BatchAnalyzer._frame_handler = None
+        self.temp_dir.cleanup()
+
+    @patch('src.ImageHandler.FrameHandler')
+    def test_frame_handler_is_reused(self, MockFrameHandler):
+        MockFrameHandler.return_value.run_video_analysis.side_effect = lambda **kwargs: {
+            "frames": 10, "seconds": 1.0, "fps": 10.0, "reps": {"reps": 1, "dropped": 0, "records": [{"number": 1}]}}
+
+        analyze_video("first.mp4", self.temp_dir.name)
+        result = analyze_video("second.mp4", self.temp_dir.name)
+
+        MockFrameHandler.assert_called_once()
+        MockFrameHandler.return_value.open_video.assert_called_once_with(
+            "second.mp4", os.path.join(self.temp_dir.name, "second_analyzed.mp4"))
+        with open(os.path.join(self.temp_dir.name, "second.json")) as result_file:
+            self.assertEqual(json.load(result_file)["stats"], result["stats"])
+        self.assertNotIn("error", result)
+        self.assertEqual(result["reps"], [{"number": 1}])
+        self.assertEqual(result["stats"]["reps"], {"reps": 1, "dropped": 0})
+
+    @patch('src.ActiveWindows.ActiveWindowDetector')
+    @patch('src.ImageHandler.FrameHandler')
+    def test_only_active_windows_are_analyzed(self, MockFrameHandler, MockActiveWindowDetector):
+        MockFrameHandler.return_value.run_video_analysis.return_value = {"frames": 10, "seconds": 1.0, "fps": 10.0,
+                                                                         "reps": {"records": []}}
+        MockActiveWindowDetector.return_value.get_windows.return_value = [(30, 90)]
+
+        analyze_video("session.mp4", self.temp_dir.name, active_windows=True)
+
+        MockActiveWindowDetector.return_value.get_windows.assert_called_once_with(
+            "session.mp4", os.path.join(self.temp_dir.name, "session_windows.json"))
+        self.assertEqual(MockFrameHandler.return_value.run_video_analysis.call_args.kwargs["windows"], [(30, 90)])
+
+    @patch('src.ImageHandler.FrameHandler')
+    def test_name_overrides_video_name(self, MockFrameHandler):
+        MockFrameHandler.return_value.run_video_analysis.return_value = {"frames": 10, "seconds": 1.0, "fps": 10.0,
+                                                                         "reps": {"records": []}}
+
+        result = analyze_video("/b/squat.mp4", self.temp_dir.name, name="squat_2")
+
+        self.assertEqual(result["output"], os.path.join(self.temp_dir.name, "squat_2_analyzed.mp4"))
+        self.assertTrue(os.path.isfile(os.path.join(self.temp_dir.name, "squat_2.json")))
+
+    @patch('src.ImageHandler.FrameHandler')
+    def test_failure_is_recorded(self, MockFrameHandler):
+        MockFrameHandler.return_value.cap.isOpened = MagicMock(return_value=False)
+
+        result = analyze_video("missing.mp4", self.temp_dir.name)
+
+        self.assertTrue(result["error"].startswith("OSError"))
+        self.assertNotIn("stats", result)
+
+
+
+class TestRunBatch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    @staticmethod
+    def fake_submit(function, video, output_dir, scale, metrics_format, active_windows, name):
+        future = Future()
+        if video == "crash.mp4":
+            future.set_exception(BrokenProcessPool("A process in the process pool was terminated abruptly"))
+        else:
+            future.set_result({"video": video, "reps": [],
+                               "stats": {"frames": 10, "seconds": 1.0, "fps": 10.0}})
+        return future
+
+    @patch('src.BatchAnalyzer.ProcessPoolExecutor')
+    def test_crashed_worker_is_recorded(self, MockProcessPoolExecutor):
+        executor = MockProcessPoolExecutor.return_value.__enter__.return_value
+        executor.submit.side_effect = self.fake_submit
+
+        with patch('builtins.print'):
+            summary = run_batch(["a/squat.mp4", "crash.mp4", "b/squat.mp4"], self.temp_dir.name, workers=2)
+
+        self.assertEqual(summary["succeeded"], 2)
+        self.assertEqual(summary["failures"][0]["video"], "crash.mp4")
+        self.assertTrue(summary["failures"][0]["error"].startswith("BrokenProcessPool"))
+        self.assertTrue(os.path.isfile(os.path.join(self.temp_dir.name, "summary.json")))
+        names = [call.kwargs["name"] for call in executor.submit.call_args_list]
+        self.assertEqual(names, ["squat", "crash", "squat_2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
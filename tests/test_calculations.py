@@ -1,5 +1,7 @@
 import unittest
+import numpy as np
 from src.Calculations import calculate_distance, calculate_two_point_angle, calculate_three_point_angle
+from src.Calculations import calculate_distances, calculate_two_point_angles, calculate_three_point_angles
 
 
 class TestCalculateThreePointAngle(unittest.TestCase):
@@ -92,5 +94,33 @@ class TestCalculateDistance(unittest.TestCase):
         self.assertAlmostEqual(calculate_distance(a, b), 1.4142135623730951, places=5)
 
 
+class TestVectorizedCalculations(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.a, self.b, self.c = (rng.integers(0, 1920, (500, 2)) for _ in range(3))
+
+    def test_three_point_angles_match_scalar(self):
+        angles = calculate_three_point_angles(self.a, self.b, self.c)
+        expected = [calculate_three_point_angle(a, b, c) for a, b, c in zip(self.a, self.b, self.c)]
+        np.testing.assert_allclose(angles, expected, rtol=0, atol=1e-9)
+
+    def test_three_point_angles_zero_vector(self):
+        angles = calculate_three_point_angles([(1, 1), (0, 1)], [(1, 1), (0, 0)], [(2, 2), (1, 0)])
+        self.assertTrue(np.isnan(angles[0]))
+        self.assertAlmostEqual(angles[1], 90.0, places=5)
+
+    def test_two_point_angles_match_scalar(self):
+        angles = calculate_two_point_angles(self.a, self.b)
+        expected = [calculate_two_point_angle(a, b) for a, b in zip(self.a, self.b)]
+        np.testing.assert_array_equal(angles, expected)
+        self.assertEqual(calculate_two_point_angles([(3, 3)], [(3, 3)])[0], 0)
+
+    def test_distances_match_scalar(self):
+        distances = calculate_distances(self.a, self.b)
+        expected = [calculate_distance(a, b) for a, b in zip(self.a, self.b)]
+        np.testing.assert_allclose(distances, expected, rtol=0, atol=1e-9)
+
+
 if __name__ == '__main__':
     unittest.main()
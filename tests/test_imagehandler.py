@@ -1,8 +1,13 @@
+import dataclasses
+import os
+import tempfile
 import unittest
 import cv2
 import numpy as np
 from unittest.mock import MagicMock, patch
 from src.ImageHandler import FrameHandler
+from src.MovementDrawings import SquatDrawings
+from src.MovementPatterns import FrameAnalysis
 
 
 class TestFrameHandler(unittest.TestCase):
@@ -14,7 +19,7 @@ class TestFrameHandler(unittest.TestCase):
         Setup for the FrameHandler tests.
         """
         mock_VideoCapture.return_value.read.return_value = (True, np.zeros((480, 640, 3), np.uint8))
-        mock_VideoCapture.return_value.get = MagicMock(side_effect=[640, 480])
+        mock_VideoCapture.return_value.get = MagicMock(side_effect=[640, 480, 30])
         self.frame_handler = FrameHandler("test.mp4", "TestWindow", scale=0.5)
 
     def test_initialization(self):
@@ -64,6 +69,41 @@ class TestFrameHandler(unittest.TestCase):
         updated_frame = self.frame_handler.add_images_to_frame(frame, args)
         self.assertEqual(updated_frame.shape[1], self.frame_handler.width + self.frame_handler._get_blank_image_dimensions()[1])
 
+    def test_add_images_to_frame_reuses_buffer(self):
+        """
+        Test that the output frame is allocated once and the static panel layers are rendered once.
+        """
+        frame = np.zeros((self.frame_handler.height, self.frame_handler.width, 3), np.uint8)
+        args = ("Side Angle", [1, 2], [3, 4], [5, 6], [7, 8], [9, 10], 45, 90, 30, [(10, 10), (20, 20)])
+
+        first_frame = self.frame_handler.add_images_to_frame(frame, args)
+        panel_layers = dict(self.frame_handler._panel_layers)
+        second_frame = self.frame_handler.add_images_to_frame(frame, args)
+
+        self.assertIs(first_frame, second_frame)
+        self.assertEqual(len(panel_layers), 3)
+        for key, layer in self.frame_handler._panel_layers.items():
+            self.assertIs(layer, panel_layers[key])
+
+    def test_add_images_to_frame_matches_fresh_panels(self):
+        """
+        Test that the composited frame equals drawing every panel from scratch.
+        """
+        frame = np.full((self.frame_handler.height, self.frame_handler.width, 3), 80, np.uint8)
+        args = ("Side Angle", [1, 2], [3, 4], [5, 6], [7, 8], [9, 10], 45, 90, 30, [(10, 10), (20, 20)])
+
+        blank_width = self.frame_handler._get_blank_image_dimensions()[1]
+        expected = np.zeros((self.frame_handler.height, self.frame_handler.width + blank_width, 3), np.uint8)
+        expected[:, :self.frame_handler.width] = frame
+        for position in ("Top", "Middle", "Bottom"):
+            image = self.frame_handler._create_blank_image_with_border(1)
+            squat_drawings = SquatDrawings(image=image, height=self.frame_handler.height, width=self.frame_handler.width)
+            self.frame_handler._draw_squat_info(squat_drawings, position, args)
+            y_start, y_end = self.frame_handler._get_position_coordinates(position, image.shape[0])
+            expected[y_start:y_end, self.frame_handler.width:self.frame_handler.width + blank_width] = image
+
+        self.assertTrue(np.array_equal(self.frame_handler.add_images_to_frame(frame, args), expected))
+
     def test_get_position_coordinates(self):
         """
         Test position coordinates calculation.
@@ -76,21 +116,6 @@ class TestFrameHandler(unittest.TestCase):
         self.assertEqual(self.frame_handler._get_position_coordinates("Bottom", image_height),
                          (self.frame_handler.height - image_height, self.frame_handler.height))
 
-    def test_add_positioned_image(self):
-        """
-        Test adding a positioned image to the frame.
-        """
-        frame = np.zeros((self.frame_handler.height, self.frame_handler.width + 100, 3), np.uint8)
-        image = np.zeros((100, 100, 3), np.uint8)
-        position = "Top"
-        args = ("Side Angle", [1, 2], [3, 4], [5, 6], [7, 8], [9, 10], 45, 90, 30, [(10, 10)])
-
-        y_start, y_end = self.frame_handler._get_position_coordinates(position, image.shape[0])
-        x_start, x_end = self.frame_handler.width, self.frame_handler.width + image.shape[1]
-
-        updated_frame = self.frame_handler._add_positioned_image(frame, image, position, args)
-        self.assertTrue(np.array_equal(updated_frame[y_start:y_end, x_start:x_end], image))
-
     def test_draw_squat_info(self):
         """
         Test drawing squat information.
@@ -103,5 +128,353 @@ class TestFrameHandler(unittest.TestCase):
         self.frame_handler._draw_squat_info(drawings, position, args)
         drawings.draw_side_angle_squat.assert_called_once()
 
+
+class TestHeadlessFrameHandler(unittest.TestCase):
+    @patch('cv2.VideoCapture')
+    @patch('cv2.namedWindow')
+    def test_headless_writes_frames_without_window(self, mock_namedWindow, mock_VideoCapture):
+        """
+        Test that headless mode skips HighGUI and writes every frame to the VideoWriter.
+        """
+        mock_VideoCapture.return_value.get = MagicMock(side_effect=[640, 480, 30])
+        mock_VideoCapture.return_value.isOpened.return_value = True
+        mock_VideoCapture.return_value.read.side_effect = [(True, np.zeros((480, 640, 3), np.uint8))] * 3 + [(False, None)]
+
+        frame_handler = FrameHandler("test.mp4", "TestWindow", scale=0.5, headless=True, output_path="out.mp4")
+        frame_handler.pose = MagicMock()
+        frame_handler.pose.process.return_value.pose_landmarks = None
+
+        with patch('cv2.VideoWriter') as mock_VideoWriter, patch('cv2.imshow') as mock_imshow:
+            mock_VideoWriter.return_value.isOpened.return_value = True
+            stats = frame_handler.run_video_analysis()
+
+        mock_namedWindow.assert_not_called()
+        mock_imshow.assert_not_called()
+        self.assertEqual(mock_VideoWriter.return_value.write.call_count, 3)
+        written_frame = mock_VideoWriter.return_value.write.call_args[0][0]
+        self.assertEqual((written_frame.shape[1], written_frame.shape[0]), frame_handler._get_output_size())
+        self.assertEqual(stats["frames"], 3)
+
+    @patch('cv2.VideoCapture')
+    def test_failed_run_releases_writer(self, mock_VideoCapture):
+        """
+        Test that a run failing mid-video finishes its output video, so the next video gets a new one.
+        """
+        mock_VideoCapture.return_value.get = MagicMock(side_effect=[640, 480, 30] * 2)
+        mock_VideoCapture.return_value.isOpened.return_value = True
+        mock_VideoCapture.return_value.read.side_effect = ([(True, np.zeros((480, 640, 3), np.uint8))] * 2
+                                                           + [IOError("decode failed")])
+
+        frame_handler = FrameHandler("test.mp4", "TestWindow", headless=True, output_path="out.mp4")
+        frame_handler.pose = MagicMock()
+        frame_handler.pose.process.return_value.pose_landmarks = None
+
+        with patch('cv2.VideoWriter') as mock_VideoWriter:
+            mock_VideoWriter.return_value.isOpened.return_value = True
+            with self.assertRaises(IOError):
+                frame_handler.run_video_analysis()
+            mock_VideoWriter.return_value.release.assert_called_once()
+            self.assertIsNone(frame_handler.writer)
+
+            frame_handler.writer = MagicMock()
+            writer = frame_handler.writer
+            frame_handler.open_video("next.mp4", "next_analyzed.mp4")
+        writer.release.assert_called_once()
+        self.assertIsNone(frame_handler.writer)
+
+    @patch('cv2.VideoCapture')
+    def test_headless_without_output_path_only_analyzes(self, mock_VideoCapture):
+        """
+        Test that headless mode without an output path analyzes the frames without writing them.
+        """
+        mock_VideoCapture.return_value.get = MagicMock(side_effect=[640, 480, 30])
+        mock_VideoCapture.return_value.isOpened.return_value = True
+        mock_VideoCapture.return_value.read.side_effect = [(True, np.zeros((480, 640, 3), np.uint8))] * 2 + [(False, None)]
+
+        frame_handler = FrameHandler("test.mp4", "TestWindow", headless=True)
+        frame_handler.pose = MagicMock()
+        frame_handler.pose.process.return_value.pose_landmarks = None
+
+        with patch('cv2.VideoWriter') as mock_VideoWriter:
+            stats = frame_handler.run_video_analysis()
+
+        mock_VideoWriter.assert_not_called()
+        self.assertEqual(stats["frames"], 2)
+
+    @patch('cv2.VideoCapture')
+    def test_metrics_run_skips_drawing(self, mock_VideoCapture):
+        """
+        Test that an analysis-only run writes the metrics of every frame without drawing.
+        """
+        mock_VideoCapture.return_value.get = MagicMock(side_effect=[640, 480, 30])
+        mock_VideoCapture.return_value.isOpened.return_value = True
+        mock_VideoCapture.return_value.read.side_effect = [(True, np.zeros((480, 640, 3), np.uint8))] * 3 + [(False, None)]
+
+        frame_handler = FrameHandler("test.mp4", "TestWindow", headless=True)
+        frame_handler.pose = MagicMock()
+        frame_handler.pose.process.return_value.pose_landmarks = None
+
+        with tempfile.TemporaryDirectory() as temp_dir, patch.object(frame_handler, "render_frame") as mock_render:
+            stats = frame_handler.run_video_analysis(metrics_path=os.path.join(temp_dir, "metrics.npy"))
+            metrics = np.load(stats["metrics"])
+
+        mock_render.assert_not_called()
+        self.assertEqual(metrics["frame_index"].tolist(), [0, 1, 2])
+        self.assertTrue(np.isnan(metrics["knee_angle"]).all())
+
+    @patch('cv2.VideoCapture')
+    @patch('src.ImageHandler.get_pose_pool')
+    def test_pose_is_taken_from_pool_on_first_use(self, mock_get_pose_pool, mock_VideoCapture):
+        """
+        Test that the Pose model is only taken from the pool when needed and returned on close.
+        """
+        mock_VideoCapture.return_value.get = MagicMock(side_effect=[640, 480, 30])
+        pool = mock_get_pose_pool.return_value
+        frame_handler = FrameHandler("test.mp4", "TestWindow", headless=True, pose_config={"model_complexity": 0})
+        pool.acquire.assert_not_called()
+
+        pose = frame_handler.pose
+        frame_handler.warm_up()
+        frame_handler.close()
+
+        pool.acquire.assert_called_once_with({"model_complexity": 0})
+        pool.warm.assert_called_once_with(pose)
+        pool.release.assert_called_once_with(pose, {"model_complexity": 0})
+
+    @patch('cv2.VideoCapture')
+    @patch('src.ImageHandler.get_pose_pool')
+    def test_inference_budget_switches_quality(self, mock_get_pose_pool, mock_VideoCapture):
+        """
+        Test that slow inference switches to a smaller pose resolution and skips levels whose model can't be loaded.
+        """
+        mock_VideoCapture.return_value.get = MagicMock(side_effect=[1280, 720, 30])
+        levels = ({"model_complexity": 2, "pose_width": None},
+                  {"model_complexity": 1, "pose_width": None},
+                  {"model_complexity": 0, "pose_width": 640},
+                  {"model_complexity": 1, "pose_width": 320})
+        pool = mock_get_pose_pool.return_value
+        pool.acquire.side_effect = lambda config: self._acquire_or_fail(config)
+        frame_handler = FrameHandler("test.mp4", "TestWindow", headless=True, inference_budget=0.02,
+                                     quality_levels=levels)
+        self.assertIsNone(frame_handler.pose_size)
+
+        frame_handler.pose
+        with self.assertWarns(UserWarning):
+            for frame_index in range(40):
+                frame_handler._control_quality(frame_index, 0.05)
+
+        self.assertEqual(frame_handler.quality_controller.level, 3)
+        self.assertEqual(frame_handler.pose_size, (320, 180))
+        self.assertEqual(frame_handler.pose_config, {"model_complexity": 1})
+        self.assertEqual(frame_handler.quality_controller.stats["unavailable"], [2])
+
+    @staticmethod
+    def _acquire_or_fail(config):
+        if config["model_complexity"] == 0:
+            raise OSError("model download failed")
+        return MagicMock()
+
+    @patch('cv2.VideoCapture')
+    def test_static_frames_reuse_analysis(self, mock_VideoCapture):
+        """
+        Test that static frames reuse the landmarks and barbell position of the last analyzed frame.
+        """
+        mock_VideoCapture.return_value.get = MagicMock(side_effect=[640, 480, 30])
+        frame_handler = FrameHandler("test.mp4", "TestWindow", headless=True, static_filter={})
+        frame_handler.pose = MagicMock()
+        frame_handler.get_barbell_coordinates = MagicMock(return_value=(100, 200))
+        landmarks = np.random.default_rng(0).uniform(0.2, 0.8, (33, 4)).astype(np.float32)
+        landmarks[:, 3] = 0.9
+        landmarks[[11, 23, 13, 25, 27], 3] = 0.1
+        frame_handler._infer_landmarks = MagicMock(return_value=landmarks)
+        frame = np.zeros((480, 640, 3), np.uint8)
+
+        analyses = [frame_handler.detect_barbell(frame_handler.analyze_pose(frame_index, frame), frame)
+                    for frame_index in range(3)]
+
+        frame_handler._infer_landmarks.assert_called_once()
+        frame_handler.get_barbell_coordinates.assert_called_once()
+        self.assertEqual([analysis.frame_index for analysis in analyses], [0, 1, 2])
+        self.assertEqual([analysis.reused for analysis in analyses], [False, True, True])
+        self.assertEqual(analyses[2].bar_coords, (100, 200))
+        self.assertEqual(analyses[2].filmed_side, "Right")
+
+    @patch('cv2.VideoCapture')
+    def test_static_filter_restarts_at_windows(self, mock_VideoCapture):
+        """
+        Test that the first frame of every window is analyzed, even if it looks like the last analyzed frame.
+        """
+        frame = np.zeros((480, 640, 3), np.uint8)
+        mock_VideoCapture.return_value.get = MagicMock(side_effect=[640, 480, 30])
+        mock_VideoCapture.return_value.isOpened.return_value = True
+        mock_VideoCapture.return_value.read.return_value = (True, frame)
+        frame_handler = FrameHandler("test.mp4", "TestWindow", headless=True, static_filter={})
+        frame_handler.pose = MagicMock()
+        frame_handler.get_barbell_coordinates = MagicMock(return_value=None)
+        frame_handler._infer_landmarks = MagicMock(return_value=None)
+
+        stats = frame_handler.run_video_analysis(windows=[(0, 3), (10, 13)])
+
+        analyzed_frames = [call.args[0] for call in frame_handler._infer_landmarks.call_args_list]
+        self.assertEqual(analyzed_frames, [0, 10])
+        self.assertEqual(stats["static"]["analyzed"], 2)
+        self.assertEqual(stats["static"]["skipped"], 4)
+
+    @patch('cv2.VideoCapture')
+    def test_pose_runs_at_pose_width(self, mock_VideoCapture):
+        """
+        Test that pose inference gets a downsampled frame while joint coordinates use the scaled frame size.
+        """
+        mock_VideoCapture.return_value.get = MagicMock(side_effect=[1280, 720, 30])
+        frame_handler = FrameHandler("test.mp4", "TestWindow", headless=True, pose_width=320)
+        frame_handler.pose = MagicMock()
+        frame_handler.pose.process.return_value.pose_landmarks = None
+        frame = np.zeros((720, 1280, 3), np.uint8)
+
+        frame_handler._infer_landmarks(0, frame)
+        landmarks = np.zeros((33, 4), np.float32)
+        landmarks[:, :2] = 0.5
+        analysis = frame_handler.analyze_landmarks(0, landmarks)
+
+        self.assertEqual(frame_handler.pose.process.call_args.args[0].shape, (180, 320, 3))
+        self.assertEqual(analysis.squat_pose.coordinates.pixels[0].tolist(), [640, 360])
+
+    @patch('cv2.VideoCapture')
+    def test_run_only_analyzes_windows(self, mock_VideoCapture):
+        """
+        Test that a run with windows seeks to every window and only analyzes its frames.
+        """
+        mock_VideoCapture.return_value.get = MagicMock(side_effect=[640, 480, 30])
+        mock_VideoCapture.return_value.isOpened.return_value = True
+        mock_VideoCapture.return_value.read.return_value = (True, np.zeros((480, 640, 3), np.uint8))
+
+        frame_handler = FrameHandler("test.mp4", "TestWindow", headless=True)
+        frame_handler.pose = MagicMock()
+        frame_handler.pose.process.return_value.pose_landmarks = None
+        analyzed = []
+        frame_handler.analyze_pose = MagicMock(side_effect=lambda frame_index, frame: (
+            analyzed.append(frame_index), FrameHandler.analyze_pose(frame_handler, frame_index, frame))[1])
+        stats = frame_handler.run_video_analysis(windows=[(2, 4), (10, 13)])
+
+        self.assertEqual(analyzed, [2, 3, 10, 11, 12])
+        self.assertEqual(stats["frames"], 5)
+        self.assertEqual(stats["windows"], [[2, 4], [10, 13]])
+        mock_VideoCapture.return_value.set.assert_any_call(cv2.CAP_PROP_POS_FRAMES, 10)
+
+    @patch('cv2.VideoCapture')
+    def test_analysis_only_run_skips_bar_path(self, mock_VideoCapture):
+        """
+        Test that runs without output record the barbell trajectory but don't draw the bar path.
+        """
+        mock_VideoCapture.return_value.get = MagicMock(side_effect=[640, 480, 30])
+        mock_VideoCapture.return_value.isOpened.return_value = True
+        mock_VideoCapture.return_value.read.side_effect = [(True, np.zeros((480, 640, 3), np.uint8))] * 3 + [(False, None)]
+
+        frame_handler = FrameHandler("test.mp4", "TestWindow", headless=True)
+        frame_handler.analyze_pose = MagicMock(side_effect=lambda frame_index, frame: FrameAnalysis(frame_index))
+        frame_handler.detect_barbell = MagicMock(side_effect=lambda analysis, frame: dataclasses.replace(
+            analysis, bar_coords=(300, 200)))
+        frame_handler.create_bar_path_layer = MagicMock()
+        frame_handler.run_video_analysis()
+
+        frame_handler.create_bar_path_layer.return_value.add_point.assert_not_called()
+        self.assertEqual(len(frame_handler.trajectory), 3)
+
+    @patch('cv2.VideoCapture')
+    def test_progress_can_stop_run(self, mock_VideoCapture):
+        """
+        Test that the progress callback sees every frame and stops the run by returning False.
+        """
+        mock_VideoCapture.return_value.get = MagicMock(side_effect=[640, 480, 30])
+        mock_VideoCapture.return_value.isOpened.return_value = True
+        mock_VideoCapture.return_value.read.side_effect = [(True, np.zeros((480, 640, 3), np.uint8))] * 5 + [(False, None)]
+
+        frame_handler = FrameHandler("test.mp4", "TestWindow", headless=True)
+        frame_handler.pose = MagicMock()
+        frame_handler.pose.process.return_value.pose_landmarks = None
+        progress = MagicMock(side_effect=lambda frames: frames < 2)
+        stats = frame_handler.run_video_analysis(progress=progress)
+
+        self.assertEqual([call.args[0] for call in progress.call_args_list], [1, 2])
+        self.assertEqual(stats["frames"], 2)
+
+    @patch('src.ImageHandler.RepSegmenter')
+    @patch('cv2.VideoCapture')
+    def test_completed_reps_are_reported_live(self, mock_VideoCapture, MockRepSegmenter):
+        """
+        Test that every completed rep is passed to on_rep on the frame that completes it.
+        """
+        mock_VideoCapture.return_value.get = MagicMock(side_effect=[640, 480, 30])
+        mock_VideoCapture.return_value.isOpened.return_value = True
+        mock_VideoCapture.return_value.read.side_effect = [(True, np.zeros((480, 640, 3), np.uint8))] * 3 + [(False, None)]
+        rep = MagicMock()
+        MockRepSegmenter.return_value.update.side_effect = [None, rep, None]
+        MockRepSegmenter.return_value.stats = {"reps": 1, "dropped": 0}
+        MockRepSegmenter.return_value.reps = []
+
+        frame_handler = FrameHandler("test.mp4", "TestWindow", headless=True)
+        frame_handler.pose = MagicMock()
+        frame_handler.pose.process.return_value.pose_landmarks = None
+        reported = []
+        frame_handler.run_video_analysis(progress=lambda frames: reported.append(frames) or True,
+                                         on_rep=lambda completed: reported.append(completed))
+
+        self.assertEqual(reported, [1, 2, rep, 3])
+
+    @patch('cv2.VideoCapture')
+    def test_instrumented_run(self, mock_VideoCapture):
+        """
+        Test that instrumentation times the stages and counts the frames of a run.
+        """
+        mock_VideoCapture.return_value.get = MagicMock(side_effect=[640, 480, 30])
+        mock_VideoCapture.return_value.isOpened.return_value = True
+        mock_VideoCapture.return_value.read.side_effect = [(True, np.zeros((480, 640, 3), np.uint8))] * 2 + [(False, None)]
+
+        frame_handler = FrameHandler("test.mp4", "TestWindow", headless=True, instrument=True)
+        frame_handler.pose = MagicMock()
+        frame_handler.pose.process.return_value.pose_landmarks = None
+        stats = frame_handler.run_video_analysis()
+
+        self.assertEqual(stats["instrumentation"]["counters"]["frames_without_landmarks"], 2)
+        self.assertEqual(stats["instrumentation"]["stages"]["pose"]["count"], 2)
+        self.assertEqual(stats["instrumentation"]["stages"]["decode"]["count"], 2)
+
+    @patch('cv2.VideoCapture')
+    def test_no_instrumentation_by_default(self, mock_VideoCapture):
+        """
+        Test that the stage methods are not wrapped without instrumentation.
+        """
+        mock_VideoCapture.return_value.get = MagicMock(side_effect=[640, 480, 30])
+
+        frame_handler = FrameHandler("test.mp4", "TestWindow", headless=True)
+
+        self.assertIsNone(frame_handler.instrumentation)
+        self.assertNotIn("_infer_landmarks", vars(frame_handler))
+
+    @patch('cv2.VideoCapture')
+    def test_live_source_cannot_be_cached(self, mock_VideoCapture):
+        """
+        Test that live mode rejects a landmark cache.
+        """
+        with self.assertRaises(ValueError):
+            FrameHandler(0, "TestWindow", headless=True, live=True, cache_dir="cache")
+
+    @patch('cv2.VideoCapture')
+    @patch('cv2.namedWindow')
+    @patch('cv2.resizeWindow')
+    def test_read_frames_range(self, mock_resizeWindow, mock_namedWindow, mock_VideoCapture):
+        """
+        Test that reading a frame range seeks to its start and stops at its end.
+        """
+        mock_VideoCapture.return_value.get = MagicMock(side_effect=[640, 480, 30])
+        mock_VideoCapture.return_value.isOpened.return_value = True
+        mock_VideoCapture.return_value.read.return_value = (True, np.zeros((480, 640, 3), np.uint8))
+
+        frame_handler = FrameHandler("test.mp4", "TestWindow")
+        frame_indices = [frame_index for frame_index, _ in frame_handler.read_frames(10, 15)]
+
+        mock_VideoCapture.return_value.set.assert_called_once_with(cv2.CAP_PROP_POS_FRAMES, 10)
+        self.assertEqual(frame_indices, [10, 11, 12, 13, 14])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
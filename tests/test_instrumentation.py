@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from src.Instrumentation import Histogram, Instrumentation
+from src.MovementPatterns import FrameAnalysis
+
+
+class TestHistogram(unittest.TestCase):
+    def test_observe(self):
+        histogram = Histogram(buckets=(0.01, 0.1))
+        for value in (0.005, 0.05, 0.05, 0.5):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.counts, [1, 2, 1])
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 0.605)
+        self.assertEqual(histogram.quantile(0.5), 0.1)
+        self.assertEqual(histogram.quantile(1.0), 0.5)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_timed(self):
+        instrumentation = Instrumentation()
+        function = instrumentation.timed("pose", lambda value: value * 2)
+
+        self.assertEqual(function(2), 4)
+        self.assertEqual(instrumentation.histograms["pose"].count, 1)
+
+    def test_timed_generator(self):
+        instrumentation = Instrumentation()
+        generator_function = instrumentation.timed_generator("decode", lambda: (value for value in range(3)))
+
+        self.assertEqual(list(generator_function()), [0, 1, 2])
+        self.assertEqual(instrumentation.histograms["decode"].count, 3)
+
+    def test_record_frame(self):
+        instrumentation = Instrumentation()
+        instrumentation.record_frame(FrameAnalysis(0))
+        instrumentation.record_frame(FrameAnalysis(1, MagicMock(), "Side Angle", bar_coords=(1, 2)))
+        instrumentation.record_frame(FrameAnalysis(2, MagicMock(), "Side Angle"))
+        instrumentation.record_frame(FrameAnalysis(3, MagicMock(), "Back Angle"))
+
+        self.assertEqual(instrumentation.counters, {
+            "frames": 4, "frames_without_landmarks": 1, "side_angle_frames": 2, "back_angle_frames": 1,
+            "barbell_hits": 1, "barbell_misses": 1, "frames_dropped": 0,
+        })
+
+    def test_prometheus_export(self):
+        instrumentation = Instrumentation(labels={"host": "worker1"})
+        instrumentation.observe("pose", 0.02)
+        instrumentation.increment("frames_dropped")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "squat.prom")
+            instrumentation.write_prometheus(path)
+            with open(path) as prom_file:
+                lines = prom_file.read().splitlines()
+            self.assertEqual(os.listdir(temp_dir), ["squat.prom"])
+
+        self.assertIn('squat_analysis_frames_dropped_total{host="worker1"} 1', lines)
+        self.assertIn('squat_analysis_stage_seconds_bucket{host="worker1",stage="pose",le="0.01"} 0', lines)
+        self.assertIn('squat_analysis_stage_seconds_bucket{host="worker1",stage="pose",le="0.025"} 1', lines)
+        self.assertIn('squat_analysis_stage_seconds_bucket{host="worker1",stage="pose",le="+Inf"} 1', lines)
+        self.assertIn('squat_analysis_stage_seconds_count{host="worker1",stage="pose"} 1', lines)
+
+    def test_json_summary(self):
+        instrumentation = Instrumentation()
+        instrumentation.observe("render", 0.003)
+        summary = instrumentation.to_dict()
+
+        self.assertEqual(summary["stages"]["render"]["count"], 1)
+        self.assertEqual(summary["stages"]["render"]["p50"], 0.005)
+        self.assertGreaterEqual(summary["max_rss_bytes"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock, patch
+from src.JobService import JobService, QueueFullError, init_service_worker
+
+
+class ThreadJobService(JobService):
+    """
+    Runs the jobs on threads of the test process instead of spawned worker processes.
+    """
+
+    def _create_executor(self, context):
+        return ThreadPoolExecutor(self.workers, initializer=init_service_worker,
+                                  initargs=(self._progress_queue, self._cancel_flags, False))
+
+
+class TestJobService(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.release = threading.Event()
+        # Released by a test once it has seen a progress update, or None to run the jobs through
+        self.seen = None
+        self.calls = []
+        patcher = patch('src.JobService.analyze_video', side_effect=self.fake_analyze_video)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.service = ThreadJobService(self.temp_dir.name, workers=1, queue_size=2)
+        await self.service.start()
+
+    async def asyncTearDown(self):
+        self.release.set()
+        await self.service.stop()
+
+    def fake_analyze_video(self, video_path, output_dir, scale, metrics_format, progress, on_rep):
+        self.calls.append(video_path)
+        self.release.wait(5)
+        if video_path == "crash.mp4":
+            raise BrokenProcessPool("A process in the process pool was terminated abruptly")
+        for frame in range(1, 4):
+            if not progress(frame):
+                break
+            if frame == 2:
+                on_rep(MagicMock(**{"to_dict.return_value": {"number": 1}}))
+            if self.seen is not None:
+                self.seen.acquire(timeout=5)
+        return {"video": video_path, "stats": {"frames": frame}}
+
+    async def wait_for_state(self, job, state):
+        async for update in self.service.progress(job.id):
+            if update["state"] == state:
+                return update
+
+    async def test_job_runs_and_streams_progress(self):
+        self.seen = threading.Semaphore(0)
+        job = self.service.submit("squat.mp4", "csv")
+        self.release.set()
+        updates = []
+        seen_frames = 0
+        async for update in self.service.progress(job.id):
+            updates.append(update)
+            if update["state"] == "running" and update["frames"] > seen_frames:
+                seen_frames = update["frames"]
+                self.seen.release()
+
+        self.assertEqual(updates[-1]["state"], "done")
+        self.assertEqual(updates[-1]["frames"], 3)
+        running = [(update["frames"], len(update["reps"])) for update in updates if update["state"] == "running"]
+        self.assertEqual(running[-4:], [(1, 0), (2, 0), (2, 1), (3, 1)])
+        self.assertEqual(updates[-1]["reps"], [{"number": 1}])
+        self.assertEqual(job.result, {"video": "squat.mp4", "stats": {"frames": 3}})
+        self.assertTrue(os.path.isdir(os.path.join(self.temp_dir.name, job.id)))
+
+    async def test_full_queue_is_rejected(self):
+        self.service.submit("running.mp4")
+        await asyncio.sleep(0.05)
+        self.service.submit("first.mp4")
+        self.service.submit("second.mp4")
+        with self.assertRaises(QueueFullError):
+            self.service.submit("third.mp4")
+
+    async def test_cancelled_job_frees_queue_slot(self):
+        running = self.service.submit("running.mp4")
+        await self.wait_for_state(running, "running")
+        queued = self.service.submit("first.mp4")
+        self.service.submit("second.mp4")
+        self.service.cancel(queued.id)
+
+        self.assertEqual(self.service.submit("third.mp4").state, "queued")
+
+    async def test_crashed_pool_is_replaced(self):
+        self.release.set()
+        executor = self.service._executor
+        crashed = self.service.submit("crash.mp4")
+        await self.wait_for_state(crashed, "failed")
+        job = self.service.submit("squat.mp4")
+        await self.wait_for_state(job, "done")
+
+        self.assertTrue(crashed.result["error"].startswith("BrokenProcessPool"))
+        self.assertIsNot(self.service._executor, executor)
+
+    async def test_cancel_queued_job(self):
+        running = self.service.submit("running.mp4")
+        queued = self.service.submit("queued.mp4")
+        self.service.cancel(queued.id)
+        self.release.set()
+        await self.wait_for_state(running, "done")
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(queued.state, "cancelled")
+        self.assertEqual(self.calls, ["running.mp4"])
+
+    async def test_cancel_running_job(self):
+        job = self.service.submit("squat.mp4")
+        await self.wait_for_state(job, "running")
+        self.service.cancel(job.id)
+        self.release.set()
+        await self.wait_for_state(job, "cancelled")
+
+        self.assertEqual(job.result["stats"]["frames"], 1)
+
+    async def test_finished_jobs_are_evicted(self):
+        self.service.max_finished = 1
+        self.release.set()
+        first = self.service.submit("first.mp4")
+        await self.wait_for_state(first, "done")
+        second = self.service.submit("second.mp4")
+        await self.wait_for_state(second, "done")
+
+        self.assertEqual(list(self.service.jobs), [second.id])
+
+        self.service.finished_ttl = 0
+        queued = self.service.submit("third.mp4")
+        self.assertEqual(list(self.service.jobs), [queued.id])
+
+    async def request(self, port, method, path, body=None):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        body = json.dumps(body).encode() if body is not None else b""
+        writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+        response = await reader.read()
+        writer.close()
+        head, _, body = response.partition(b"\r\n\r\n")
+        return int(head.split()[1]), body
+
+    async def test_http_api(self):
+        server = await asyncio.start_server(self.service.handle_request, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            with tempfile.NamedTemporaryFile(suffix=".mp4") as video:
+                status, body = await self.request(port, "POST", "/jobs", {"video": video.name})
+                self.assertEqual(status, 202)
+                job_id = json.loads(body)["id"]
+
+                status, _ = await self.request(port, "GET", f"/jobs/{job_id}/result")
+                self.assertEqual(status, 409)
+
+                self.release.set()
+                status, body = await self.request(port, "GET", f"/jobs/{job_id}/progress")
+                updates = [json.loads(line) for line in body.splitlines()]
+                self.assertEqual(updates[-1]["state"], "done")
+
+                status, body = await self.request(port, "GET", f"/jobs/{job_id}/result")
+                self.assertEqual(status, 200)
+                self.assertEqual(json.loads(body)["result"]["stats"]["frames"], 3)
+
+            status, _ = await self.request(port, "POST", "/jobs", {"video": "missing.mp4"})
+            self.assertEqual(status, 400)
+            status, _ = await self.request(port, "GET", "/jobs/unknown")
+            self.assertEqual(status, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
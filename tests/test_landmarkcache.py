@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+import cv2
+import numpy as np
+from src.LandmarkCache import LandmarkCache
+from src.ImageHandler import FrameHandler
+
+
+class TestLandmarkCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.video_path = os.path.join(self.temp_dir.name, "video.mp4")
+        with open(self.video_path, "wb") as video_file:
+            video_file.write(b"squat video")
+        self.cache_dir = os.path.join(self.temp_dir.name, "cache")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        landmarks = np.random.default_rng(0).random((33, 4), np.float32)
+        cache = LandmarkCache(self.cache_dir, self.video_path, {"model_complexity": 1})
+        self.assertFalse(cache.load())
+
+        cache.record(0, landmarks, (100, 200))
+        cache.record(1, None, None)
+        cache.save()
+
+        cache = LandmarkCache(self.cache_dir, self.video_path, {"model_complexity": 1})
+        self.assertTrue(cache.load())
+        self.assertIsInstance(cache.landmarks, np.memmap)
+        np.testing.assert_array_equal(cache.get_landmarks(0), landmarks)
+        self.assertEqual(cache.get_bar_coords(0), (100, 200))
+        self.assertIsNone(cache.get_landmarks(1))
+        self.assertIsNone(cache.get_bar_coords(1))
+        self.assertIsNone(cache.get_landmarks(2))
+
+    def test_key_depends_on_content_and_config(self):
+        key = LandmarkCache(self.cache_dir, self.video_path, {"model_complexity": 1}).key
+        self.assertNotEqual(key, LandmarkCache(self.cache_dir, self.video_path, {"model_complexity": 2}).key)
+
+        with open(self.video_path, "ab") as video_file:
+            video_file.write(b"!")
+        self.assertNotEqual(key, LandmarkCache(self.cache_dir, self.video_path, {"model_complexity": 1}).key)
+
+    def test_frames_must_be_recorded_in_order(self):
+        cache = LandmarkCache(self.cache_dir, self.video_path, {})
+        with self.assertRaises(ValueError):
+            cache.record(1, None, None)
+
+
+class TestFrameHandlerLandmarkCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.video_path = os.path.join(self.temp_dir.name, "video.mp4")
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (64, 48))
+        for i in range(5):
+            writer.write(np.full((48, 64, 3), 40 * i, np.uint8))
+        writer.release()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def create_frame_handler(self) -> FrameHandler:
+        frame_handler = FrameHandler(self.video_path, "TestWindow", headless=True, cache_dir=self.temp_dir.name)
+        frame_handler.pose = MagicMock()
+        frame_handler.pose.process.return_value.pose_landmarks = None
+        return frame_handler
+
+    def test_cached_video_skips_inference(self):
+        frame_handler = self.create_frame_handler()
+        self.assertEqual(frame_handler.run_video_analysis()["cache"], "miss")
+        self.assertEqual(frame_handler.pose.process.call_count, 5)
+
+        frame_handler = self.create_frame_handler()
+        with patch.object(frame_handler, "get_barbell_coordinates") as mock_get_barbell_coordinates:
+            stats = frame_handler.run_video_analysis()
+
+        self.assertEqual(stats["cache"], "hit")
+        self.assertEqual(stats["frames"], 5)
+        frame_handler.pose.process.assert_not_called()
+        mock_get_barbell_coordinates.assert_not_called()
+
+
+    def test_windowed_miss_is_reported(self):
+        frame_handler = self.create_frame_handler()
+        stats = frame_handler.run_video_analysis(windows=[(1, 3)])
+
+        self.assertEqual(stats["cache"], "miss")
+        self.assertFalse(frame_handler.landmark_cache.is_loaded)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import time
+import unittest
+import numpy as np
+from src.LiveCapture import LiveCapture
+
+
+class FakeCapture:
+    """
+    Stands in for a VideoCapture returning a fixed number of frames without delay.
+    """
+
+    def __init__(self, frames: int):
+        self.frames = frames
+        self.reads = 0
+
+    def read(self):
+        if self.reads >= self.frames:
+            return False, None
+        self.reads += 1
+        return True, np.full((4, 4, 3), self.reads, np.uint8)
+
+
+class TestLiveCapture(unittest.TestCase):
+
+    def test_slow_consumer_gets_latest_frames(self):
+        live_capture = LiveCapture(FakeCapture(20))
+        frame_indices = []
+        for frame_index, _ in live_capture.frames():
+            frame_indices.append(frame_index)
+            time.sleep(0.005)
+
+        self.assertEqual(frame_indices, sorted(set(frame_indices)))
+        self.assertEqual(frame_indices[-1], 19)
+        self.assertEqual(live_capture.processed + live_capture.dropped, 20)
+
+    def test_realtime_playback(self):
+        live_capture = LiveCapture(FakeCapture(6), realtime=True, fps=50)
+        start_time = time.perf_counter()
+        frame_indices = [frame_index for frame_index, _ in live_capture.frames()]
+
+        self.assertGreaterEqual(time.perf_counter() - start_time, 5 / 50)
+        self.assertEqual(frame_indices[-1], 5)
+
+    def test_stale_frames_are_skipped(self):
+        live_capture = LiveCapture(FakeCapture(10), max_latency=0)
+        frame_indices = [frame_index for frame_index, _ in live_capture.frames()]
+
+        self.assertEqual(frame_indices, [])
+        self.assertEqual(live_capture.stale + live_capture.dropped, 10)
+
+    def test_record_display(self):
+        # A generous budget, so no frame is skipped as stale under load
+        live_capture = LiveCapture(FakeCapture(3), max_latency=10)
+        for frame_index, _ in live_capture.frames():
+            time.sleep(0.002)
+            live_capture.record_display(frame_index)
+
+        stats = live_capture.stats
+        self.assertGreater(stats["processed"], 0)
+        self.assertEqual(live_capture.latency.count, stats["processed"])
+        self.assertEqual(stats["over_budget"], 0)
+        self.assertGreaterEqual(stats["latency_max"], 0.002)
+
+    def test_slow_display_is_over_budget(self):
+        live_capture = LiveCapture(FakeCapture(3), max_latency=10)
+        for frame_index, _ in live_capture.frames():
+            # Tighten the budget only after the frame was handed out
+            live_capture.max_latency = 0.001
+            time.sleep(0.002)
+            live_capture.record_display(frame_index)
+            break
+
+        self.assertEqual(live_capture.stats["over_budget"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
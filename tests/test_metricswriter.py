@@ -0,0 +1,60 @@
+import csv
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.MetricsWriter import MetricsWriter
+from src.MovementPatterns import FrameAnalysis
+
+
+def create_analyses() -> list:
+    side_coords = ((1, 2), (3, 4), (5, 6), (7, 8), (9, 10), (11, 12))
+    return [FrameAnalysis(frame_index=0),
+            FrameAnalysis(frame_index=1, video_angle="Side Angle", filmed_side="Right", side_coords=side_coords,
+                          knee_angle=90.0, hip_angle=80.0, shin_angle=70.0, bar_coords=(100, 200)),
+            FrameAnalysis(frame_index=2, video_angle="Back Angle", hip_angle=2.0, hip_shift_angle=1.0)]
+
+
+class TestMetricsWriter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, file_name: str, chunk_size: int = 2) -> MetricsWriter:
+        with MetricsWriter(os.path.join(self.temp_dir.name, file_name), chunk_size=chunk_size) as metrics_writer:
+            for analysis in create_analyses():
+                metrics_writer.write(analysis)
+        return metrics_writer
+
+    def test_write_npy_in_chunks(self):
+        metrics_writer = self.write("metrics.npy")
+        metrics = np.load(metrics_writer.path)
+
+        self.assertEqual(metrics_writer.written, 3)
+        self.assertEqual(os.listdir(self.temp_dir.name), ["metrics.npy"])
+        self.assertEqual(metrics["frame_index"].tolist(), [0, 1, 2])
+        self.assertEqual(metrics["video_angle"].tolist(), ["", "Side Angle", "Back Angle"])
+        self.assertEqual(metrics[1]["knee_x"], 3)
+        self.assertEqual(metrics[1]["bar_y"], 200)
+        self.assertTrue(np.isnan(metrics[0]["knee_angle"]))
+        self.assertEqual(metrics[2]["hip_shift_angle"], 1.0)
+
+    def test_write_csv(self):
+        metrics_writer = self.write("metrics.csv")
+        with open(metrics_writer.path, newline="") as metrics_file:
+            rows = list(csv.DictReader(metrics_file))
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1]["filmed_side"], "Right")
+        self.assertEqual(float(rows[1]["knee_angle"]), 90.0)
+        self.assertEqual(rows[0]["knee_angle"], "")
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            MetricsWriter(os.path.join(self.temp_dir.name, "metrics.xlsx"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 import numpy as np
-from src.MovementDrawings import SquatDrawings
+from src.MovementDrawings import SquatDrawings, BarPathLayer
 from collections import namedtuple
 
 # Create a mock Mediapipe landmark structure
@@ -61,5 +61,60 @@ class TestSquatDrawings(unittest.TestCase):
         # Validate that markers and lines are drawn
         self.assertFalse(np.array_equal(self.test_image, np.zeros((self.height, self.width, 3), dtype=np.uint8)))
 
+    def test_draw_bar_path_without_header(self):
+        # Test that the header is left to a pre-rendered layer
+        self.drawer.draw_bar_path([], header=False)
+        self.assertTrue(np.array_equal(self.test_image, np.zeros((self.height, self.width, 3), dtype=np.uint8)))
+
+    def test_draw_header(self):
+        # Test header drawing
+        self.drawer.draw_header("Bar Path")
+        self.assertFalse(np.array_equal(self.test_image, np.zeros((self.height, self.width, 3), dtype=np.uint8)))
+
+
+class TestBarPathLayer(unittest.TestCase):
+    def setUp(self):
+        self.width, self.height = 200, 150
+        self.bar_path = [(20, 20), (60, 40), (100, 90), (140, 60), (180, 120)]
+
+    def test_matches_full_redraw(self):
+        # Test that drawing segment by segment equals drawing the whole path
+        layer = BarPathLayer(self.width, self.height)
+        for point in self.bar_path:
+            layer.add_point(point)
+
+        expected = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        SquatDrawings(expected, self.width, self.height).draw_bar_path(self.bar_path, header=False)
+        image = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        SquatDrawings(image, self.width, self.height).draw_bar_path(layer, header=False)
+        self.assertTrue(np.array_equal(image, expected))
+
+    def test_fade(self):
+        # Test that old segments fade out while the newest segment stays white
+        layer = BarPathLayer(self.width, self.height, fade=2)
+        for point in self.bar_path:
+            layer.add_point(point)
+        self.assertEqual(layer.canvas[20, 20, 0], 0)
+        self.assertEqual(layer.canvas[120, 180, 0], 255)
+
+    def test_window(self):
+        # Test that points outside the window are removed
+        layer = BarPathLayer(self.width, self.height, window=2)
+        for point in self.bar_path:
+            layer.add_point(point)
+        self.assertEqual(len(layer), 2)
+        self.assertEqual(layer.canvas[20, 20, 0], 0)
+        self.assertEqual(layer.canvas[120, 180, 0], 255)
+
+    def test_clear(self):
+        # Test clearing the path
+        layer = BarPathLayer(self.width, self.height)
+        for point in self.bar_path:
+            layer.add_point(point)
+        layer.clear()
+        self.assertEqual(len(layer), 0)
+        self.assertFalse(layer.canvas.any())
+
+
 if __name__ == "__main__":
     unittest.main()
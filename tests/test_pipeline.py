@@ -0,0 +1,66 @@
+import random
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from src.Pipeline import FramePipeline
+
+
+class FakeFrameHandler:
+    """
+    Minimal stand-in for FrameHandler whose stages take a random amount of time.
+    """
+
+    def __init__(self, frame_count: int):
+        self.frame_count = frame_count
+
+    def read_frames(self, start_frame: int = 0, end_frame: int = None):
+        for frame_index in range(start_frame, min(end_frame or self.frame_count, self.frame_count)):
+            yield frame_index, f"frame-{frame_index}"
+
+    def analyze_pose(self, frame_index, frame):
+        time.sleep(random.uniform(0, 0.002))
+        return MagicMock(frame_index=frame_index)
+
+    def detect_barbell(self, analysis, frame):
+        time.sleep(random.uniform(0, 0.002))
+        return analysis
+
+
+class TestFramePipeline(unittest.TestCase):
+
+    def test_preserves_frame_order(self):
+        pipeline = FramePipeline(FakeFrameHandler(50), queue_size=2)
+        results = list(pipeline.run())
+
+        self.assertEqual([analysis.frame_index for _, analysis in results], list(range(50)))
+        self.assertEqual([frame for frame, _ in results], [f"frame-{i}" for i in range(50)])
+
+    def test_decodes_frame_ranges(self):
+        pipeline = FramePipeline(FakeFrameHandler(50), queue_size=2, frame_ranges=[(5, 8), (40, None)])
+        results = list(pipeline.run())
+
+        self.assertEqual([analysis.frame_index for _, analysis in results], [5, 6, 7] + list(range(40, 50)))
+
+    def test_stage_error_is_raised(self):
+        frame_handler = FakeFrameHandler(10)
+        frame_handler.analyze_pose = MagicMock(side_effect=RuntimeError("pose failed"))
+
+        with self.assertRaises(RuntimeError):
+            list(FramePipeline(frame_handler).run())
+
+    def test_closing_early_stops_stages(self):
+        thread_count = threading.active_count()
+        analyzed_frames = FramePipeline(FakeFrameHandler(1000), queue_size=2).run()
+        next(analyzed_frames)
+        analyzed_frames.close()
+
+        self.assertEqual(threading.active_count(), thread_count)
+
+    def test_invalid_queue_size(self):
+        with self.assertRaises(ValueError):
+            FramePipeline(FakeFrameHandler(1), queue_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from src.PosePool import PosePool
+
+
+class TestPosePool(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.object(PosePool, "_create", side_effect=lambda config: MagicMock())
+        self.mock_create = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = PosePool()
+
+    def test_released_pose_is_reused(self):
+        pose = self.pool.acquire({"model_complexity": 0})
+        self.pool.release(pose, {"model_complexity": 0})
+
+        self.assertIs(self.pool.acquire({"model_complexity": 0}), pose)
+        pose.reset.assert_called_once()
+        self.assertEqual(self.pool.stats, {"created": 1, "reused": 1, "idle": 0})
+
+    def test_configurations_are_kept_apart(self):
+        pose = self.pool.acquire({"model_complexity": 0})
+        self.pool.release(pose, {"model_complexity": 0})
+
+        self.assertIsNot(self.pool.acquire({"model_complexity": 2}), pose)
+        self.assertIsNot(self.pool.acquire(), pose)
+        self.assertEqual(self.mock_create.call_count, 3)
+
+    def test_acquired_poses_are_exclusive(self):
+        self.assertIsNot(self.pool.acquire(), self.pool.acquire())
+
+    def test_warm_up(self):
+        self.pool.warm_up(count=2)
+        self.pool.warm_up(count=2)
+
+        self.assertEqual(self.mock_create.call_count, 2)
+        self.assertEqual(self.pool.stats["idle"], 2)
+        pose = self.pool.acquire()
+        pose.process.assert_called_once()
+        self.assertEqual(self.mock_create.call_count, 2)
+
+    def test_clear_closes_idle_poses(self):
+        pose = self.pool.acquire()
+        self.pool.release(pose)
+        self.pool.clear()
+
+        pose.close.assert_called_once()
+        self.assertEqual(self.pool.stats["idle"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
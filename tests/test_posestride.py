@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+from src.PoseStride import AdaptivePoseStride
+
+
+def create_landmarks(offset: float) -> np.ndarray:
+    landmarks = np.full((33, 4), 0.5, np.float32)
+    landmarks[:, :2] += offset
+    return landmarks
+
+
+class TestAdaptivePoseStride(unittest.TestCase):
+
+    def run_frames(self, pose_stride: AdaptivePoseStride, offsets: list) -> list:
+        inferred = []
+        for frame_index, offset in enumerate(offsets):
+            if pose_stride.should_infer(frame_index):
+                pose_stride.add_keyframe(frame_index, create_landmarks(offset))
+                inferred.append(frame_index)
+            else:
+                pose_stride.estimate(frame_index)
+        return inferred
+
+    def test_stride_grows_while_standing_still(self):
+        pose_stride = AdaptivePoseStride(max_stride=4)
+        inferred = self.run_frames(pose_stride, [0.0] * 20)
+
+        self.assertEqual(inferred, [0, 1, 3, 7, 11, 15, 19])
+        self.assertEqual(pose_stride.stats, {"inferences": 7, "saved": 13})
+
+    def test_stride_drops_on_fast_motion(self):
+        pose_stride = AdaptivePoseStride(max_stride=4)
+        self.run_frames(pose_stride, [0.0] * 8)
+        self.assertEqual(pose_stride.stride, 4)
+
+        pose_stride.add_keyframe(11, create_landmarks(0.1))
+        self.assertEqual(pose_stride.stride, 1)
+        self.assertTrue(pose_stride.should_infer(12))
+
+    def test_estimate_extrapolates_positions(self):
+        pose_stride = AdaptivePoseStride(max_stride=4, motion_threshold=0.01)
+        pose_stride.add_keyframe(0, create_landmarks(0.0))
+        pose_stride.add_keyframe(2, create_landmarks(0.01))
+
+        landmarks = pose_stride.estimate(3)
+        self.assertAlmostEqual(float(landmarks[0, 0]), 0.515, places=5)
+        self.assertAlmostEqual(float(landmarks[0, 3]), 0.5, places=5)
+
+    def test_missing_pose_resets_stride(self):
+        pose_stride = AdaptivePoseStride(max_stride=4)
+        self.run_frames(pose_stride, [0.0] * 8)
+        pose_stride.add_keyframe(11, None)
+
+        self.assertEqual(pose_stride.stride, 1)
+        self.assertTrue(pose_stride.should_infer(12))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from src.QualityController import QualityController
+
+
+class TestQualityController(unittest.TestCase):
+    def setUp(self):
+        """
+        Setup for the QualityController tests.
+        """
+        self.levels = ({"model_complexity": 2}, {"model_complexity": 1}, {"model_complexity": 0})
+        self.controller = QualityController(0.03, self.levels, start_level=1, window=4, settle_frames=2)
+
+    def observe(self, frames, seconds):
+        for frame_index in frames:
+            level = self.controller.observe(frame_index, seconds)
+            if level is not None:
+                self.controller.switch(level, frame_index + 1)
+
+    def test_steps_down_when_over_budget(self):
+        """
+        Test that the controller only steps down once the settled window exceeds the budget.
+        """
+        for frame_index in range(5):
+            self.assertIsNone(self.controller.observe(frame_index, 0.05))
+        self.assertEqual(self.controller.observe(5, 0.05), 2)
+
+    def test_steps_up_unless_level_was_too_slow(self):
+        """
+        Test that a fast level steps up, and that a level measured to be too slow is not retried right away.
+        """
+        self.observe(range(6), 0.01)
+        self.assertEqual(self.controller.level, 0)
+        self.observe(range(6, 12), 0.05)
+        self.assertEqual(self.controller.level, 1)
+        self.observe(range(12, 30), 0.01)
+        self.assertEqual(self.controller.level, 1)
+
+        self.controller.retry_frames = 10
+        self.observe(range(30, 36), 0.01)
+        self.assertEqual(self.controller.level, 0)
+
+    def test_skips_unavailable_levels(self):
+        """
+        Test that levels whose model could not be loaded are never proposed again.
+        """
+        self.controller.mark_unavailable(0)
+        self.observe(range(20), 0.01)
+        self.assertEqual(self.controller.level, 1)
+        self.assertEqual(self.controller.stats["unavailable"], [0])
+
+    def test_segments_record_settings(self):
+        """
+        Test that every switch starts a segment with the frame range and settings of the level.
+        """
+        self.observe(range(6), 0.05)
+        self.observe(range(6, 10), 0.02)
+        stats = self.controller.stats
+
+        self.assertEqual(stats["switches"], 1)
+        self.assertEqual([(segment["start_frame"], segment["end_frame"], segment["level"])
+                          for segment in stats["segments"]], [(0, 5, 1), (6, 9, 2)])
+        self.assertEqual(stats["segments"][1]["settings"], {"model_complexity": 0})
+        self.assertAlmostEqual(stats["segments"][0]["latency_mean"], 0.05)
+
+    def test_invalid_start_level(self):
+        """
+        Test that a start level outside the levels raises a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            QualityController(0.03, self.levels, start_level=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
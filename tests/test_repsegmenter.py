@@ -0,0 +1,74 @@
+import unittest
+from src.MovementPatterns import FrameAnalysis
+from src.RepSegmenter import RepSegmenter
+
+
+def create_analysis(frame_index: int, knee_angle: float) -> FrameAnalysis:
+    # The hip drops below the knee when the knee is bent below 90 degrees
+    hip_y = 300 + int(90 - knee_angle)
+    return FrameAnalysis(frame_index=frame_index, video_angle="Side Angle",
+                         side_coords=((100, hip_y), (150, 300), (150, 400), (100, 100), (170, 420), (140, 420)),
+                         knee_angle=knee_angle, hip_angle=knee_angle - 10, shin_angle=80.0)
+
+
+class TestRepSegmenter(unittest.TestCase):
+
+    def run_angles(self, rep_segmenter: RepSegmenter, knee_angles: list) -> list:
+        reps = []
+        for frame_index, knee_angle in enumerate(knee_angles):
+            rep = rep_segmenter.update(create_analysis(frame_index, knee_angle))
+            if rep is not None:
+                reps.append((frame_index, rep))
+        return reps
+
+    def test_emits_rep_on_lockout(self):
+        rep_segmenter = RepSegmenter(fps=10)
+        knee_angles = [175, 175, 150, 120, 90, 70, 90, 120, 150, 170, 175]
+        reps = self.run_angles(rep_segmenter, knee_angles)
+
+        self.assertEqual(len(reps), 1)
+        frame_index, rep = reps[0]
+        self.assertEqual(frame_index, 9)
+        self.assertEqual((rep.start_frame, rep.bottom_frame, rep.lockout_frame), (1, 5, 9))
+        self.assertAlmostEqual(rep.time_under_tension, 0.8)
+        self.assertAlmostEqual(rep.descent_time, 0.4)
+        self.assertEqual(rep.min_knee_angle, 70)
+        self.assertEqual(rep.max_knee_angle, 170)
+        self.assertEqual(rep.min_hip_angle, 60)
+        self.assertEqual(rep.depth, 20)
+
+    def test_counts_consecutive_reps(self):
+        rep_segmenter = RepSegmenter(fps=30)
+        knee_angles = [175, 140, 80, 140, 175] * 3
+        reps = self.run_angles(rep_segmenter, knee_angles)
+
+        self.assertEqual([rep.number for _, rep in reps], [1, 2, 3])
+        self.assertEqual(rep_segmenter.stats, {"reps": 3, "dropped": 0})
+
+    def test_shallow_rep_is_dropped(self):
+        rep_segmenter = RepSegmenter(fps=30)
+        reps = self.run_angles(rep_segmenter, [175, 150, 140, 150, 175])
+
+        self.assertEqual(reps, [])
+        self.assertEqual(rep_segmenter.stats, {"reps": 0, "dropped": 1})
+
+    def test_frames_without_pose_are_skipped(self):
+        rep_segmenter = RepSegmenter(fps=30, max_gap=5)
+        rep_segmenter.update(create_analysis(0, 175))
+        rep_segmenter.update(create_analysis(1, 100))
+        rep_segmenter.update(FrameAnalysis(frame_index=2))
+
+        # A long gap drops the running rep
+        self.assertIsNone(rep_segmenter.update(create_analysis(20, 175)))
+        self.assertEqual(rep_segmenter.stats, {"reps": 0, "dropped": 1})
+
+    def test_video_starting_mid_rep(self):
+        rep_segmenter = RepSegmenter(fps=30)
+        reps = self.run_angles(rep_segmenter, [80, 120, 175, 100, 80, 175])
+
+        self.assertEqual(len(reps), 1)
+        self.assertEqual(reps[0][1].start_frame, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from unittest.mock import patch
+from src.MovementPatterns import FrameAnalysis
+from src.SegmentAnalyzer import split_frame_ranges, merge_segments, analyze_segment
+
+
+class TestSplitFrameRanges(unittest.TestCase):
+
+    def test_ranges_cover_video(self):
+        frame_ranges = split_frame_ranges(100, 3)
+        self.assertEqual(frame_ranges, [(0, 33), (33, 66), (66, 100)])
+
+    def test_short_video_uses_fewer_ranges(self):
+        self.assertEqual(split_frame_ranges(50, 8, min_segment_length=20), [(0, 25), (25, 50)])
+
+    def test_empty_video(self):
+        self.assertEqual(split_frame_ranges(0, 4), [(0, 0)])
+
+
+class TestMergeSegments(unittest.TestCase):
+
+    def test_merge_builds_ordered_timeline(self):
+        first = [FrameAnalysis(0, video_angle="Side Angle", bar_coords=(30, 60)),
+                 FrameAnalysis(1, video_angle="Side Angle")]
+        second = [FrameAnalysis(2),
+                  FrameAnalysis(3, video_angle="Side Angle", bar_coords=(33, 66)),
+                  FrameAnalysis(4, video_angle="Back Angle")]
+
+        timeline = merge_segments([first, second])
+
+        self.assertEqual([analysis.frame_index for analysis in timeline.frames], [0, 1, 2, 3, 4])
+        self.assertEqual(timeline.bar_path, [(10, 20), (11, 22)])
+        self.assertEqual(timeline.camera_angles, [(0, 4, "Side Angle"), (4, 5, "Back Angle")])
+        self.assertEqual(len(timeline.to_dict()["frames"]), 5)
+
+
+class TestAnalyzeSegment(unittest.TestCase):
+
+    @patch('src.SegmentAnalyzer.get_worker_frame_handler')
+    def test_warmup_frames_are_discarded(self, mock_get_worker_frame_handler):
+        frame_handler = mock_get_worker_frame_handler.return_value
+        frame_handler.analyze_frames.return_value = [
+            (None, FrameAnalysis(frame_index)) for frame_index in range(90, 120)
+        ]
+
+        analyses = analyze_segment("test.mp4", 100, 120, warmup=10)
+
+        frame_handler.analyze_frames.assert_called_once_with(90, 120)
+        self.assertEqual([analysis.frame_index for analysis in analyses], list(range(100, 120)))
+
+
+if __name__ == '__main__':
+    unittest.main()
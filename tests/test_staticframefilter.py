@@ -0,0 +1,75 @@
+import unittest
+import numpy as np
+from src.StaticFrameFilter import StaticFrameFilter
+
+
+class TestStaticFrameFilter(unittest.TestCase):
+    def setUp(self):
+        """
+        Setup for the StaticFrameFilter tests.
+        """
+        self.static_filter = StaticFrameFilter(max_skip=3)
+        rng = np.random.default_rng(0)
+        self.frame = rng.integers(60, 200, (360, 640, 3), dtype=np.uint8)
+
+    def test_noise_is_static(self):
+        """
+        Test that sensor noise doesn't count as change while a moving object does.
+        """
+        noisy = np.clip(self.frame.astype(np.int16) + np.random.default_rng(1).integers(-4, 5, self.frame.shape),
+                        0, 255).astype(np.uint8)
+        moved = self.frame.copy()
+        moved[100:200, 300:360] = 255
+
+        self.assertFalse(self.static_filter.is_static(0, self.frame))
+        self.assertTrue(self.static_filter.is_static(1, noisy))
+        self.assertFalse(self.static_filter.is_static(2, moved))
+
+    def test_max_skip_refreshes_idle_segment(self):
+        """
+        Test that every max_skip static frames one frame is analyzed without ending the idle segment.
+        """
+        static = [self.static_filter.is_static(frame_index, self.frame) for frame_index in range(10)]
+
+        self.assertEqual(static, [False, True, True, True, False, True, True, True, False, True])
+        self.assertEqual(self.static_filter.stats, {"analyzed": 3, "skipped": 7, "idle_segments": [[1, 10]]})
+
+    def test_earlier_frame_starts_over(self):
+        """
+        Test that a frame index that is not after the last one forgets the reference frame.
+        """
+        self.static_filter.is_static(5, self.frame)
+        self.assertFalse(self.static_filter.is_static(0, self.frame))
+        self.assertEqual(self.static_filter.stats["analyzed"], 1)
+
+    def test_unreusable_frame_is_analyzed(self):
+        """
+        Test that a static frame without an analysis to reuse is analyzed and not counted as skipped.
+        """
+        self.static_filter.is_static(0, self.frame)
+
+        self.assertFalse(self.static_filter.is_static(1, self.frame, reusable=False))
+        self.assertTrue(self.static_filter.is_static(2, self.frame))
+        self.assertEqual(self.static_filter.stats, {"analyzed": 2, "skipped": 1, "idle_segments": [[2, 3]]})
+
+    def test_restart_keeps_stats(self):
+        """
+        Test that restarting forgets the reference frame but keeps the statistics.
+        """
+        self.static_filter.is_static(0, self.frame)
+        self.static_filter.is_static(1, self.frame)
+        self.static_filter.restart()
+
+        self.assertFalse(self.static_filter.is_static(50, self.frame))
+        self.assertEqual(self.static_filter.stats, {"analyzed": 2, "skipped": 1, "idle_segments": [[1, 2]]})
+
+    def test_invalid_max_skip(self):
+        """
+        Test that a negative max_skip raises a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            StaticFrameFilter(max_skip=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
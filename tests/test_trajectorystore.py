@@ -0,0 +1,64 @@
+import unittest
+import numpy as np
+from src.TrajectoryStore import TrajectoryStore
+
+
+class TestTrajectoryStore(unittest.TestCase):
+
+    def fill(self, trajectory: TrajectoryStore, points: list):
+        for frame_index, point in enumerate(points):
+            trajectory.add(frame_index, frame_index / 30, point)
+
+    def test_stores_points_in_order(self):
+        trajectory = TrajectoryStore(capacity=8)
+        self.fill(trajectory, [(10, 20), (11, 25), (12, 30)])
+
+        self.assertEqual(len(trajectory), 3)
+        np.testing.assert_array_equal(trajectory.points, [[10, 20], [11, 25], [12, 30]])
+        np.testing.assert_array_equal(trajectory.frame_indices, [0, 1, 2])
+        np.testing.assert_allclose(trajectory.timestamps, [0, 1 / 30, 2 / 30])
+        self.assertEqual(trajectory.last_point, (12.0, 30.0))
+
+    def test_overwrites_oldest_points(self):
+        trajectory = TrajectoryStore(capacity=4)
+        self.fill(trajectory, [(i, i) for i in range(10)])
+
+        self.assertEqual(len(trajectory), 4)
+        np.testing.assert_array_equal(trajectory.frame_indices, [6, 7, 8, 9])
+        np.testing.assert_array_equal(trajectory.points[:, 0], [6, 7, 8, 9])
+
+    def test_export_without_copy(self):
+        trajectory = TrajectoryStore(capacity=4)
+        self.fill(trajectory, [(i, 2 * i) for i in range(6)])
+
+        exported = trajectory.export()
+        self.assertTrue(np.shares_memory(exported["x"], trajectory._points))
+        self.assertFalse(exported["frame_index"].flags.writeable)
+        np.testing.assert_array_equal(exported["y"], [4, 6, 8, 10])
+
+    def test_simplifies_straight_segments(self):
+        trajectory = TrajectoryStore(capacity=16, tolerance=1.0)
+        # Down in a straight line, then up again
+        self.fill(trajectory, [(100, y) for y in range(0, 50, 5)] + [(100, y) for y in range(45, -5, -5)])
+
+        self.assertEqual(trajectory.added, 20)
+        np.testing.assert_array_equal(trajectory.points, [[100, 0], [100, 45], [100, 0]])
+        np.testing.assert_array_equal(trajectory.frame_indices, [0, 10, 19])
+
+    def test_keeps_points_beyond_tolerance(self):
+        trajectory = TrajectoryStore(capacity=16, tolerance=1.0)
+        self.fill(trajectory, [(0, 0), (5, 3), (10, 0)])
+
+        self.assertEqual(len(trajectory), 3)
+
+    def test_clear(self):
+        trajectory = TrajectoryStore(capacity=4)
+        self.fill(trajectory, [(1, 1), (2, 2)])
+        trajectory.clear()
+
+        self.assertEqual(len(trajectory), 0)
+        self.assertIsNone(trajectory.last_point)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import numpy as np
+from src.MovementPatterns import SIDE_JOINT_LANDMARKS
+from src.ViewClassifier import ViewClassifier
+
+
+def make_landmarks(left_visibility: float, right_visibility: float) -> np.ndarray:
+    landmarks = np.full((33, 4), 0.5, np.float32)
+    landmarks[SIDE_JOINT_LANDMARKS[0], 3] = left_visibility
+    landmarks[SIDE_JOINT_LANDMARKS[1], 3] = right_visibility
+    return landmarks
+
+
+class TestViewClassifier(unittest.TestCase):
+    def setUp(self):
+        """
+        Setup for the ViewClassifier tests.
+        """
+        self.classifier = ViewClassifier(threshold=0.3, margin=0.05, min_frames=3)
+
+    def test_first_pose_decides_view(self):
+        """
+        Test that the first pose decides the camera angle and side without waiting.
+        """
+        self.assertEqual(self.classifier.update(0, make_landmarks(0.2, 0.9)), ("Side Angle", "Right"))
+        self.assertEqual(ViewClassifier().update(0, make_landmarks(0.9, 0.9)), ("Back Angle", None))
+
+    def test_noise_around_threshold_keeps_view(self):
+        """
+        Test that differences alternating around the threshold and single outliers don't flip the view.
+        """
+        self.classifier.update(0, make_landmarks(0.5, 0.8))
+        for frame_index in range(1, 20):
+            difference = 0.28 if frame_index % 2 else 0.32
+            view = self.classifier.update(frame_index, make_landmarks(0.5, 0.5 + difference))
+            self.assertEqual(view, ("Side Angle", "Right"))
+        self.classifier.update(20, make_landmarks(0.9, 0.9))
+        self.assertEqual(self.classifier.update(21, make_landmarks(0.5, 0.9)), ("Side Angle", "Right"))
+        self.assertEqual(self.classifier.stats["switches"], 0)
+
+    def test_stable_change_starts_segment(self):
+        """
+        Test that the view changes after min_frames agreeing frames and the segments record the frame ranges.
+        """
+        for frame_index in range(5):
+            self.classifier.update(frame_index, make_landmarks(0.9, 0.9))
+        views = [self.classifier.update(frame_index, make_landmarks(0.9, 0.1)) for frame_index in range(5, 10)]
+
+        self.assertEqual(views[1], ("Back Angle", None))
+        self.assertEqual(views[2], ("Side Angle", "Left"))
+        self.assertEqual(self.classifier.stats["segments"], [
+            {"start_frame": 0, "end_frame": 7, "video_angle": "Back Angle", "filmed_side": None},
+            {"start_frame": 7, "end_frame": 10, "video_angle": "Side Angle", "filmed_side": "Left"},
+        ])
+
+    def test_tie_keeps_side(self):
+        """
+        Test that equally visible sides on a side angle pose keep the side instead of raising a ValueError.
+        """
+        self.classifier.update(0, make_landmarks(0.1, 0.9))
+        landmarks = make_landmarks(0.5, 0.5)
+        landmarks[SIDE_JOINT_LANDMARKS[:, :2], 3] = [[0.9, 0.1], [0.1, 0.9]]
+        for frame_index in range(1, 10):
+            self.assertEqual(self.classifier.update(frame_index, landmarks), ("Side Angle", "Right"))
+
+    def test_earlier_frame_starts_over(self):
+        """
+        Test that a frame index that is not after the last one resets the segments.
+        """
+        self.classifier.update(10, make_landmarks(0.9, 0.9))
+        self.classifier.update(0, make_landmarks(0.1, 0.9))
+        self.assertEqual(len(self.classifier.segments), 1)
+        self.assertEqual(self.classifier.video_angle, "Side Angle")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,9 @@
+import pickle
 import unittest
 from unittest.mock import MagicMock
-from src.MovementPatterns import JointCoordinates, SquatPose
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+from src.MovementPatterns import JointCoordinates, PoseLandmark, SquatPose, landmarks_to_array
 import mediapipe as mp
 
 
@@ -72,6 +75,50 @@ class TestSquatPose(unittest.TestCase):
         coords = self.pose.get_side_coordinates(side)
         self.assertEqual(len(coords), 6)
 
+    def test_landmark_array(self):
+        self.assertEqual(self.pose.landmarks.shape, (33, 4))
+        self.assertAlmostEqual(self.pose.hips[0].x, self.mock_landmarks[mp.solutions.pose.PoseLandmark.LEFT_HIP.value].x,
+                               places=5)
+
+    def test_array_input_matches_landmarks(self):
+        pose = SquatPose(self.pose.landmarks, self.video_width, self.video_height)
+        self.assertEqual(pose.get_side_coordinates("Right"), self.pose.get_side_coordinates("Right"))
+        self.assertEqual(pose.get_hip_midpoint(), self.pose.get_hip_midpoint())
+
+    def test_pose_is_picklable(self):
+        pose = pickle.loads(pickle.dumps(self.pose))
+        self.assertEqual(pose.get_side_coordinates("Left"), self.pose.get_side_coordinates("Left"))
+
+
+class TestLandmarksToArray(unittest.TestCase):
+    def test_landmark_list_matches_landmarks(self):
+        landmark_list = landmark_pb2.NormalizedLandmarkList()
+        for i in range(33):
+            landmark_list.landmark.add(x=0.01 * i, y=0.02 * i, z=-0.1, visibility=0.5, presence=0.9)
+
+        landmark_array = landmarks_to_array(landmark_list)
+        self.assertTrue(np.array_equal(landmark_array, landmarks_to_array(landmark_list.landmark)))
+        self.assertAlmostEqual(float(landmark_array[10, 1]), 0.2, places=5)
+
+    def test_dict_of_landmarks(self):
+        landmarks = {i: MagicMock(x=0.01 * i, y=0.02 * i, z=0.0, visibility=0.5) for i in range(33)}
+
+        landmark_array = landmarks_to_array(landmarks)
+        self.assertAlmostEqual(float(landmark_array[32, 0]), 0.32, places=5)
+
+    def test_missing_visibility_is_zero(self):
+        landmark_list = landmark_pb2.NormalizedLandmarkList()
+        for i in range(33):
+            landmark_list.landmark.add(x=0.01 * i, y=0.02 * i, z=0.0)
+
+        landmark_array = landmarks_to_array(landmark_list)
+        self.assertTrue(np.all(landmark_array[:, 3] == 0))
+        self.assertAlmostEqual(float(landmark_array[32, 0]), 0.32, places=5)
+
+    def test_pose_landmarks_match_mediapipe(self):
+        self.assertEqual({landmark.name: landmark.value for landmark in PoseLandmark},
+                         {landmark.name: landmark.value for landmark in mp.solutions.pose.PoseLandmark})
+
 
 if __name__ == "__main__":
     unittest.main()